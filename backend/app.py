@@ -3,15 +3,22 @@ AI法语老师 - Flask后端服务
 提供API接口用于前端交互
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, send_file, abort, g, Response
 from flask_cors import CORS
+import hmac
+import io
+import json
 import os
 import sys
+import tempfile
+import time
 import logging
 from datetime import datetime
 
 # 添加项目路径到系统路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, 'language-assistant-phase1'))
 
 # 配置日志
 logging.basicConfig(
@@ -34,8 +41,73 @@ CORS(app)
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 最大16MB上传
 
-# 对话历史存储（实际应用中应该使用数据库）
-conversation_sessions = {}
+app.config['AUDIO_CACHE_DIR'] = os.path.join(PROJECT_ROOT, 'data', 'audio_cache')
+# 会话内存预算：超出后按最近最少使用落盘，空闲30分钟的会话也会落盘
+app.config['SESSION_SPILL_DIR'] = os.path.join(PROJECT_ROOT, 'data', 'sessions')
+app.config['SESSION_MAX_MESSAGES'] = 200000
+app.config['SESSION_IDLE_TTL'] = 1800
+# 对话记录导出/导入接口的管理令牌；未设置时两个接口关闭（返回404）
+app.config['TRANSCRIPT_ADMIN_TOKEN'] = os.environ.get('TRANSCRIPT_ADMIN_TOKEN')
+
+# 指标统计
+from utils.metrics import metrics, PROMETHEUS_CONTENT_TYPE
+
+REQUEST_LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP请求耗时（秒）', ['route', 'method', 'status']
+)
+INTENT_DETECTIONS = metrics.counter(
+    'intent_detections_total', '意图检测结果分布', ['intent']
+)
+
+# 对话历史存储（按会话ID管理，超出内存预算或空闲的会话落盘）
+from mcp.session_registry import SessionRegistry
+from mcp.transcripts import iter_records, read_jsonl, validate_jsonl, import_records, parse_timestamp
+session_registry = SessionRegistry(
+    max_history=10,
+    max_messages=app.config['SESSION_MAX_MESSAGES'],
+    idle_ttl=app.config['SESSION_IDLE_TTL'],
+    spill_dir=app.config['SESSION_SPILL_DIR']
+)
+
+# 意图检测器（与命令行/语音界面共用同一套关键词自动机，词表文件修改后自动热加载）
+from mcp.intent_detector import IntentDetector
+intent_detector = IntentDetector(reload_interval=5.0)
+
+# LLM客户端（未配置API密钥时流式接口使用模拟响应）
+from mcp.response_formatter import StreamingFormatter
+try:
+    from llm.api_client import LLMClient
+    llm_client = LLMClient()
+except Exception as e:
+    logger.warning(f"LLM客户端不可用，流式接口使用模拟响应: {e}")
+    llm_client = None
+
+# 语音合成缓存（依赖语音模块，不可用时发音接口返回503）
+try:
+    from speech.text_to_speech.synthesizer import SpeechSynthesizer
+    from speech.text_to_speech.audio_cache import AudioCache
+    audio_cache = AudioCache(app.config['AUDIO_CACHE_DIR'], SpeechSynthesizer())
+except Exception as e:
+    logger.warning(f"语音合成不可用: {e}")
+    audio_cache = None
+
+
+@app.before_request
+def start_timer():
+    """记录请求开始时间"""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_latency(response):
+    """按路由模板记录请求耗时，避免路径参数导致标签爆炸"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - start
+        )
+    return response
 
 
 @app.route('/')
@@ -71,14 +143,26 @@ def chat():
 
         # 检测用户意图
         intent = detect_intent(user_message)
-        logger.info(f"检测到意图: {intent}")
+        lexicon_version = intent_detector.lexicon_version
+        INTENT_DETECTIONS.labels(intent).inc()
+        logger.info(f"检测到意图: {intent} (词表: {lexicon_version})")
 
         # 生成AI回复（目前使用模拟响应，后续集成实际LLM API）
-        response = generate_response(user_message, intent, conversation_history)
+        session_id = data.get('session_id')
+        if session_id:
+            # 带会话ID时使用服务端保存的历史
+            with session_registry.session(str(session_id)) as conversation:
+                conversation_history = conversation.get_formatted_history(limit=5)
+                response = generate_response(user_message, intent, conversation_history)
+                conversation.add_user_message(user_message, intent)
+                conversation.add_assistant_message(response, intent)
+        else:
+            response = generate_response(user_message, intent, conversation_history)
 
         return jsonify({
             'response': response,
             'intent': intent,
+            'lexicon_version': lexicon_version,
             'timestamp': datetime.now().isoformat()
         })
 
@@ -119,6 +203,51 @@ def translate():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    流式聊天接口（SSE）
+    每个事件携带一段可直接渲染的Markdown文本，不会截断粗体/代码/列表标记
+    """
+    data = request.get_json(silent=True)
+    if not data or 'message' not in data:
+        return jsonify({'error': '请求格式错误：缺少message字段'}), 400
+
+    user_message = data['message'].strip()
+    conversation_history = data.get('history', [])
+    if not user_message:
+        return jsonify({'error': '消息不能为空'}), 400
+
+    intent = detect_intent(user_message)
+    INTENT_DETECTIONS.labels(intent).inc()
+
+    if llm_client is not None:
+        deltas = llm_client.chat_stream(user_message, intent_type=intent, history=conversation_history)
+    else:
+        deltas = [generate_response(user_message, intent, conversation_history) or '']
+
+    def events():
+        streamer = StreamingFormatter()
+        try:
+            for delta in deltas:
+                chunk = streamer.feed(delta)
+                if chunk:
+                    yield f"data: {json.dumps({'delta': chunk}, ensure_ascii=False)}\n\n"
+            tail = streamer.flush()
+            if tail:
+                yield f"data: {json.dumps({'delta': tail}, ensure_ascii=False)}\n\n"
+            yield f"event: done\ndata: {json.dumps({'intent': intent})}\n\n"
+        except Exception as e:
+            logger.error(f"流式响应出错: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n"
+
+    return Response(
+        events(),
+        content_type='text/event-stream; charset=utf-8',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/pronunciation', methods=['POST'])
 def pronunciation():
     """
@@ -132,13 +261,16 @@ def pronunciation():
         if not text:
             return jsonify({'error': '文本不能为空'}), 400
 
-        # 这里应该调用TTS API生成音频
-        # 目前返回模拟数据
-        audio_url = f"/api/audio/{text}"
+        if audio_cache is None:
+            return jsonify({'error': '语音合成服务不可用'}), 503
+
+        # 相同文本/语音/语速/音量只合成一次，之后直接读缓存
+        key, _, cached = audio_cache.get_or_synthesize(text)
 
         return jsonify({
-            'audio_url': audio_url,
-            'text': text
+            'audio_url': f"/api/audio/{key}",
+            'text': text,
+            'cached': cached
         })
 
     except Exception as e:
@@ -146,6 +278,31 @@ def pronunciation():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/audio/<key>', methods=['GET'])
+def audio(key):
+    """
+    音频文件接口
+    按内容哈希返回缓存的语音，支持ETag和Range请求
+    """
+    if audio_cache is None:
+        abort(404)
+
+    path = audio_cache.lookup(key)
+    if path is None:
+        abort(404)
+
+    # 内容寻址：同一个键的内容永远不变，可以用键作强ETag并永久缓存
+    response = send_file(
+        path,
+        mimetype='audio/mpeg',
+        conditional=True,
+        etag=key,
+        max_age=31536000
+    )
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
@@ -157,37 +314,85 @@ def health_check():
     })
 
 
-# ===== 辅助函数 =====
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """指标接口（Prometheus文本格式）"""
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
 
-def detect_intent(message):
+
+def require_admin_token():
     """
-    检测用户意图
-    返回: translation, explanation, pronunciation, vocabulary, conversation
+    检查对话记录接口的管理令牌（请求头 Authorization: Bearer <令牌>）
+
+    Returns:
+        未配置令牌时返回404，令牌不符时返回401；通过时返回None
     """
-    message_lower = message.lower()
+    token = app.config.get('TRANSCRIPT_ADMIN_TOKEN')
+    if not token:
+        abort(404)
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+        return jsonify({'error': '未授权'}), 401
+    return None
+
+
+@app.route('/api/sessions/export', methods=['GET'])
+def export_sessions():
+    """
+    对话记录导出接口（需要管理令牌）
+    以JSONL流式返回，可按 since/until（ISO时间，可带时区）和 intent（可多个）过滤
+    """
+    denied = require_admin_token()
+    if denied:
+        return denied
+
+    # 响应开始后就无法再返回错误，时间参数在这里先解析好
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        since = parse_timestamp(since) if since else None
+        until = parse_timestamp(until) if until else None
+    except ValueError:
+        return jsonify({'error': '时间格式错误，应为ISO格式'}), 400
+
+    intents = request.args.getlist('intent') or None
+
+    def generate():
+        for record in iter_records(session_registry, since, until, intents):
+            yield json.dumps(record, ensure_ascii=False) + '\n'
 
-    # 翻译意图
-    if any(keyword in message_lower for keyword in ['翻译', '怎么说', '用法语', '法语怎么', 'translate']):
-        return 'translation'
+    return Response(generate(), content_type='application/x-ndjson; charset=utf-8')
 
-    # 发音意图
-    if any(keyword in message_lower for keyword in ['发音', '怎么读', '读音', 'pronunciation', 'pronounce']):
-        return 'pronunciation'
 
-    # 解释意图
-    if any(keyword in message_lower for keyword in ['是什么意思', '什么意思', '解释', '含义', 'explain', 'meaning']):
-        return 'explanation'
+@app.route('/api/sessions/import', methods=['POST'])
+def import_sessions():
+    """
+    对话记录导入接口（需要管理令牌）
+    请求体为JSONL；先逐行检查并写入临时文件，有一行不合法就整体拒绝，全部合法后再从临时文件导入
+    """
+    denied = require_admin_token()
+    if denied:
+        return denied
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8')
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', encoding='utf-8') as spool:
+        try:
+            validate_jsonl(stream, spool)
+        except ValueError as e:
+            return jsonify({'error': f'记录格式错误: {e}'}), 400
+        spool.seek(0)
+        result = import_records(session_registry, read_jsonl(spool))
+    return jsonify(result)
 
-    # 词汇学习
-    if any(keyword in message_lower for keyword in ['单词', '词汇', '动词', '名词', '形容词', 'word', 'vocabulary']):
-        return 'vocabulary'
 
-    # 语法问题
-    if any(keyword in message_lower for keyword in ['语法', '区别', '用法', '变位', 'grammar', 'difference']):
-        return 'explanation'
+# ===== 辅助函数 =====
 
-    # 默认为对话模式
-    return 'conversation'
+def detect_intent(message):
+    """
+    检测用户意图
+    返回: translation, explanation, pronunciation, vocabulary, conversation
+    """
+    return intent_detector.detect(message).value
 
 
 def generate_response(message, intent, history):
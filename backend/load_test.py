@@ -0,0 +1,309 @@
+"""
+AI法语老师 - 压力测试工具
+模拟多个学习者并发访问后端，输出吞吐量、延迟分位数和错误率（JSON）
+
+用法:
+    python backend/load_test.py --concurrency 20 --duration 60
+    python backend/load_test.py --rate 50 --duration 60 --mix chat=0.6,translate=0.3,pronunciation=0.1
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+# 添加项目路径到系统路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECT_ROOT, 'language-assistant-phase1'))
+
+from mcp.intent_detector import IntentDetector, IntentType
+
+
+# 常用法语词汇，用于拼接问题和发音请求
+FRENCH_WORDS = [
+    'bonjour', 'merci', 'au revoir', 'être', 'avoir', 'aller', 'faire',
+    'je suis', 'comment allez-vous', 'enchanté', 'français', 'croissant'
+]
+CHINESE_PHRASES = ['你好', '谢谢', '我很高兴', '再见', '我爱你', '早上好']
+
+# 各意图的问句模板，{word} 为词汇，{kw} 为意图关键词
+TEMPLATES = {
+    IntentType.TRANSLATION: ["请把'{phrase}'{kw}", "'{phrase}'用法语{kw}？", "{kw}: {phrase}"],
+    IntentType.EXPLANATION: ["{word}和vous有什么{kw}？", "{word}是{kw}？", "请{kw}一下{word}"],
+    IntentType.VOCABULARY: ["{word}这个{kw}", "学习关于{word}的{kw}"],
+    IntentType.PRONUNCIATION: ["{word}{kw}？", "{word}的{kw}是什么"],
+    IntentType.CONVERSATION: ["今天我们学什么？", "如何学习法语？", "给我一些学习建议"],
+}
+
+DEFAULT_MIX = {'chat': 0.7, 'translate': 0.2, 'pronunciation': 0.1}
+
+
+def build_corpus():
+    """
+    根据意图关键词集合生成问题语料
+
+    Returns:
+        dict: 意图 -> 问题列表
+    """
+    keywords = IntentDetector().keywords
+    corpus = {}
+
+    for intent, templates in TEMPLATES.items():
+        questions = []
+        for template in templates:
+            for kw in keywords.get(intent, ['']):
+                for word, phrase in zip(FRENCH_WORDS, CHINESE_PHRASES * 2):
+                    questions.append(template.format(kw=kw, word=word, phrase=phrase))
+        corpus[intent] = sorted(set(questions))
+
+    return corpus
+
+
+def parse_mix(spec):
+    """
+    解析请求比例，如 "chat=0.7,translate=0.2,pronunciation=0.1"
+
+    Returns:
+        dict: 接口 -> 权重
+    """
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"未知的接口类型: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """最近秩法计算分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadGenerator:
+    """压力测试生成器"""
+
+    def __init__(self, base_url, mix, corpus, timeout=30.0, seed=None):
+        """
+        初始化压力测试生成器
+
+        Args:
+            base_url: 后端地址
+            mix: 请求比例
+            corpus: 问题语料
+            timeout: 单次请求超时（秒）
+            seed: 随机种子
+        """
+        self.base_url = base_url.rstrip('/')
+        self.kinds = list(mix.keys())
+        self.weights = [mix[k] for k in self.kinds]
+        self.questions = [q for intent in corpus for q in corpus[intent]]
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(int)
+        self.results_lock = threading.Lock()
+        self.local = threading.local()
+
+    def _session(self):
+        """每个线程复用一个连接"""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _next_request(self):
+        """随机选择下一个请求"""
+        with self.rng_lock:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            question = self.rng.choice(self.questions)
+            word = self.rng.choice(FRENCH_WORDS)
+            phrase = self.rng.choice(CHINESE_PHRASES)
+
+        if kind == 'chat':
+            return kind, '/api/chat', {'message': question, 'history': []}
+        if kind == 'translate':
+            return kind, '/api/translate', {'text': phrase, 'source_lang': 'zh', 'target_lang': 'fr'}
+        return kind, '/api/pronunciation', {'text': word}
+
+    def fire(self, scheduled=None):
+        """
+        发送一次请求并记录结果
+
+        Args:
+            scheduled: 计划发送时间（开环模式下从计划时间起计，避免协同遗漏）
+        """
+        kind, path, payload = self._next_request()
+        start = scheduled if scheduled is not None else time.perf_counter()
+
+        try:
+            response = self._session().post(self.base_url + path, json=payload, timeout=self.timeout)
+            status = response.status_code
+            failed = status >= 400
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+            failed = True
+
+        elapsed = time.perf_counter() - start
+
+        with self.results_lock:
+            self.latencies[kind].append(elapsed)
+            self.status_codes[str(status)] += 1
+            if failed:
+                self.errors[kind] += 1
+
+    def run_closed(self, concurrency, duration, max_requests=None):
+        """
+        闭环模式：固定并发数，每个学习者收到回复后立即发下一条
+
+        Args:
+            concurrency: 并发学习者数量
+            duration: 持续时间（秒）
+            max_requests: 最大请求数（None表示不限）
+        """
+        deadline = time.perf_counter() + duration
+        counter = iter(range(max_requests)) if max_requests else None
+        counter_lock = threading.Lock()
+
+        def learner():
+            while time.perf_counter() < deadline:
+                if counter is not None:
+                    with counter_lock:
+                        if next(counter, None) is None:
+                            return
+                self.fire()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(learner)
+
+    def run_open(self, rate, duration, max_workers=256):
+        """
+        开环模式：按泊松过程以固定到达率发送请求
+
+        Args:
+            rate: 每秒到达的请求数
+            duration: 持续时间（秒）
+            max_workers: 最大并发线程数
+        """
+        start = time.perf_counter()
+        next_at = start
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while next_at < start + duration:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.fire, next_at)
+                with self.rng_lock:
+                    next_at += self.rng.expovariate(rate)
+
+    def report(self, elapsed, config):
+        """
+        生成测试报告
+
+        Args:
+            elapsed: 实际耗时（秒）
+            config: 测试配置
+
+        Returns:
+            dict: 报告
+        """
+        def summarize(values, errors):
+            values = sorted(values)
+            count = len(values)
+            return {
+                'requests': count,
+                'errors': errors,
+                'error_rate': errors / count if count else 0.0,
+                'throughput_rps': count / elapsed if elapsed else 0.0,
+                'latency_ms': {
+                    'mean': sum(values) / count * 1000 if count else 0.0,
+                    'p50': percentile(values, 50) * 1000,
+                    'p90': percentile(values, 90) * 1000,
+                    'p95': percentile(values, 95) * 1000,
+                    'p99': percentile(values, 99) * 1000,
+                    'max': (values[-1] if values else 0.0) * 1000
+                }
+            }
+
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        overall = summarize(all_latencies, sum(self.errors.values()))
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'config': config,
+            'duration_seconds': elapsed,
+            'overall': overall,
+            'endpoints': {
+                kind: summarize(self.latencies[kind], self.errors[kind])
+                for kind in sorted(self.latencies)
+            },
+            'status_codes': dict(self.status_codes)
+        }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="AI法语老师后端压力测试")
+    parser.add_argument('--url', default='http://localhost:5000', help='后端地址')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--concurrency', type=int, default=10, help='并发学习者数量（闭环模式）')
+    group.add_argument('--rate', type=float, help='每秒到达请求数（开环模式）')
+    parser.add_argument('--duration', type=float, default=30.0, help='持续时间（秒）')
+    parser.add_argument('--requests', type=int, help='最大请求数（仅闭环模式）')
+    parser.add_argument('--mix', default='chat=0.7,translate=0.2,pronunciation=0.1', help='请求比例')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单次请求超时（秒）')
+    parser.add_argument('--seed', type=int, help='随机种子')
+    parser.add_argument('--output', help='报告输出文件（默认输出到标准输出）')
+    args = parser.parse_args()
+
+    # 报告输出到标准输出，屏蔽语料构建时的日志
+    logging.getLogger('FrenchAssistant').setLevel(logging.WARNING)
+
+    mix = parse_mix(args.mix)
+    generator = LoadGenerator(args.url, mix, build_corpus(), timeout=args.timeout, seed=args.seed)
+
+    config = {
+        'url': args.url,
+        'mode': 'open' if args.rate else 'closed',
+        'concurrency': None if args.rate else args.concurrency,
+        'rate': args.rate,
+        'duration': args.duration,
+        'mix': mix
+    }
+
+    start = time.perf_counter()
+    if args.rate:
+        generator.run_open(args.rate, args.duration)
+    else:
+        generator.run_closed(args.concurrency, args.duration, args.requests)
+    elapsed = time.perf_counter() - start
+
+    report = json.dumps(generator.report(elapsed, config), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+录音缓冲区基准测试
+比较逐块保存bytes再拼接的旧做法与预分配的RecordingBuffer，用tracemalloc统计每秒音频的内存分配
+
+两种做法都会为每块声卡数据得到一个新的bytes（模拟PortAudio）。旧做法一直保留这些块，停止时再拼接复制一份；
+RecordingBuffer写入后即可释放这些块，只在容量不足时倍增，停止时返回视图
+
+用法:
+    python benchmarks/bench_capture_buffer.py [--seconds 60] [--chunk 1024] [--buffer-seconds 30]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.audio_capture import RecordingBuffer
+
+SAMPLE_RATE = 16000
+
+
+class LegacyFrames:
+    """旧做法：每块bytes放进列表，停止时join"""
+
+    def __init__(self):
+        self.frames = []
+
+    def append(self, data):
+        self.frames.append(data)
+
+    def view(self):
+        return b"".join(self.frames)
+
+
+def measure(recorder, source, count):
+    """
+    模拟录音count块并统计内存
+
+    Returns:
+        tuple: (停止前存活的录音分配块数, 停止时新分配的字节数, 峰值内存字节数, 耗时秒数)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(count):
+        recorder.append(source.tobytes())
+    elapsed = time.perf_counter() - start
+
+    # 存活的录音内存块（不小于一块音频的分配）
+    live = sum(1 for trace in tracemalloc.take_snapshot().traces if trace.size >= source.nbytes)
+
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    audio = recorder.view()
+    elapsed += time.perf_counter() - start
+    copied = tracemalloc.get_traced_memory()[0] - before
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert len(audio) == count * source.nbytes
+    return live, copied, peak, elapsed
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="录音缓冲区基准测试")
+    parser.add_argument("--seconds", type=float, default=60.0, help="模拟录音时长（秒）")
+    parser.add_argument("--chunk", type=int, default=1024, help="录音块大小（采样数）")
+    parser.add_argument("--buffer-seconds", type=float, default=30.0, help="RecordingBuffer初始容量（秒）")
+    args = parser.parse_args()
+
+    source = np.random.default_rng(0).integers(-3000, 3000, args.chunk, dtype=np.int16)
+    count = int(args.seconds * SAMPLE_RATE / args.chunk)
+    cases = [
+        ("旧实现（列表+join）", LegacyFrames),
+        ("RecordingBuffer", lambda: RecordingBuffer(int(args.buffer_seconds * SAMPLE_RATE) * 2)),
+    ]
+
+    print(f"\n录音时长: {args.seconds:.0f}秒, {count} 块, 每块 {source.nbytes} 字节\n")
+    print(f"  {'实现':<20} {'存活分配/秒':>12} {'停止时复制(KB)':>16} {'峰值内存/秒(KB)':>16} {'耗时(毫秒)':>12}")
+    for name, factory in cases:
+        live, copied, peak, elapsed = measure(factory(), source, count)
+        print(
+            f"  {name:<20} {live / args.seconds:>12.2f} {copied / 1024:>16.1f} "
+            f"{peak / 1024 / args.seconds:>16.1f} {elapsed * 1000:>12.2f}"
+        )
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+会话内存基准测试
+用tracemalloc统计每个会话（填满历史）的内存占用，对比原先基于__dict__和datetime的消息对象
+
+用法:
+    python benchmarks/bench_conversation_memory.py [--sessions 10000] [--max-history 10]
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.conversation_manager import ConversationManager
+from utils.logger import logger
+
+
+TURNS = [
+    ("user", "请把'今天天气很好'翻译成法语"),
+    ("assistant", "Il fait beau aujourd'hui. 其中'il fait'用于描述天气。"),
+    ("user", "beau怎么发音？"),
+    ("assistant", "beau读作[bo]，eau组合发[o]音。"),
+]
+
+
+class LegacyMessage:
+    """原实现：普通对象，带__dict__和datetime"""
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.timestamp = datetime.now()
+
+
+class LegacyConversation:
+    """原实现：每次查询都复制整个deque"""
+
+    def __init__(self, max_history):
+        self.messages = deque(maxlen=max_history)
+        self.session_start = datetime.now()
+
+    def add_message(self, role, content):
+        self.messages.append(LegacyMessage(role, content))
+
+    def get_formatted_history(self, limit):
+        return [{"role": m.role, "content": m.content} for m in list(self.messages)[-limit:]]
+
+    def get_stats(self):
+        return {
+            "total_messages": len(self.messages),
+            "user_messages": sum(1 for m in self.messages if m.role == "user"),
+            "assistant_messages": sum(1 for m in self.messages if m.role == "assistant"),
+            "session_duration_seconds": (datetime.now() - self.session_start).total_seconds(),
+            "session_start": self.session_start.isoformat()
+        }
+
+
+def fill(manager, max_history):
+    """把会话历史填满"""
+    for i in range(max_history):
+        role, content = TURNS[i % len(TURNS)]
+        manager.add_message(role, content)
+
+
+def measure(factory, sessions, max_history):
+    """返回每个会话的平均内存占用（字节）"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    holder = []
+    for _ in range(sessions):
+        manager = factory(max_history)
+        fill(manager, max_history)
+        holder.append(manager)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return total / sessions, holder[0]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="会话内存基准测试")
+    parser.add_argument("--sessions", type=int, default=10000, help="会话数量")
+    parser.add_argument("--max-history", type=int, default=10, help="每个会话的历史长度")
+    parser.add_argument("--iterations", type=int, default=20000, help="查询耗时测试的重复次数")
+    args = parser.parse_args()
+
+    # 大量创建会话时不输出初始化日志
+    logger.setLevel(logging.WARNING)
+
+    print(f"\n会话数: {args.sessions}, 每会话消息数: {args.max_history}")
+    for name, factory in (("原实现", LegacyConversation), ("ConversationManager", ConversationManager)):
+        per_session, sample = measure(factory, args.sessions, args.max_history)
+        query = timeit.timeit(
+            lambda: (sample.get_formatted_history(5), sample.get_stats()),
+            number=args.iterations
+        )
+        print(f"  {name:<20} {per_session:8.0f} 字节/会话  "
+              f"查询 {query / args.iterations * 1e6:6.2f} µs")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+意图匹配基准测试
+对比逐关键词子串扫描与编译后的Aho-Corasick自动机的单条消息耗时
+
+用法:
+    python benchmarks/bench_intent_matcher.py [--iterations 20000]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.intent_detector import IntentDetector, IntentType
+from mcp.lexicon import CompiledLexicon
+
+
+MESSAGES = [
+    "请把'你好'翻译成法语",
+    "bonjour怎么发音？",
+    "tu和vous有什么区别？",
+    "法语里的être是什么意思？",
+    "今天天气真好",
+    "我想知道passé composé和imparfait在用法上的区别，能举几个例子吗？",
+    "Comment dit-on 'je suis très content de vous rencontrer' en français ?",
+]
+
+
+def naive_analyze(keywords, text):
+    """原实现：首个命中即返回，再重新扫描一遍计算置信度"""
+    text_lower = text.lower()
+    intent = IntentType.CONVERSATION
+    for intent_type, words in keywords.items():
+        if any(word in text_lower for word in words):
+            intent = intent_type
+            break
+    if intent not in keywords:
+        return intent, 0.5
+    matches = sum(1 for word in keywords[intent] if word in text_lower)
+    return intent, min(matches * 0.3, 1.0)
+
+
+def naive_scores(keywords, text):
+    """逐关键词子串扫描得到每种意图的完整得分"""
+    text_lower = text.lower()
+    return {
+        intent: sum(1 for word in words if word in text_lower)
+        for intent, words in keywords.items()
+    }
+
+
+def expand_lexicon(keywords, factor):
+    """把词表扩大factor倍，模拟更大的可配置词表"""
+    return {
+        intent: words + [f"{word}{i}" for i in range(factor - 1) for word in words]
+        for intent, words in keywords.items()
+    }
+
+
+def bench(name, func, iterations, total):
+    best = min(timeit.repeat(func, number=iterations, repeat=3))
+    print(f"  {name:<22} {best / total * 1e6:8.2f} µs/条")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="意图匹配基准测试")
+    parser.add_argument("--iterations", type=int, default=20000, help="每条消息的重复次数")
+    args = parser.parse_args()
+
+    total = args.iterations * len(MESSAGES)
+
+    for factor in (1, 10):
+        detector = IntentDetector(use_classifier=False)
+        keywords = expand_lexicon(detector.keywords, factor)
+        detector._lexicon = CompiledLexicon(keywords, f"x{factor}")
+
+        print(f"\n关键词数: {len(detector.matcher)}, 消息数: {len(MESSAGES)}, 迭代: {args.iterations}")
+
+        bench("子串扫描（首个命中）", lambda: [naive_analyze(keywords, t) for t in MESSAGES],
+              args.iterations, total)
+        bench("子串扫描（完整得分）", lambda: [naive_scores(keywords, t) for t in MESSAGES],
+              args.iterations, total)
+        bench("Aho-Corasick（完整得分）", lambda: [detector.score(t) for t in MESSAGES],
+              args.iterations, total)
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+语音识别引擎基准测试
+对同一段音频分别用各识别引擎识别，报告加载耗时和实时率（识别耗时 / 音频时长，越小越快）
+
+用法:
+    python benchmarks/bench_stt_engines.py [--engines whisper,faster-whisper,fake] [--model base]
+                                           [--audio tmp/test_recording.wav] [--seconds 10] [--iterations 3]
+"""
+
+import argparse
+import sys
+import time
+import wave
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import available_engines
+from speech.speech_to_text.recognizer import SpeechRecognizer, pcm16_to_float32
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+
+
+def load_audio(path, seconds):
+    """读取WAV文件；未指定时生成一段带噪声的合成音频"""
+    if path:
+        with wave.open(str(path), "rb") as wf:
+            return pcm16_to_float32(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    tone = 0.2 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 2 * t) > 0)
+    return (tone + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def bench_engine(name, model_name, language, audio, iterations):
+    """测试单个引擎，返回 (加载耗时, 最佳实时率, 识别文本)"""
+    recognizer = SpeechRecognizer(model_name=model_name, language=language, engine=name)
+
+    start = time.perf_counter()
+    recognizer.load_model()
+    load_seconds = time.perf_counter() - start
+
+    # 第一次识别包含初始化开销，不计入
+    text = recognizer.recognize_array(audio)
+    duration = len(audio) / WHISPER_SAMPLE_RATE
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        recognizer.recognize_array(audio)
+        best = min(best, time.perf_counter() - start)
+    return load_seconds, best / duration, text
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="语音识别引擎基准测试")
+    parser.add_argument("--engines", default=",".join(available_engines()), help="逗号分隔的引擎名称")
+    parser.add_argument("--model", default="base", help="模型名称")
+    parser.add_argument("--language", default="zh", help="识别语言")
+    parser.add_argument("--audio", help="WAV音频文件（默认使用合成音频）")
+    parser.add_argument("--seconds", type=float, default=10.0, help="合成音频时长（秒）")
+    parser.add_argument("--iterations", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    audio = load_audio(args.audio, args.seconds)
+    print(f"\n音频时长: {len(audio) / WHISPER_SAMPLE_RATE:.1f}秒, 模型: {args.model}\n")
+    print(f"  {'引擎':<16} {'加载(秒)':>10} {'实时率':>8}  识别结果")
+
+    for name in args.engines.split(","):
+        try:
+            load_seconds, rtf, text = bench_engine(name, args.model, args.language, audio, args.iterations)
+        except Exception as e:
+            print(f"  {name:<16} 跳过: {e}")
+            continue
+        print(f"  {name:<16} {load_seconds:>10.2f} {rtf:>8.3f}  {text[:40]}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+语音识别输入转换基准测试
+对比原先的"写临时WAV + Whisper通过ffmpeg读回"与直接在内存中把PCM转换成float32
+
+用法:
+    python benchmarks/bench_stt_input.py [--seconds 5] [--iterations 50]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import timeit
+import wave
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import whisper
+
+from speech.speech_to_text.recognizer import pcm16_to_float32
+
+
+def temp_wav_path(audio_data, sample_rate):
+    """原实现：写临时WAV，再由Whisper调用ffmpeg解码并重采样"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+        with wave.open(tmp_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(audio_data)
+    try:
+        return whisper.load_audio(tmp_path, sr=sample_rate)
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def temp_wav_roundtrip(audio_data, sample_rate):
+    """原实现中不依赖ffmpeg的部分：写临时WAV再读回"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+        with wave.open(tmp_path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(audio_data)
+    try:
+        with wave.open(tmp_path, "rb") as wf:
+            return pcm16_to_float32(wf.readframes(wf.getnframes()))
+    finally:
+        Path(tmp_path).unlink(missing_ok=True)
+
+
+def bench(name, func, iterations):
+    best = min(timeit.repeat(func, number=iterations, repeat=3)) / iterations
+    print(f"  {name:<28} {best * 1000:9.3f} ms/次")
+    return best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="语音识别输入转换基准测试")
+    parser.add_argument("--seconds", type=float, default=5.0, help="音频时长（秒）")
+    parser.add_argument("--iterations", type=int, default=50, help="重复次数")
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    audio_data = rng.integers(-8000, 8000, int(args.seconds * sample_rate), dtype=np.int16).tobytes()
+
+    print(f"\n音频时长: {args.seconds}秒 ({len(audio_data)} 字节)")
+
+    in_memory = bench("内存转换 (pcm16_to_float32)", lambda: pcm16_to_float32(audio_data), args.iterations)
+
+    roundtrip = bench("临时WAV写入+读回（不含ffmpeg）", lambda: temp_wav_roundtrip(audio_data, sample_rate),
+                      args.iterations)
+    print(f"  仅磁盘往返的开销: {roundtrip / in_memory:.0f}x")
+
+    if shutil.which("ffmpeg"):
+        old = bench("临时WAV + ffmpeg", lambda: temp_wav_path(audio_data, sample_rate), args.iterations)
+        print(f"  加速: {old / in_memory:.0f}x")
+
+        expected = temp_wav_path(audio_data, sample_rate)
+        assert np.allclose(expected, pcm16_to_float32(audio_data)), "两种路径结果应一致"
+    else:
+        print("  未安装ffmpeg，跳过原实现对比")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+语音活动检测基准测试
+比较逐块调用的旧实现与按帧向量化的FrameVAD（批量和流式），报告吞吐量（每秒处理的音频秒数）
+
+用法:
+    python benchmarks/bench_vad.py [--seconds 60] [--chunk 1024] [--iterations 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.vad import FrameVAD
+
+SAMPLE_RATE = 16000
+
+
+def make_audio(seconds):
+    """生成说话和停顿交替、带背景噪声的合成音频"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voice = 6000 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+    return np.clip(voice + rng.normal(0, 200, len(t)), -32768, 32767).astype(np.int16).tobytes()
+
+
+def legacy_vad(audio, chunk, threshold=300.0):
+    """旧实现：每块一次Python调用，计算整块的RMS"""
+    results = []
+    for offset in range(0, len(audio), chunk * 2):
+        samples = np.frombuffer(audio[offset:offset + chunk * 2], dtype=np.int16).astype(np.float64)
+        results.append(np.sqrt(np.mean(samples ** 2)) > threshold)
+    return results
+
+
+def stream_vad(audio, chunk):
+    """FrameVAD流式处理：按录音块逐块送入"""
+    engine = FrameVAD()
+    return [engine.process(audio[offset:offset + chunk * 2]) for offset in range(0, len(audio), chunk * 2)]
+
+
+def best_time(func, iterations):
+    """多次运行取最短耗时"""
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="语音活动检测基准测试")
+    parser.add_argument("--seconds", type=float, default=60.0, help="合成音频时长（秒）")
+    parser.add_argument("--chunk", type=int, default=1024, help="录音块大小（采样数）")
+    parser.add_argument("--iterations", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    audio = make_audio(args.seconds)
+    cases = [
+        ("旧实现（逐块RMS）", lambda: legacy_vad(audio, args.chunk)),
+        ("FrameVAD 流式", lambda: stream_vad(audio, args.chunk)),
+        ("FrameVAD 批量", lambda: FrameVAD().analyze(audio)),
+    ]
+
+    print(f"\n音频时长: {args.seconds:.0f}秒, 录音块: {args.chunk} 采样\n")
+    print(f"  {'实现':<20} {'耗时(毫秒)':>12} {'吞吐量(x实时)':>14}")
+    for name, func in cases:
+        seconds = best_time(func, args.iterations)
+        print(f"  {name:<20} {seconds * 1000:>12.2f} {args.seconds / seconds:>14.0f}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,43 @@ LLM API客户端模块
 处理与Qwen API的通信
 """
 
+import json
+import time
 import requests
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from utils.logger import logger
+from utils.metrics import metrics
 from utils.error_handler import APIError, retry, handle_errors
-from llm.config import llm_config
+from llm.config import LLMConfig, llm_config
 from llm.prompt_templates import PromptTemplates
 
+LLM_LATENCY = metrics.histogram(
+    "llm_request_duration_seconds", "LLM对话请求耗时（秒，含重试）", ["intent"]
+)
+LLM_ERRORS = metrics.counter(
+    "llm_errors_total", "LLM对话请求失败次数", ["intent"]
+)
+
 
 class LLMClient:
     """LLM API客户端"""
 
-    def __init__(self):
-        """初始化客户端"""
-        if not llm_config:
+    def __init__(self, config: Optional[LLMConfig] = None):
+        """
+        初始化客户端
+
+        Args:
+            config: LLM配置（默认使用全局配置）
+        """
+        config = config or llm_config
+        if not config:
             raise APIError("LLM配置未正确加载")
 
-        self.api_key = llm_config.api_key
-        self.api_url = llm_config.api_url
-        self.model = llm_config.model
-        self.temperature = llm_config.temperature
-        self.max_tokens = llm_config.max_tokens
+        self.api_key = config.api_key
+        self.api_url = config.api_url
+        self.model = config.model
+        self.temperature = config.temperature
+        self.max_tokens = config.max_tokens
 
         logger.info(f"LLM客户端初始化完成 (模型: {self.model})")
 
@@ -130,28 +146,88 @@ class LLMClient:
             history
         )
 
-        # 发送请求
-        api_response = self._make_request(messages)
+        start = time.perf_counter()
+        try:
+            # 发送请求
+            api_response = self._make_request(messages)
 
-        # 提取响应
-        response_text = self._extract_response(api_response)
+            # 提取响应
+            response_text = self._extract_response(api_response)
+        except Exception:
+            LLM_ERRORS.labels(intent_type).inc()
+            raise
+        finally:
+            LLM_LATENCY.labels(intent_type).observe(time.perf_counter() - start)
 
         logger.info(f"LLM响应: {response_text[:100]}...")
         return response_text
 
-    def chat_stream(self, user_message: str, intent_type: str = "conversation"):
+    def chat_stream(
+        self,
+        user_message: str,
+        intent_type: str = "conversation",
+        history: Optional[List[Dict]] = None
+    ) -> Iterator[str]:
         """
-        流式对话（未来实现）
+        流式对话（DashScope SSE，增量输出）
 
         Args:
             user_message: 用户消息
             intent_type: 意图类型
+            history: 对话历史
 
         Yields:
             str: 响应片段
+
+        Raises:
+            APIError: API调用失败
         """
-        # TODO: 实现流式响应
-        raise NotImplementedError("流式响应功能尚未实现")
+        messages = PromptTemplates.format_messages(user_message, intent_type, history)
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+            "X-DashScope-SSE": "enable"
+        }
+        payload = {
+            "model": self.model,
+            "input": {
+                "messages": messages
+            },
+            "parameters": {
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+                "incremental_output": True
+            }
+        }
+
+        start = time.perf_counter()
+        try:
+            with requests.post(
+                self.api_url, headers=headers, json=payload, timeout=30, stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    # SSE事件中只有data行携带内容
+                    if not line or not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[len("data:"):])
+                    if "code" in event and "output" not in event:
+                        raise APIError(f"API返回错误: {event.get('message', event['code'])}")
+                    text = event.get("output", {}).get("text", "")
+                    if text:
+                        yield text
+        except APIError:
+            LLM_ERRORS.labels(intent_type).inc()
+            raise
+        except requests.exceptions.Timeout:
+            LLM_ERRORS.labels(intent_type).inc()
+            raise APIError("API请求超时")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            LLM_ERRORS.labels(intent_type).inc()
+            raise APIError(f"API请求失败: {e}")
+        finally:
+            LLM_LATENCY.labels(intent_type).observe(time.perf_counter() - start)
 
 
 # 使用示例
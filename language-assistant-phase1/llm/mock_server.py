@@ -0,0 +1,350 @@
+"""
+离线LLM模拟服务模块
+模拟DashScope文本生成接口，用于压测和基准测试
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from utils.logger import logger
+
+
+GENERATION_PATH = "/api/v1/services/aigc/text-generation/generation"
+
+# 固定回答：按用户消息中的关键词匹配，保证同一问题总是得到同一回答
+CANNED_ANSWERS = [
+    (("你好", "hello"), "法语翻译：**Bonjour** [bɔ̃ʒuʁ]，非正式场合也可以说 **Salut** [saly]。"),
+    (("发音", "怎么读", "prononciation"), "**Bonjour** 的音标是 [bɔ̃ʒuʁ]，其中 on 是鼻化元音。"),
+    (("tu", "vous", "区别"), "**Tu** 用于熟人之间，**Vous** 用于正式场合或复数。"),
+    (("单词", "词汇", "mot"), "**être**（动词）：是。变位：je suis, tu es, il est。"),
+]
+
+DEFAULT_ANSWER = "我是你的AI法语老师，可以帮你翻译、讲解语法和指导发音。Commençons !"
+
+TOKEN_PATTERN = re.compile(r"[A-Za-zÀ-ÿ']+|\s+|.", re.DOTALL)
+
+
+class LatencyModel:
+    """首字延迟分布"""
+
+    def __init__(self, kind: str = "fixed", params: Tuple[float, ...] = (0.0,)):
+        """
+        初始化延迟分布
+
+        Args:
+            kind: 分布类型 (fixed, uniform, exp, lognormal)
+            params: 分布参数（秒）
+        """
+        if kind not in ("fixed", "uniform", "exp", "lognormal"):
+            raise ValueError(f"未知的延迟分布: {kind}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """
+        从字符串解析延迟分布
+
+        Args:
+            spec: 如 "fixed:0.2", "uniform:0.1,0.5", "exp:0.3", "lognormal:-1.5,0.5"
+
+        Returns:
+            LatencyModel: 延迟分布
+        """
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(p) for p in raw.split(",") if p) or (0.0,)
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """
+        采样一次延迟
+
+        Args:
+            rng: 随机数生成器
+
+        Returns:
+            float: 延迟（秒）
+        """
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "exp":
+            return rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return math.exp(rng.gauss(self.params[0], self.params[1]))
+
+
+class MockLLMServer:
+    """DashScope协议的本地模拟服务"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        latency: Optional[LatencyModel] = None,
+        token_rate: float = 0.0,
+        chunk_tokens: int = 4,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        seed: Optional[int] = 0
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0表示随机端口）
+            latency: 首字延迟分布
+            token_rate: 每秒生成的token数（0表示不限速）
+            chunk_tokens: 流式响应每个事件包含的token数
+            error_rate: 返回500错误的概率
+            throttle_rate: 返回429限流的概率
+            seed: 随机种子（None表示不固定）
+        """
+        self.latency = latency or LatencyModel()
+        self.token_rate = token_rate
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread = None
+
+        self.request_count = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+        logger.info(f"LLM模拟服务初始化完成 (地址: {self.url})")
+
+    @property
+    def url(self) -> str:
+        """生成接口的完整URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{GENERATION_PATH}"
+
+    @staticmethod
+    def answer_for(messages: List[Dict]) -> str:
+        """
+        根据最后一条用户消息选择固定回答
+
+        Args:
+            messages: 消息列表
+
+        Returns:
+            str: 回答文本
+        """
+        user_text = ""
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                user_text = message.get("content", "").lower()
+                break
+
+        for keywords, answer in CANNED_ANSWERS:
+            if any(keyword in user_text for keyword in keywords):
+                return answer
+        return DEFAULT_ANSWER
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """把文本切成近似token（拉丁单词整体，其他字符逐个）"""
+        return TOKEN_PATTERN.findall(text)
+
+    def _draw(self) -> Tuple[float, float, float]:
+        """在锁内采样一次请求所需的随机数，保证固定种子下结果可复现"""
+        with self._rng_lock:
+            self.request_count += 1
+            return self._rng.random(), self._rng.random(), self.latency.sample(self._rng)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug("模拟服务: " + format % args)
+
+            def _send_json(self, status: int, body: Dict):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                if self.path.split("?")[0] != GENERATION_PATH:
+                    self._send_json(404, {"code": "NotFound", "message": "未知接口"})
+                    return
+
+                request_id = str(uuid.uuid4())
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    messages = body["input"]["messages"]
+                except (ValueError, KeyError, TypeError):
+                    self._send_json(400, {
+                        "code": "InvalidParameter",
+                        "message": "请求体格式错误",
+                        "request_id": request_id
+                    })
+                    return
+
+                fault, throttle, delay = server._draw()
+                if throttle < server.throttle_rate:
+                    self._send_json(429, {
+                        "code": "Throttling.RateQuota",
+                        "message": "Requests rate limit exceeded, please try again later.",
+                        "request_id": request_id
+                    })
+                    return
+                if fault < server.error_rate:
+                    self._send_json(500, {
+                        "code": "InternalError",
+                        "message": "Injected failure.",
+                        "request_id": request_id
+                    })
+                    return
+
+                time.sleep(delay)
+
+                parameters = body.get("parameters", {})
+                tokens = server.tokenize(server.answer_for(messages))
+                input_tokens = sum(len(m.get("content", "")) for m in messages)
+
+                streaming = (
+                    self.headers.get("X-DashScope-SSE", "").lower() == "enable"
+                    or "text/event-stream" in self.headers.get("Accept", "")
+                )
+                if streaming:
+                    self._stream(tokens, input_tokens, request_id,
+                                 parameters.get("incremental_output", False))
+                else:
+                    if server.token_rate > 0:
+                        time.sleep(len(tokens) / server.token_rate)
+                    self._send_json(200, {
+                        "output": {"text": "".join(tokens), "finish_reason": "stop"},
+                        "usage": {
+                            "input_tokens": input_tokens,
+                            "output_tokens": len(tokens),
+                            "total_tokens": input_tokens + len(tokens)
+                        },
+                        "request_id": request_id
+                    })
+
+            def _stream(self, tokens, input_tokens, request_id, incremental):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream;charset=UTF-8")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                step = server.chunk_tokens
+                sent = 0
+                for event_id, start in enumerate(range(0, len(tokens), step), 1):
+                    chunk = tokens[start:start + step]
+                    if server.token_rate > 0:
+                        time.sleep(len(chunk) / server.token_rate)
+                    sent += len(chunk)
+                    done = sent >= len(tokens)
+                    text = "".join(chunk) if incremental else "".join(tokens[:sent])
+                    data = {
+                        "output": {"text": text, "finish_reason": "stop" if done else "null"},
+                        "usage": {
+                            "input_tokens": input_tokens,
+                            "output_tokens": sent,
+                            "total_tokens": input_tokens + sent
+                        },
+                        "request_id": request_id
+                    }
+                    event = (
+                        f"id:{event_id}\nevent:result\n:HTTP_STATUS/200\n"
+                        f"data:{json.dumps(data, ensure_ascii=False)}\n\n"
+                    )
+                    try:
+                        self.wfile.write(event.encode("utf-8"))
+                        self.wfile.flush()
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        """在后台线程启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("LLM模拟服务已启动")
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        logger.info("LLM模拟服务已停止")
+
+    def serve_forever(self):
+        """在当前线程运行服务"""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器退出"""
+        self.stop()
+
+
+# 独立运行
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    parser = argparse.ArgumentParser(description="离线LLM模拟服务 (DashScope协议)")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--latency", default="fixed:0",
+                        help="首字延迟分布，如 fixed:0.2 / uniform:0.1,0.5 / exp:0.3 / lognormal:-1.5,0.5")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="每秒token数（0为不限速）")
+    parser.add_argument("--chunk-tokens", type=int, default=4, help="流式响应每个事件的token数")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500错误注入概率")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429限流注入概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=LatencyModel.parse(args.latency),
+        token_rate=args.token_rate,
+        chunk_tokens=args.chunk_tokens,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed
+    )
+
+    print(f"🤖 LLM模拟服务: {server.url}")
+    print(f"   设置 QWEN_API_URL={server.url} 即可让LLMClient使用该服务")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
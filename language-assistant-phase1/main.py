@@ -26,6 +26,11 @@ def main():
         default="cli",
         help="交互模式: cli (命令行) 或 voice (语音)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="命令行模式下边生成边显示响应"
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -41,7 +46,7 @@ def main():
     try:
         if args.mode == "cli":
             # 命令行界面模式
-            interface = CLIInterface()
+            interface = CLIInterface(stream=args.stream)
             interface.run()
         elif args.mode == "voice":
             # 语音交互模式
@@ -3,38 +3,96 @@
 管理对话历史和上下文
 """
 
-from typing import List, Dict, Optional
-from datetime import datetime
+import time
 from collections import deque
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import List, Dict, Optional, Union
 from utils.logger import logger
 
 
+# 单调时钟与墙上时钟的差值，用于把单调时间戳换算成日期
+_WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+
+
+def _to_datetime(monotonic_ts: float) -> datetime:
+    """把单调时间戳换算成本地时间"""
+    return datetime.fromtimestamp(monotonic_ts + _WALL_CLOCK_OFFSET)
+
+
+def _to_monotonic(moment: datetime) -> float:
+    """把日期换算成单调时间戳"""
+    return moment.timestamp() - _WALL_CLOCK_OFFSET
+
+
+class Role(str, Enum):
+    """消息角色"""
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
+
+
 class Message:
-    """消息类"""
+    """消息类（使用__slots__，大量会话并存时减少内存占用）"""
+
+    __slots__ = ("role", "content", "created", "intent")
 
-    def __init__(self, role: str, content: str, timestamp: Optional[datetime] = None):
+    def __init__(
+        self,
+        role: Union[Role, str],
+        content: str,
+        created: Optional[float] = None,
+        intent: Optional[str] = None
+    ):
         """
         初始化消息
 
         Args:
             role: 角色 ('user' 或 'assistant')
             content: 消息内容
-            timestamp: 时间戳
+            created: 单调时钟时间戳（time.monotonic()）
+            intent: 该轮对话的意图
         """
-        self.role = role
+        self.role = Role(role)
         self.content = content
-        self.timestamp = timestamp or datetime.now()
+        self.created = time.monotonic() if created is None else created
+        self.intent = intent
+
+    @property
+    def timestamp(self) -> datetime:
+        """消息时间"""
+        return _to_datetime(self.created)
 
     def to_dict(self) -> Dict:
         """转换为字典格式"""
-        return {
-            "role": self.role,
+        data = {
+            "role": self.role.value,
             "content": self.content,
             "timestamp": self.timestamp.isoformat()
         }
+        if self.intent is not None:
+            data["intent"] = self.intent
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        """
+        从字典恢复消息（to_dict的逆操作）
+
+        Args:
+            data: 包含role、content和可选timestamp、intent的字典
+
+        Returns:
+            Message: 消息对象
+        """
+        created = None
+        if data.get("timestamp"):
+            created = _to_monotonic(datetime.fromisoformat(data["timestamp"]))
+        return cls(data["role"], data["content"], created, data.get("intent"))
 
     def __repr__(self):
-        return f"Message(role={self.role}, content={self.content[:30]}...)"
+        return f"Message(role={self.role.value}, content={self.content[:30]}...)"
 
 
 class ConversationManager:
@@ -49,32 +107,64 @@ class ConversationManager:
         """
         self.max_history = max_history
         self.messages = deque(maxlen=max_history)
-        self.session_start = datetime.now()
-        logger.info(f"对话管理器初始化完成 (最大历史: {max_history})")
+        self._started = time.monotonic()
+        # 按角色增量计数，get_stats不再遍历历史
+        self._role_counts = dict.fromkeys(Role, 0)
+        logger.debug(f"对话管理器初始化完成 (最大历史: {max_history})")
 
-    def add_message(self, role: str, content: str) -> Message:
+    def add_message(self, role: str, content: str, intent: Optional[str] = None) -> Message:
         """
         添加消息到历史记录
 
         Args:
             role: 角色 ('user' 或 'assistant')
             content: 消息内容
+            intent: 该轮对话的意图
 
         Returns:
             Message: 创建的消息对象
         """
-        message = Message(role, content)
+        message = self.append(Message(role, content, intent=intent))
+        logger.debug(f"添加消息: {message.role.value} - {content[:50]}...")
+        return message
+
+    def append(self, message: Message) -> Message:
+        """
+        追加已有的消息对象（保留其时间戳，用于导入和恢复）
+
+        Args:
+            message: 消息对象
+
+        Returns:
+            Message: 追加的消息对象
+        """
+        if len(self.messages) == self.max_history:
+            # deque满时append会挤掉最早的一条
+            self._role_counts[self.messages[0].role] -= 1
         self.messages.append(message)
-        logger.debug(f"添加消息: {role} - {content[:50]}...")
+        self._role_counts[message.role] += 1
         return message
 
-    def add_user_message(self, content: str) -> Message:
+    def add_user_message(self, content: str, intent: Optional[str] = None) -> Message:
         """添加用户消息"""
-        return self.add_message("user", content)
+        return self.add_message(Role.USER, content, intent)
 
-    def add_assistant_message(self, content: str) -> Message:
+    def add_assistant_message(self, content: str, intent: Optional[str] = None) -> Message:
         """添加助手消息"""
-        return self.add_message("assistant", content)
+        return self.add_message(Role.ASSISTANT, content, intent)
+
+    @property
+    def session_start(self) -> datetime:
+        """会话开始时间"""
+        return _to_datetime(self._started)
+
+    def _tail(self, count: int) -> List[Message]:
+        """取最近count条消息，只访问deque尾部，不复制整个历史"""
+        if count >= len(self.messages):
+            return list(self.messages)
+        tail = list(islice(reversed(self.messages), count))
+        tail.reverse()
+        return tail
 
     def get_history(self, limit: Optional[int] = None) -> List[Message]:
         """
@@ -87,7 +177,7 @@ class ConversationManager:
             List[Message]: 消息列表
         """
         if limit:
-            return list(self.messages)[-limit:]
+            return self._tail(limit)
         return list(self.messages)
 
     def get_formatted_history(self, limit: Optional[int] = None) -> List[Dict]:
@@ -101,7 +191,7 @@ class ConversationManager:
             List[Dict]: 格式化的消息列表
         """
         messages = self.get_history(limit)
-        return [{"role": msg.role, "content": msg.content} for msg in messages]
+        return [{"role": msg.role.value, "content": msg.content} for msg in messages]
 
     def get_context_window(self, window_size: int = 5) -> List[Message]:
         """
@@ -113,12 +203,15 @@ class ConversationManager:
         Returns:
             List[Message]: 最近的消息列表
         """
-        return list(self.messages)[-window_size:]
+        if window_size <= 0:
+            return []
+        return self._tail(window_size)
 
     def clear_history(self):
         """清空对话历史"""
         self.messages.clear()
-        self.session_start = datetime.now()
+        self._role_counts = dict.fromkeys(Role, 0)
+        self._started = time.monotonic()
         logger.info("对话历史已清空")
 
     def get_stats(self) -> Dict:
@@ -128,18 +221,47 @@ class ConversationManager:
         Returns:
             Dict: 统计信息
         """
-        user_messages = sum(1 for msg in self.messages if msg.role == "user")
-        assistant_messages = sum(1 for msg in self.messages if msg.role == "assistant")
-        duration = (datetime.now() - self.session_start).total_seconds()
+        duration = time.monotonic() - self._started
 
         return {
             "total_messages": len(self.messages),
-            "user_messages": user_messages,
-            "assistant_messages": assistant_messages,
+            "user_messages": self._role_counts[Role.USER],
+            "assistant_messages": self._role_counts[Role.ASSISTANT],
             "session_duration_seconds": duration,
             "session_start": self.session_start.isoformat()
         }
 
+    def to_dict(self) -> Dict:
+        """
+        导出会话快照（可JSON序列化）
+
+        Returns:
+            Dict: 包含配置、开始时间和全部消息的字典
+        """
+        return {
+            "max_history": self.max_history,
+            "session_start": self.session_start.isoformat(),
+            "messages": [msg.to_dict() for msg in self.messages]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConversationManager":
+        """
+        从快照恢复会话
+
+        Args:
+            data: to_dict导出的字典
+
+        Returns:
+            ConversationManager: 对话管理器
+        """
+        manager = cls(max_history=data.get("max_history", 10))
+        if data.get("session_start"):
+            manager._started = _to_monotonic(datetime.fromisoformat(data["session_start"]))
+        for item in data.get("messages", []):
+            manager.append(Message.from_dict(item))
+        return manager
+
     def __len__(self):
         """返回消息数量"""
         return len(self.messages)
@@ -160,7 +282,7 @@ if __name__ == "__main__":
 
     print("对话历史:")
     for msg in manager.get_history():
-        print(f"{msg.role}: {msg.content}")
+        print(f"{msg.role.value}: {msg.content}")
 
     print("\n统计信息:")
     print(manager.get_stats())
@@ -0,0 +1,375 @@
+"""
+意图分类模块
+基于字符n-gram的多项式朴素贝叶斯分类器，作为关键词匹配的补充
+
+朴素贝叶斯的概率普遍过于自信，训练后在单独的校准语料上拟合温度和fallback阈值，一并保存到模型文件
+"""
+
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.logger import logger
+
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "intent_corpus.tsv"
+DEFAULT_DEV_CORPUS = Path(__file__).parent / "data" / "intent_dev.tsv"
+DEFAULT_MODEL = Path(__file__).parent / "data" / "intent_model.npz"
+
+
+def load_corpus(path: Union[str, Path] = DEFAULT_CORPUS) -> Tuple[List[str], List[str]]:
+    """
+    读取训练语料
+
+    Args:
+        path: 语料文件路径（每行 "意图<TAB>文本"）
+
+    Returns:
+        Tuple[List[str], List[str]]: (文本列表, 标签列表)
+    """
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, _, text = line.partition("\t")
+            texts.append(text)
+            labels.append(label)
+    return texts, labels
+
+
+class IntentClassifier:
+    """字符n-gram朴素贝叶斯意图分类器"""
+
+    def __init__(
+        self,
+        ngram_range: Tuple[int, int] = (1, 3),
+        n_features: int = 1 << 14,
+        alpha: float = 0.1
+    ):
+        """
+        初始化分类器
+
+        Args:
+            ngram_range: 字符n-gram长度范围
+            n_features: 特征哈希空间大小
+            alpha: 拉普拉斯平滑系数
+        """
+        self.ngram_range = ngram_range
+        self.n_features = n_features
+        self.alpha = alpha
+
+        self.classes: List[str] = []
+        self.class_log_prior: Optional[np.ndarray] = None
+        # 形状 (n_features, n_classes)，按特征行取值便于稀疏累加
+        self.feature_log_prob: Optional[np.ndarray] = None
+        # 概率温度（>1时把过于自信的概率拉平）和校准得到的fallback阈值（未校准时为None）
+        self.temperature = 1.0
+        self.threshold: Optional[float] = None
+
+    @property
+    def is_trained(self) -> bool:
+        """是否已训练"""
+        return self.feature_log_prob is not None
+
+    def _features(self, text: str) -> List[int]:
+        """提取文本的哈希n-gram特征编号（首尾加边界符）"""
+        text = f"\x02{text.lower()}\x03"
+        low, high = self.ngram_range
+        n_features = self.n_features
+        return [
+            zlib.crc32(text[i:i + n].encode("utf-8")) % n_features
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)
+        ]
+
+    def _vectorize(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        把文本批量转成CSR稀疏矩阵
+
+        Returns:
+            Tuple: (indices, data, indptr)
+        """
+        indices: List[int] = []
+        indptr = [0]
+        for text in texts:
+            indices.extend(self._features(text))
+            indptr.append(len(indices))
+
+        indices_arr = np.asarray(indices, dtype=np.int64)
+        data = np.ones(len(indices_arr), dtype=np.float64)
+        return indices_arr, data, np.asarray(indptr, dtype=np.int64)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str]) -> "IntentClassifier":
+        """
+        训练分类器
+
+        Args:
+            texts: 文本列表
+            labels: 标签列表
+
+        Returns:
+            IntentClassifier: 自身
+        """
+        self.classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        y = np.asarray([class_index[label] for label in labels], dtype=np.int64)
+
+        indices, data, indptr = self._vectorize(texts)
+        rows = np.repeat(y, np.diff(indptr))
+
+        counts = np.zeros((self.n_features, len(self.classes)), dtype=np.float64)
+        np.add.at(counts, (indices, rows), data)
+
+        smoothed = counts + self.alpha
+        self.feature_log_prob = np.log(smoothed / smoothed.sum(axis=0, keepdims=True))
+        self.class_log_prior = np.log(np.bincount(y, minlength=len(self.classes)) / len(y))
+
+        logger.info(f"意图分类器训练完成 (样本: {len(texts)}, 类别: {len(self.classes)})")
+        return self
+
+    def _joint_log_likelihood(self, texts: Sequence[str]) -> np.ndarray:
+        """计算每个文本在各类别下的对数联合概率"""
+        if not self.is_trained:
+            raise RuntimeError("分类器尚未训练")
+
+        indices, data, indptr = self._vectorize(texts)
+        jll = np.tile(self.class_log_prior, (len(texts), 1))
+
+        if len(indices):
+            contrib = self.feature_log_prob[indices] * data[:, None]
+            # 空文本行没有特征，reduceat只对非空行求和
+            nonempty = np.diff(indptr) > 0
+            jll[nonempty] += np.add.reduceat(contrib, indptr[:-1][nonempty], axis=0)
+
+        return jll
+
+    def predict_proba_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        批量预测各类别概率
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            np.ndarray: 形状 (len(texts), n_classes) 的概率矩阵，列顺序同 self.classes
+        """
+        return self._softmax(self._joint_log_likelihood(texts), self.temperature)
+
+    @staticmethod
+    def _softmax(jll: np.ndarray, temperature: float) -> np.ndarray:
+        """按温度把对数联合概率归一化成概率"""
+        scaled = jll / temperature
+        scaled -= scaled.max(axis=1, keepdims=True)
+        proba = np.exp(scaled)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def calibrate(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        fallback_label: str = "conversation",
+        temperatures: Sequence[float] = tuple(np.geomspace(1.0, 100.0, 61)),
+        thresholds: Sequence[float] = tuple(np.round(np.arange(0.3, 0.96, 0.05), 2))
+    ) -> "IntentClassifier":
+        """
+        在未参与训练的校准语料上拟合温度和fallback阈值
+
+        温度取使校准语料负对数似然最小的值；阈值取使“概率低于阈值时按fallback_label处理”
+        的准确率最高的值，准确率相同时取较高的阈值
+
+        Args:
+            texts: 校准文本（不能与训练语料重复）
+            labels: 校准标签
+            fallback_label: 概率不足阈值时采用的标签
+            temperatures: 候选温度
+            thresholds: 候选阈值
+
+        Returns:
+            IntentClassifier: 自身
+        """
+        jll = self._joint_log_likelihood(texts)
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        y = np.asarray([class_index[label] for label in labels], dtype=np.int64)
+        rows = np.arange(len(y))
+
+        def nll(temperature: float) -> float:
+            return float(-np.log(self._softmax(jll, temperature)[rows, y] + 1e-12).mean())
+
+        self.temperature = float(min(temperatures, key=nll))
+        proba = self._softmax(jll, self.temperature)
+        best, best_prob = proba.argmax(axis=1), proba.max(axis=1)
+        fallback = class_index[fallback_label]
+
+        def accuracy(threshold: float) -> float:
+            return float(np.mean(np.where(best_prob >= threshold, best, fallback) == y))
+
+        self.threshold = float(max(reversed(thresholds), key=accuracy))
+        logger.info(
+            f"意图分类器校准完成 (温度: {self.temperature:.2f}, 阈值: {self.threshold:.2f}, "
+            f"校准集准确率: {accuracy(self.threshold):.2f})"
+        )
+        return self
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        """
+        批量预测
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            List[Tuple[str, float]]: 每个文本的 (标签, 概率)
+        """
+        if not texts:
+            return []
+        proba = self.predict_proba_batch(texts)
+        best = proba.argmax(axis=1)
+        return [(self.classes[i], float(proba[row, i])) for row, i in enumerate(best)]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        预测单条文本
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Tuple[str, float]: (标签, 概率)
+        """
+        return self.predict_batch([text])[0]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """
+        预测单条文本的各类别概率
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Dict[str, float]: 标签 -> 概率
+        """
+        proba = self.predict_proba_batch([text])[0]
+        return {label: float(p) for label, p in zip(self.classes, proba)}
+
+    def save(self, path: Union[str, Path] = DEFAULT_MODEL):
+        """
+        保存模型（float16压缩存储，只保留非零行）
+
+        Args:
+            path: 模型文件路径
+        """
+        if not self.is_trained:
+            raise RuntimeError("分类器尚未训练")
+
+        # 未出现过的特征行在各类别下都等于平滑后的常数，只需存每类一个默认值
+        default = self.feature_log_prob.min(axis=0)
+        rows = np.flatnonzero((self.feature_log_prob != default).any(axis=1))
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            classes=np.asarray(self.classes),
+            class_log_prior=self.class_log_prior,
+            rows=rows.astype(np.int32),
+            values=self.feature_log_prob[rows].astype(np.float16),
+            default=default,
+            config=np.asarray([self.ngram_range[0], self.ngram_range[1], self.n_features]),
+            alpha=np.asarray(self.alpha),
+            temperature=np.asarray(self.temperature),
+            threshold=np.asarray(np.nan if self.threshold is None else self.threshold)
+        )
+        logger.info(f"意图分类模型已保存: {path} (非零行: {len(rows)})")
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = DEFAULT_MODEL) -> "IntentClassifier":
+        """
+        加载模型
+
+        Args:
+            path: 模型文件路径
+
+        Returns:
+            IntentClassifier: 分类器
+        """
+        with np.load(path) as archive:
+            low, high, n_features = (int(v) for v in archive["config"])
+            model = cls(ngram_range=(low, high), n_features=n_features, alpha=float(archive["alpha"]))
+            model.classes = [str(c) for c in archive["classes"]]
+            model.class_log_prior = archive["class_log_prior"]
+            feature_log_prob = np.tile(archive["default"], (n_features, 1))
+            feature_log_prob[archive["rows"]] = archive["values"].astype(np.float64)
+            model.feature_log_prob = feature_log_prob
+            # 旧版模型文件没有校准参数
+            if "temperature" in archive:
+                model.temperature = float(archive["temperature"])
+                threshold = float(archive["threshold"])
+                model.threshold = None if np.isnan(threshold) else threshold
+
+        logger.info(f"意图分类模型已加载: {path}")
+        return model
+
+    @classmethod
+    def train(
+        cls,
+        corpus_path: Union[str, Path] = DEFAULT_CORPUS,
+        dev_corpus_path: Optional[Union[str, Path]] = DEFAULT_DEV_CORPUS
+    ) -> "IntentClassifier":
+        """
+        用训练语料训练，并在校准语料上校准（校准语料不存在时跳过）
+
+        Returns:
+            IntentClassifier: 分类器
+        """
+        texts, labels = load_corpus(corpus_path)
+        model = cls().fit(texts, labels)
+        if dev_corpus_path and Path(dev_corpus_path).exists():
+            model.calibrate(*load_corpus(dev_corpus_path))
+        return model
+
+    @classmethod
+    def load_or_train(
+        cls,
+        model_path: Union[str, Path] = DEFAULT_MODEL,
+        corpus_path: Union[str, Path] = DEFAULT_CORPUS,
+        dev_corpus_path: Optional[Union[str, Path]] = DEFAULT_DEV_CORPUS
+    ) -> "IntentClassifier":
+        """
+        优先加载随代码发布的模型文件，不存在时用内置语料训练
+
+        Returns:
+            IntentClassifier: 分类器
+        """
+        if Path(model_path).exists():
+            return cls.load(model_path)
+        logger.warning(f"未找到意图分类模型 {model_path}，使用内置语料训练")
+        return cls.train(corpus_path, dev_corpus_path)
+
+
+# 训练、校准并保存模型（修改语料后运行，重新生成 mcp/data/intent_model.npz）
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    classifier = IntentClassifier.train()
+    classifier.save()
+
+    size_kb = DEFAULT_MODEL.stat().st_size / 1024
+    print(f"模型已保存: {DEFAULT_MODEL} ({size_kb:.1f} KB)")
+
+    samples = ["这句法语对吗", "bonjour怎么发音？", "chien是什么意思", "周末去哪玩"]
+    print(f"温度: {classifier.temperature:.2f}, 阈值: {classifier.threshold}")
+    start = time.perf_counter()
+    predictions = classifier.predict_batch(samples)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for text, (label, prob) in zip(samples, predictions):
+        print(f"  {text} -> {label} ({prob:.2f})")
+    print(f"批量预测 {len(samples)} 条耗时: {elapsed:.3f} ms")
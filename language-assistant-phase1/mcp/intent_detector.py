@@ -4,8 +4,20 @@
 """
 
 from enum import Enum
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 from utils.logger import logger
+from utils.metrics import metrics
+from mcp.keyword_matcher import KeywordMatcher
+from mcp.intent_classifier import IntentClassifier
+from mcp.lexicon import CompiledLexicon, LexiconWatcher, load_lexicon, DEFAULT_LEXICON_PATH
+
+INTENT_DETECTIONS = metrics.counter(
+    "intent_detections_total", "意图检测结果分布", ["intent"]
+)
+LEXICON_INFO = metrics.gauge(
+    "intent_lexicon_info", "当前生效的意图词表版本", ["version"]
+)
 
 
 class IntentType(Enum):
@@ -17,30 +29,221 @@ class IntentType(Enum):
     CONVERSATION = "conversation"  # 一般对话
 
 
+# 内置关键词表，词表文件缺失或无法解析时使用；顺序即同分时的优先级
+DEFAULT_KEYWORDS = {
+    IntentType.TRANSLATION: [
+        "翻译", "translate", "怎么说", "法语是", "用法语", "法语怎么",
+        "français", "french"
+    ],
+    IntentType.EXPLANATION: [
+        "解释", "explain", "为什么", "什么意思", "是什么意思", "含义",
+        "区别", "语法", "用法", "变位", "meaning", "grammar", "difference",
+        "différence", "signification"
+    ],
+    IntentType.VOCABULARY: [
+        "词汇", "单词", "动词", "名词", "形容词", "vocabulary", "word",
+        "mot", "vocabulaire", "这个词", "那个词"
+    ],
+    IntentType.PRONUNCIATION: [
+        "发音", "怎么读", "读音", "pronunciation", "pronounce",
+        "prononciation", "读法", "音标"
+    ]
+}
+
+
 class IntentDetector:
     """意图检测器"""
 
-    def __init__(self):
-        """初始化意图检测器"""
-        self.keywords = {
-            IntentType.TRANSLATION: [
-                "翻译", "translate", "怎么说", "法语是", "用法语",
-                "français", "french"
-            ],
-            IntentType.EXPLANATION: [
-                "解释", "explain", "为什么", "什么意思", "区别",
-                "différence", "signification"
-            ],
-            IntentType.VOCABULARY: [
-                "词汇", "单词", "vocabulary", "mot", "vocabulaire",
-                "这个词", "那个词"
-            ],
-            IntentType.PRONUNCIATION: [
-                "发音", "怎么读", "pronunciation", "prononciation",
-                "读法", "音标"
-            ]
+    def __init__(
+        self,
+        classifier: Optional[IntentClassifier] = None,
+        use_classifier: bool = True,
+        mode: str = "fallback",
+        threshold: Optional[float] = None,
+        blend_weight: float = 0.5,
+        lexicon_path: Optional[Union[str, Path]] = DEFAULT_LEXICON_PATH,
+        reload_interval: Optional[float] = None
+    ):
+        """
+        初始化意图检测器
+
+        Args:
+            classifier: 统计分类器（默认加载内置模型）
+            use_classifier: 是否启用统计分类器
+            mode: 分类器用法，fallback（关键词未命中时使用）或 blend（与关键词得分加权）
+            threshold: fallback模式下采用分类结果的最低概率（默认使用分类器校准得到的阈值，未校准时为0.6）
+            blend_weight: blend模式下分类器概率的权重
+            lexicon_path: 关键词表文件（None表示使用内置词表）
+            reload_interval: 词表热加载轮询间隔（秒），None表示不监视文件
+        """
+        if mode not in ("fallback", "blend"):
+            raise ValueError(f"未知的分类器模式: {mode}")
+
+        self.lexicon_path = lexicon_path
+        self._lexicon = self._load_initial_lexicon(lexicon_path)
+        LEXICON_INFO.labels(self._lexicon.version).set(1)
+
+        self._watcher = None
+        if lexicon_path and reload_interval:
+            self._watcher = LexiconWatcher(
+                lexicon_path, self._swap_lexicon, IntentType, reload_interval
+            ).start()
+
+        self.mode = mode
+        self.blend_weight = blend_weight
+        self.classifier = classifier
+        if self.classifier is None and use_classifier:
+            try:
+                self.classifier = IntentClassifier.load_or_train()
+            except Exception as e:
+                logger.warning(f"意图分类器加载失败，仅使用关键词匹配: {e}")
+        if threshold is None:
+            calibrated = self.classifier.threshold if self.classifier is not None else None
+            threshold = calibrated if calibrated is not None else 0.6
+        self.threshold = threshold
+
+        logger.info(
+            f"意图检测器初始化完成 (关键词: {len(self.matcher)}, 词表版本: {self.lexicon_version})"
+        )
+
+    @staticmethod
+    def _load_initial_lexicon(lexicon_path: Optional[Union[str, Path]]) -> CompiledLexicon:
+        """加载词表文件，失败时回退到内置词表"""
+        if lexicon_path:
+            try:
+                return load_lexicon(lexicon_path, IntentType)
+            except Exception as e:
+                logger.warning(f"词表加载失败，使用内置词表: {e}")
+        return CompiledLexicon(
+            {intent: list(words) for intent, words in DEFAULT_KEYWORDS.items()},
+            "builtin"
+        )
+
+    def _swap_lexicon(self, compiled: CompiledLexicon):
+        """原子替换词表（单次引用赋值，正在进行的检测继续使用旧快照）"""
+        previous = self._lexicon
+        self._lexicon = compiled
+        LEXICON_INFO.labels(previous.version).set(0)
+        LEXICON_INFO.labels(compiled.version).set(1)
+        logger.info(f"意图词表已更新: {previous.version} -> {compiled.version}")
+
+    def reload(self) -> bool:
+        """
+        立即重新加载词表文件
+
+        Returns:
+            bool: 是否加载成功
+        """
+        if not self.lexicon_path:
+            return False
+        try:
+            self._swap_lexicon(load_lexicon(self.lexicon_path, IntentType))
+            return True
+        except Exception as e:
+            logger.error(f"词表重新加载失败，继续使用旧版本: {e}")
+            return False
+
+    def close(self):
+        """停止词表热加载"""
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+    @property
+    def keywords(self) -> Dict[IntentType, List[str]]:
+        """当前生效的关键词表"""
+        return self._lexicon.keywords
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """当前生效的关键词匹配器"""
+        return self._lexicon.matcher
+
+    @property
+    def lexicon_version(self) -> str:
+        """当前生效的词表版本"""
+        return self._lexicon.version
+
+    def score(self, text: str) -> Dict[IntentType, int]:
+        """
+        单次扫描文本，统计每种意图命中的关键词数
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Dict[IntentType, int]: 意图 -> 命中数
+        """
+        return self._lexicon.matcher.count(text)
+
+    def _select(self, scores: Dict[IntentType, int]) -> IntentType:
+        """按命中数选出意图，同分时取词表中靠前的意图"""
+        best = max(scores, key=scores.get, default=None)
+        if best is None or scores[best] == 0:
+            return IntentType.CONVERSATION
+        return best
+
+    def _needs_classifier(self, scores: Dict[IntentType, int]) -> bool:
+        """判断是否需要调用统计分类器"""
+        if self.classifier is None:
+            return False
+        return self.mode == "blend" or self._select(scores) is IntentType.CONVERSATION
+
+    def _decide(
+        self,
+        scores: Dict[IntentType, int],
+        proba: Optional[Dict[str, float]] = None
+    ) -> Tuple[IntentType, float]:
+        """
+        结合关键词得分和分类器概率确定意图
+
+        Args:
+            scores: 关键词得分
+            proba: 分类器概率（标签 -> 概率），未调用分类器时为None
+
+        Returns:
+            Tuple[IntentType, float]: (意图, 置信度)
+        """
+        intent = self._select(scores)
+
+        if proba is None:
+            if intent is IntentType.CONVERSATION:
+                return intent, 0.5
+            return intent, self._confidence(scores[intent])
+
+        if self.mode == "fallback":
+            label, prob = max(proba.items(), key=lambda item: item[1])
+            if prob >= self.threshold:
+                return IntentType(label), prob
+            return IntentType.CONVERSATION, 0.5
+
+        weight = self.blend_weight
+        combined = {
+            intent_type: (1 - weight) * self._confidence(scores.get(intent_type, 0))
+            + weight * proba.get(intent_type.value, 0.0)
+            for intent_type in IntentType
         }
-        logger.info("意图检测器初始化完成")
+        best = max(combined, key=combined.get)
+        return best, combined[best]
+
+    def _classify_batch(self, texts: List[str]) -> Tuple[List[Tuple[IntentType, float, Dict]], str]:
+        """批量检测，需要分类器的文本合并为一次批量预测；返回结果和所用词表版本"""
+        # 整批使用同一个词表快照
+        lexicon = self._lexicon
+        all_scores = [lexicon.matcher.count(text) for text in texts]
+        pending = [i for i, scores in enumerate(all_scores) if self._needs_classifier(scores)]
+
+        probas: List[Optional[Dict[str, float]]] = [None] * len(texts)
+        if pending:
+            matrix = self.classifier.predict_proba_batch([texts[i] for i in pending])
+            for row, i in enumerate(pending):
+                probas[i] = dict(zip(self.classifier.classes, matrix[row].tolist()))
+
+        results = [
+            self._decide(scores, proba) + (scores,)
+            for scores, proba in zip(all_scores, probas)
+        ]
+        return results, lexicon.version
 
     def detect(self, text: str) -> IntentType:
         """
@@ -52,18 +255,27 @@ class IntentDetector:
         Returns:
             IntentType: 检测到的意图类型
         """
-        text_lower = text.lower()
+        results, version = self._classify_batch([text])
+        intent, confidence, _ = results[0]
 
-        # 检查每种意图的关键词
-        for intent_type, keywords in self.keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    logger.debug(f"检测到意图: {intent_type.value} (关键词: {keyword})")
-                    return intent_type
+        if intent is IntentType.CONVERSATION:
+            logger.debug(f"未检测到特定意图，归类为一般对话 (词表: {version})")
+        else:
+            logger.debug(f"检测到意图: {intent.value} (置信度: {confidence:.2f}, 词表: {version})")
+        return intent
 
-        # 默认为一般对话
-        logger.debug("未检测到特定意图，归类为一般对话")
-        return IntentType.CONVERSATION
+    def detect_batch(self, texts: List[str]) -> List[IntentType]:
+        """
+        批量检测意图
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            List[IntentType]: 意图列表
+        """
+        results, _ = self._classify_batch(texts)
+        return [intent for intent, _, _ in results]
 
     def get_confidence(self, text: str, intent: IntentType) -> float:
         """
@@ -76,15 +288,16 @@ class IntentDetector:
         Returns:
             float: 置信度 (0-1)
         """
-        if intent not in self.keywords:
+        scores = self.score(text)
+        if intent not in scores:
             return 0.5
 
-        text_lower = text.lower()
-        keywords = self.keywords[intent]
-        matches = sum(1 for keyword in keywords if keyword in text_lower)
+        return self._confidence(scores[intent])
 
-        confidence = min(matches * 0.3, 1.0)
-        return confidence
+    @staticmethod
+    def _confidence(matches: int) -> float:
+        """由命中数计算置信度"""
+        return min(matches * 0.3, 1.0)
 
     def analyze(self, text: str) -> Dict:
         """
@@ -94,14 +307,17 @@ class IntentDetector:
             text: 输入文本
 
         Returns:
-            Dict: 包含意图类型和置信度的字典
+            Dict: 包含意图类型、置信度、各意图得分和词表版本的字典
         """
-        intent = self.detect(text)
-        confidence = self.get_confidence(text, intent)
+        results, version = self._classify_batch([text])
+        intent, confidence, scores = results[0]
+        INTENT_DETECTIONS.labels(intent.value).inc()
 
         return {
             "intent": intent,
             "confidence": confidence,
+            "scores": scores,
+            "lexicon_version": version,
             "text": text
         }
 
@@ -0,0 +1,127 @@
+"""
+关键词匹配模块
+基于Aho-Corasick自动机，单次扫描文本即可统计所有关键词命中
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Mapping, Set
+
+
+class KeywordMatcher:
+    """多模式关键词匹配器"""
+
+    def __init__(self, lexicon: Mapping[Hashable, Iterable[str]]):
+        """
+        编译关键词词表
+
+        Args:
+            lexicon: 标签 -> 关键词列表（匹配时忽略大小写）
+        """
+        self.labels: List[Hashable] = list(lexicon.keys())
+        self.patterns: List[str] = []
+        self.pattern_labels: List[int] = []
+
+        for label_index, label in enumerate(self.labels):
+            for keyword in lexicon[label]:
+                keyword = keyword.lower()
+                if keyword:
+                    self.patterns.append(keyword)
+                    self.pattern_labels.append(label_index)
+
+        self._compile()
+
+    def _compile(self):
+        """构建goto表、失败指针，并展开为确定性转移表"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(pattern_id)
+
+        # 按BFS顺序计算失败指针，同时把失败路径上的转移合并进来，
+        # 扫描时每个字符只需一次字典查找
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                delta[state][ch] = nxt
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                outputs[nxt] |= outputs[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs = [tuple(sorted(out)) for out in outputs]
+
+    def find_patterns(self, text: str) -> Set[int]:
+        """
+        扫描文本，返回命中的关键词编号
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Set[int]: 命中的关键词编号（同一关键词只计一次）
+        """
+        delta = self._delta
+        outputs = self._outputs
+        hits: Set[int] = set()
+        state = 0
+
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                hits.update(outputs[state])
+
+        return hits
+
+    def count(self, text: str) -> Dict[Hashable, int]:
+        """
+        统计每个标签命中的不同关键词数量
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Dict: 标签 -> 命中数（包含所有标签）
+        """
+        counts = [0] * len(self.labels)
+        for pattern_id in self.find_patterns(text):
+            counts[self.pattern_labels[pattern_id]] += 1
+        return dict(zip(self.labels, counts))
+
+    def matched_keywords(self, text: str) -> Dict[Hashable, List[str]]:
+        """
+        返回每个标签命中的关键词
+
+        Args:
+            text: 输入文本
+
+        Returns:
+            Dict: 标签 -> 命中的关键词列表（仅包含有命中的标签）
+        """
+        result: Dict[Hashable, List[str]] = {}
+        for pattern_id in sorted(self.find_patterns(text)):
+            label = self.labels[self.pattern_labels[pattern_id]]
+            result.setdefault(label, []).append(self.patterns[pattern_id])
+        return result
+
+    def __len__(self):
+        """返回关键词数量"""
+        return len(self.patterns)
+
+    def __repr__(self):
+        return f"KeywordMatcher(labels={len(self.labels)}, patterns={len(self.patterns)})"
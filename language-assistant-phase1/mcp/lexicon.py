@@ -0,0 +1,160 @@
+"""
+意图词表模块
+从YAML/JSON文件加载关键词表，编译为匹配器并支持后台热加载
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Union
+
+import yaml
+
+from utils.logger import logger
+from mcp.keyword_matcher import KeywordMatcher
+
+
+DEFAULT_LEXICON_PATH = Path(__file__).parent.parent / "config" / "intent_lexicon.yaml"
+
+
+class CompiledLexicon:
+    """编译后的词表快照（不可变，整体替换）"""
+
+    __slots__ = ("keywords", "matcher", "version", "source")
+
+    def __init__(self, keywords: Dict[Hashable, List[str]], version: str, source: Optional[str] = None):
+        """
+        编译词表
+
+        Args:
+            keywords: 标签 -> 关键词列表
+            version: 词表版本
+            source: 来源文件路径
+        """
+        self.keywords = keywords
+        self.matcher = KeywordMatcher(keywords)
+        self.version = version
+        self.source = source
+
+    def __repr__(self):
+        return f"CompiledLexicon(version={self.version}, patterns={len(self.matcher)})"
+
+
+def load_lexicon(
+    path: Union[str, Path],
+    label_type: Optional[Callable[[str], Hashable]] = None
+) -> CompiledLexicon:
+    """
+    从文件加载并编译词表
+
+    Args:
+        path: 词表文件（.yaml/.yml/.json），格式为 {version, intents: {意图: [关键词]}}
+        label_type: 把意图名转换为标签的函数（如 IntentType）
+
+    Returns:
+        CompiledLexicon: 编译后的词表
+
+    Raises:
+        ValueError: 文件格式错误
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+
+    if path.suffix == ".json":
+        data = json.loads(raw.decode("utf-8"))
+    else:
+        data = yaml.safe_load(raw)
+
+    if not isinstance(data, dict) or not isinstance(data.get("intents"), dict):
+        raise ValueError(f"词表格式错误: {path} 缺少 intents")
+
+    keywords: Dict[Hashable, List[str]] = {}
+    for name, words in data["intents"].items():
+        if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+            raise ValueError(f"词表格式错误: {name} 的关键词必须是字符串列表")
+        label = label_type(name) if label_type else name
+        keywords[label] = list(words)
+
+    # 版本号 = 声明的版本 + 内容摘要，忘记改版本号时也能区分不同修订
+    digest = hashlib.sha256(raw).hexdigest()[:8]
+    declared = str(data.get("version", "unversioned"))
+    return CompiledLexicon(keywords, f"{declared}+{digest}", str(path))
+
+
+class LexiconWatcher:
+    """词表文件监视器，文件变化时在后台线程重新编译"""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        on_reload: Callable[[CompiledLexicon], None],
+        label_type: Optional[Callable[[str], Hashable]] = None,
+        interval: float = 2.0
+    ):
+        """
+        初始化监视器
+
+        Args:
+            path: 词表文件路径
+            on_reload: 编译成功后的回调（用于原子替换）
+            label_type: 意图名转换函数
+            interval: 轮询间隔（秒）
+        """
+        self.path = Path(path)
+        self.on_reload = on_reload
+        self.label_type = label_type
+        self.interval = interval
+
+        self._stamp = self._file_stamp()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _file_stamp(self):
+        """文件的修改时间和大小"""
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        """
+        检查文件是否变化，变化时重新编译
+
+        Returns:
+            bool: 是否重新加载成功
+        """
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        try:
+            compiled = load_lexicon(self.path, self.label_type)
+        except Exception as e:
+            # 保留旧词表继续服务
+            logger.error(f"词表重新加载失败，继续使用旧版本: {e}")
+            return False
+
+        self.on_reload(compiled)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> "LexiconWatcher":
+        """启动后台监视线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="lexicon-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"词表热加载已启用: {self.path} (间隔: {self.interval}s)")
+        return self
+
+    def stop(self):
+        """停止监视"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
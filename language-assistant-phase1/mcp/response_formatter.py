@@ -3,10 +3,128 @@
 格式化和美化AI响应
 """
 
-from typing import Dict, Optional
+import re
+from typing import Dict, Iterable, Iterator, Optional
 from utils.logger import logger
 
 
+# 行首的列表/标题标记，如 "- "、"* "、"1. "、"## "
+_LINE_MARKER = re.compile(r"[ \t]*(?:[-*+]|\d{1,3}[.)]|#{1,6})[ \t]+")
+# 可能还没收完的行首标记
+_PARTIAL_MARKER = re.compile(r"[ \t]*(?:[-*+]|\d{1,3}[.)]?|#{1,6})?[ \t]*")
+# 需要成对出现的行内标记，长的在前
+_INLINE_DELIMITERS = ("**", "`")
+
+
+class StreamingFormatter:
+    """
+    流式响应格式化器
+    逐段接收模型输出，只在Markdown标记可能被截断的位置缓冲，其余文本立即输出
+    """
+
+    def __init__(self, prefix: str = "", max_pending: int = 256):
+        """
+        初始化流式格式化器
+
+        Args:
+            prefix: 第一段输出前添加的前缀（如意图标题）
+            max_pending: 最多缓冲的字符数，超过后原样输出，避免未闭合的标记阻塞显示
+        """
+        self.prefix = prefix
+        self.max_pending = max_pending
+        self._pending = ""
+        self._line_start = True
+        self._started = False
+
+    def _safe_length(self, text: str) -> int:
+        """计算text中可以安全输出的前缀长度（不会截断任何标记）"""
+        n = len(text)
+        i = safe = 0
+        line_start = self._line_start
+
+        while i < n:
+            if line_start:
+                line_start = False
+                marker = _LINE_MARKER.match(text, i)
+                if marker:
+                    i = safe = marker.end()
+                    continue
+                if _PARTIAL_MARKER.fullmatch(text, i):
+                    # 剩余部分可能是还没收完的列表/标题标记
+                    return safe
+
+            if text[i] == "\n":
+                i = safe = i + 1
+                line_start = True
+                continue
+
+            delimiter = next((d for d in _INLINE_DELIMITERS if text.startswith(d, i)), None)
+            if delimiter is None:
+                if text[i] == "*" and i == n - 1:
+                    # 可能是 ** 的前半
+                    return safe
+                i = safe = i + 1
+                continue
+
+            close = text.find(delimiter, i + len(delimiter))
+            newline = text.find("\n", i + len(delimiter))
+            if close != -1 and (newline == -1 or close < newline):
+                # 完整的标记片段整体输出
+                i = safe = close + len(delimiter)
+            elif newline != -1:
+                # 行内未闭合，按普通文本处理
+                i = safe = i + len(delimiter)
+            else:
+                # 等待闭合标记
+                return safe
+
+        return safe
+
+    def _emit(self, text: str) -> str:
+        """输出一段文本（第一段前加前缀）"""
+        if not text:
+            return ""
+        self._line_start = text.endswith("\n")
+        if not self._started:
+            self._started = True
+            return self.prefix + text
+        return text
+
+    def feed(self, delta: str) -> str:
+        """
+        接收一段模型输出
+
+        Args:
+            delta: 新增的文本片段
+
+        Returns:
+            str: 可以立即显示的文本（可能为空）
+        """
+        self._pending += delta
+        if len(self._pending) > self.max_pending:
+            safe = len(self._pending)
+        else:
+            safe = self._safe_length(self._pending)
+
+        ready, self._pending = self._pending[:safe], self._pending[safe:]
+        return self._emit(ready)
+
+    def flush(self) -> str:
+        """
+        输出结束，返回剩余的全部缓冲文本
+
+        Returns:
+            str: 剩余文本
+        """
+        ready, self._pending = self._pending, ""
+        text = self._emit(ready)
+        if not self._started:
+            # 空响应也输出前缀
+            self._started = True
+            return self.prefix
+        return text
+
+
 class ResponseFormatter:
     """响应格式化器"""
 
@@ -108,6 +226,26 @@ class ResponseFormatter:
         formatter = formatters.get(intent_type, self.format_conversation)
         return formatter(response)
 
+    def stream_with_intent(self, deltas: Iterable[str], intent_type: str) -> Iterator[str]:
+        """
+        根据意图类型流式格式化响应
+
+        Args:
+            deltas: 模型输出的文本片段
+            intent_type: 意图类型
+
+        Yields:
+            str: 可以立即显示的文本片段（拼接后与format_with_intent的结果相同）
+        """
+        streamer = StreamingFormatter(prefix=self.format_with_intent("", intent_type))
+        for delta in deltas:
+            chunk = streamer.feed(delta)
+            if chunk:
+                yield chunk
+        tail = streamer.flush()
+        if tail:
+            yield tail
+
     def add_metadata(self, response: str, metadata: Optional[Dict] = None) -> Dict:
         """
         为响应添加元数据
@@ -140,3 +278,9 @@ if __name__ == "__main__":
     print(formatter.format_explanation("'Tu'用于非正式场合，'vous'用于正式场合。"))
     print()
     print(formatter.format_error("API调用失败，请检查网络连接。"))
+    print()
+
+    # 测试流式格式化
+    deltas = ["**Bon", "jour** 的", "发音：\n", "1", ". 音标 `[bɔ̃", "ʒuʁ]`\n"]
+    for chunk in formatter.stream_with_intent(deltas, "pronunciation"):
+        print(repr(chunk))
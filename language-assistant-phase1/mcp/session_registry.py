@@ -0,0 +1,385 @@
+"""
+会话注册表模块
+按会话ID管理多个对话管理器，限制总内存并淘汰空闲会话
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from utils.logger import logger
+from utils.metrics import metrics
+from mcp.conversation_manager import ConversationManager, Message
+
+ACTIVE_SESSIONS = metrics.gauge("sessions_active", "内存中的会话数")
+SESSION_EVICTIONS = metrics.counter(
+    "session_evictions_total", "会话淘汰次数", ["reason"]
+)
+
+# 每条消息除正文外的固定开销估计（Message对象 + deque槽位）
+MESSAGE_OVERHEAD_BYTES = 72
+
+
+class _Entry:
+    """注册表中的一个会话"""
+
+    __slots__ = ("manager", "lock", "last_used", "messages", "bytes")
+
+    def __init__(self, manager: ConversationManager):
+        self.manager = manager
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.messages = 0
+        self.bytes = 0
+
+
+def _measure(manager: ConversationManager) -> Tuple[int, int]:
+    """估算会话的消息数和字节数"""
+    size = sum(sys.getsizeof(msg.content) for msg in manager.messages)
+    return len(manager), size + len(manager) * MESSAGE_OVERHEAD_BYTES
+
+
+class SessionRegistry:
+    """会话注册表（LRU + TTL淘汰，可选落盘）"""
+
+    def __init__(
+        self,
+        max_history: int = 10,
+        max_messages: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        spill_dir: Optional[Union[str, Path]] = None
+    ):
+        """
+        初始化会话注册表
+
+        Args:
+            max_history: 每个会话最大保留的历史消息数
+            max_messages: 内存中所有会话的消息总数上限
+            max_bytes: 内存中所有会话的估算字节数上限
+            idle_ttl: 会话空闲多少秒后淘汰
+            spill_dir: 淘汰的会话写入该目录，下次访问时恢复（None表示直接丢弃）
+        """
+        self.max_history = max_history
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+
+        # 按最近使用排序，最久未用的在最前
+        self._sessions: "OrderedDict[str, _Entry]" = OrderedDict()
+        # 只保护字典结构和总量计数，持有时间很短；会话内容由各自的锁保护
+        self._lock = threading.Lock()
+        self._total_messages = 0
+        self._total_bytes = 0
+        self._evictions = 0
+        self._restored = 0
+        self._last_sweep = time.monotonic()
+        # 正在落盘的会话，恢复前需等待写完
+        self._spilling: Dict[str, _Entry] = {}
+
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        logger.info(
+            f"会话注册表初始化完成 (消息上限: {max_messages}, 字节上限: {max_bytes}, "
+            f"空闲超时: {idle_ttl}, 落盘目录: {self.spill_dir})"
+        )
+
+    def _spill_path(self, session_id: str) -> Path:
+        """会话落盘文件路径（会话ID哈希后作文件名）"""
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{digest}.json"
+
+    def _spill(self, session_id: str, manager: ConversationManager):
+        """把会话写入磁盘"""
+        path = self._spill_path(session_id)
+        tmp_path = path.with_suffix(".tmp")
+        data = manager.to_dict()
+        data["session_id"] = session_id
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _restore(self, session_id: str) -> Optional[ConversationManager]:
+        """从磁盘恢复会话（恢复后删除落盘文件）"""
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"会话恢复失败: {session_id}: {e}")
+            return None
+
+        path.unlink(missing_ok=True)
+        logger.debug(f"会话已从磁盘恢复: {session_id}")
+        return ConversationManager.from_dict(data)
+
+    def _acquire(self, session_id: str) -> _Entry:
+        """取出会话（不存在时恢复或新建）并加锁"""
+        while True:
+            spilling = None
+            created = False
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    self._sessions.move_to_end(session_id)
+                else:
+                    # 先占位并加锁，读盘在注册表锁之外进行；只有占位的线程负责加载
+                    entry = _Entry(None)
+                    entry.lock.acquire()
+                    self._sessions[session_id] = entry
+                    spilling = self._spilling.get(session_id)
+                    created = True
+                    ACTIVE_SESSIONS.set(len(self._sessions))
+
+            if created:
+                try:
+                    if spilling is not None:
+                        # 该会话正在落盘，等写完再读
+                        with spilling.lock:
+                            pass
+                    restored = self._restore(session_id)
+                    manager = restored if restored is not None else ConversationManager(self.max_history)
+                    messages, size = _measure(manager)
+                except BaseException:
+                    # 加载失败时撤掉占位，等待该会话的线程会重新获取
+                    with self._lock:
+                        if self._sessions.get(session_id) is entry:
+                            del self._sessions[session_id]
+                            ACTIVE_SESSIONS.set(len(self._sessions))
+                    entry.lock.release()
+                    raise
+                with self._lock:
+                    if restored is not None:
+                        self._restored += 1
+                    entry.manager = manager
+                    entry.messages, entry.bytes = messages, size
+                    self._total_messages += messages
+                    self._total_bytes += size
+                return entry
+
+            entry.lock.acquire()
+            # 等锁期间会话可能已被淘汰（或占位的线程加载失败），此时重新获取
+            if self._sessions.get(session_id) is entry and entry.manager is not None:
+                return entry
+            entry.lock.release()
+
+    def _release(self, session_id: str, entry: _Entry):
+        """更新会话用量后解锁，并按预算淘汰"""
+        messages, size = _measure(entry.manager)
+        entry.last_used = time.monotonic()
+        with self._lock:
+            self._total_messages += messages - entry.messages
+            self._total_bytes += size - entry.bytes
+            entry.messages, entry.bytes = messages, size
+        entry.lock.release()
+
+        if self._over_budget():
+            self._evict(lambda _: self._over_budget(), "budget")
+
+        # 顺带清理空闲会话，最多每半个超时周期扫描一次
+        if self.idle_ttl is not None and entry.last_used - self._last_sweep > self.idle_ttl / 2:
+            self._last_sweep = entry.last_used
+            self.evict_idle(entry.last_used)
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[ConversationManager]:
+        """
+        独占使用一个会话（不同会话的请求互不阻塞）
+
+        Args:
+            session_id: 会话ID
+
+        Yields:
+            ConversationManager: 该会话的对话管理器
+        """
+        entry = self._acquire(session_id)
+        try:
+            yield entry.manager
+        finally:
+            self._release(session_id, entry)
+
+    def _over_budget(self) -> bool:
+        """是否超出内存预算"""
+        if self.max_messages is not None and self._total_messages > self.max_messages:
+            return True
+        return self.max_bytes is not None and self._total_bytes > self.max_bytes
+
+    def _evict(self, should_evict: Callable[[_Entry], bool], reason: str) -> int:
+        """
+        按LRU顺序淘汰会话，遇到不满足条件的会话即停止；正在使用的会话跳过
+
+        Args:
+            should_evict: 判断最久未用的会话是否应淘汰
+            reason: 淘汰原因（用于指标）
+
+        Returns:
+            int: 淘汰的会话数
+        """
+        victims = []
+        with self._lock:
+            for session_id in list(self._sessions):
+                entry = self._sessions[session_id]
+                if not should_evict(entry):
+                    break
+                if not entry.lock.acquire(blocking=False):
+                    continue
+                del self._sessions[session_id]
+                self._total_messages -= entry.messages
+                self._total_bytes -= entry.bytes
+                if self.spill_dir and entry.messages:
+                    self._spilling[session_id] = entry
+                victims.append((session_id, entry))
+
+            self._evictions += len(victims)
+            ACTIVE_SESSIONS.set(len(self._sessions))
+
+        # 落盘在注册表锁之外进行；会话锁一直持有到写完，期间访问该会话的请求会等待
+        for session_id, entry in victims:
+            if session_id in self._spilling:
+                try:
+                    self._spill(session_id, entry.manager)
+                except OSError as e:
+                    logger.error(f"会话落盘失败，已丢弃: {session_id}: {e}")
+                with self._lock:
+                    del self._spilling[session_id]
+            entry.lock.release()
+            SESSION_EVICTIONS.labels(reason).inc()
+            logger.debug(f"会话已淘汰 ({reason}): {session_id}")
+
+        return len(victims)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        淘汰空闲超时的会话
+
+        Args:
+            now: 当前单调时间（默认time.monotonic()）
+
+        Returns:
+            int: 淘汰的会话数
+        """
+        if self.idle_ttl is None:
+            return 0
+        deadline = (time.monotonic() if now is None else now) - self.idle_ttl
+
+        evicted = self._evict(lambda entry: entry.last_used <= deadline, "idle")
+        if evicted:
+            logger.info(f"已淘汰 {evicted} 个空闲会话")
+        return evicted
+
+    def remove(self, session_id: str) -> bool:
+        """
+        删除会话（包括落盘文件）
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            bool: 会话是否存在
+        """
+        entry = self._acquire(session_id)
+        try:
+            with self._lock:
+                del self._sessions[session_id]
+                self._total_messages -= entry.messages
+                self._total_bytes -= entry.bytes
+                ACTIVE_SESSIONS.set(len(self._sessions))
+        finally:
+            entry.lock.release()
+        return entry.messages > 0
+
+    def iter_snapshots(self) -> Iterator[Tuple[str, List[Message]]]:
+        """
+        逐个导出会话快照（包括已落盘的会话），不改变LRU顺序也不恢复落盘会话
+
+        每次只锁住一个会话并复制其消息引用，导出期间其他会话的请求不受影响
+
+        Yields:
+            Tuple[str, List[Message]]: (会话ID, 消息列表)
+        """
+        seen = set()
+        with self._lock:
+            session_ids = list(self._sessions)
+
+        for session_id in session_ids:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                continue
+            with entry.lock:
+                # 等锁期间会话可能已被淘汰，落盘的会在下面读取
+                if self._sessions.get(session_id) is not entry:
+                    continue
+                messages = list(entry.manager.messages)
+            seen.add(session_id)
+            yield session_id, messages
+
+        if not self.spill_dir:
+            return
+        for path in self.spill_dir.glob("*.json"):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                # 导出期间被恢复到内存
+                continue
+            except (OSError, ValueError) as e:
+                logger.error(f"读取落盘会话失败: {path}: {e}")
+                continue
+            session_id = data.get("session_id")
+            if session_id in seen:
+                continue
+            seen.add(session_id)
+            yield session_id, [Message.from_dict(item) for item in data.get("messages", [])]
+
+    def get_stats(self) -> Dict:
+        """
+        获取注册表统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "total_messages": self._total_messages,
+                "total_bytes": self._total_bytes,
+                "evictions": self._evictions,
+                "restored": self._restored
+            }
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self):
+        """返回内存中的会话数"""
+        return len(self._sessions)
+
+
+# 使用示例
+if __name__ == "__main__":
+    import tempfile
+
+    registry = SessionRegistry(max_messages=4, spill_dir=tempfile.mkdtemp())
+
+    for learner in ("alice", "bob", "carol"):
+        with registry.session(learner) as manager:
+            manager.add_user_message(f"{learner}: bonjour怎么发音？")
+            manager.add_assistant_message("bonjour读作[bɔ̃ʒuʁ]。")
+
+    print("统计信息:", registry.get_stats())
+
+    with registry.session("alice") as manager:
+        print("alice的历史:", [msg.content for msg in manager.get_history()])
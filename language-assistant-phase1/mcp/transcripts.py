@@ -0,0 +1,281 @@
+"""
+对话记录导出模块
+把会话流式导出为JSONL（每行一条消息），以及从JSONL导入；导出使用生成器，内存占用与消息总数无关
+
+导出的时间带本地时区偏移；过滤用的起止时间可以带时区，比较前统一换算成本地时间
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Union
+
+from utils.logger import logger
+from mcp.conversation_manager import Message, Role
+from mcp.session_registry import SessionRegistry
+
+
+def to_local(moment: Optional[datetime]) -> Optional[datetime]:
+    """
+    把时间换算成不带时区的本地时间（与Message.timestamp一致）
+
+    Args:
+        moment: 时间（不带时区的视为本地时间）
+
+    Returns:
+        Optional[datetime]: 本地时间；输入为None时为None
+    """
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    解析ISO格式的时间（可带时区，包括Z后缀）并换算成本地时间
+
+    Args:
+        value: ISO格式的时间字符串
+
+    Returns:
+        datetime: 不带时区的本地时间
+
+    Raises:
+        ValueError: 格式错误
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"时间应为字符串: {value!r}")
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return to_local(datetime.fromisoformat(value))
+
+
+def _in_range(
+    timestamp: datetime,
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> bool:
+    """时间是否在 [since, until) 内"""
+    if since is not None and timestamp < since:
+        return False
+    return until is None or timestamp < until
+
+
+def iter_records(
+    registry: SessionRegistry,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    intents: Optional[Iterable[str]] = None
+) -> Iterator[Dict]:
+    """
+    逐条生成会话中的消息记录
+
+    Args:
+        registry: 会话注册表
+        since: 只导出该时间及之后的消息
+        until: 只导出该时间之前的消息
+        intents: 只导出这些意图的消息
+
+    Yields:
+        Dict: 消息记录（session_id、role、content、timestamp和可选的intent）
+    """
+    intents = set(intents) if intents is not None else None
+    since, until = to_local(since), to_local(until)
+
+    for session_id, messages in registry.iter_snapshots():
+        for message in messages:
+            if intents is not None and message.intent not in intents:
+                continue
+            timestamp = message.timestamp
+            if not _in_range(timestamp, since, until):
+                continue
+            record = {"session_id": session_id}
+            record.update(message.to_dict())
+            # 带时区偏移，换到其他时区的机器上导入也不会错位
+            record["timestamp"] = timestamp.astimezone().isoformat()
+            yield record
+
+
+def read_jsonl(
+    source: Union[str, Path, IO[str]],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    intents: Optional[Iterable[str]] = None
+) -> Iterator[Dict]:
+    """
+    逐行读取JSONL记录（跳过空行和无法解析的行）
+
+    Args:
+        source: 文件路径或文本文件对象
+        since: 只读取该时间及之后的消息
+        until: 只读取该时间之前的消息
+        intents: 只读取这些意图的消息
+
+    Yields:
+        Dict: 消息记录
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as f:
+            yield from read_jsonl(f, since, until, intents)
+        return
+
+    intents = set(intents) if intents is not None else None
+    since, until = to_local(since), to_local(until)
+
+    for line_no, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            logger.warning(f"跳过无法解析的第{line_no}行: {e}")
+            continue
+
+        if not isinstance(record, dict):
+            logger.warning(f"跳过第{line_no}行: 记录应为JSON对象")
+            continue
+        if intents is not None and record.get("intent") not in intents:
+            continue
+        if since is not None or until is not None:
+            try:
+                timestamp = parse_timestamp(record["timestamp"])
+            except (KeyError, ValueError) as e:
+                logger.warning(f"跳过时间缺失或格式错误的第{line_no}行: {e!r}")
+                continue
+            if not _in_range(timestamp, since, until):
+                continue
+        yield record
+
+
+def write_jsonl(records: Iterable[Dict], target: Union[str, Path, IO[str]]) -> int:
+    """
+    把记录逐行写入JSONL
+
+    Args:
+        records: 记录（可以是生成器）
+        target: 文件路径或文本文件对象
+
+    Returns:
+        int: 写入的记录数
+    """
+    if isinstance(target, (str, Path)):
+        with open(target, "w", encoding="utf-8") as f:
+            return write_jsonl(records, f)
+
+    count = 0
+    for record in records:
+        target.write(json.dumps(record, ensure_ascii=False))
+        target.write("\n")
+        count += 1
+    return count
+
+
+def validate_record(record: Dict):
+    """
+    检查一条记录能否导入
+
+    Args:
+        record: 消息记录
+
+    Raises:
+        ValueError: 记录格式错误
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"记录应为JSON对象，实际为 {type(record).__name__}")
+    for key in ("session_id", "content"):
+        if not isinstance(record.get(key), str):
+            raise ValueError(f"{key} 应为字符串")
+    if record.get("role") not in {role.value for role in Role}:
+        raise ValueError(f"未知的角色: {record.get('role')!r}")
+    if record.get("intent") is not None and not isinstance(record["intent"], str):
+        raise ValueError("intent 应为字符串")
+    if record.get("timestamp"):
+        parse_timestamp(record["timestamp"])
+
+
+def validate_jsonl(source: Union[str, Path, IO[str]], target: IO[str]) -> int:
+    """
+    逐行检查JSONL并把记录写入target（用于导入：先写到临时文件，全部合法后再从中导入，
+    有一行不合法就整体拒绝；内存占用与记录数无关）
+
+    Args:
+        source: 文件路径或文本文件对象
+        target: 写入检查过的记录的文本文件对象
+
+    Returns:
+        int: 记录数
+
+    Raises:
+        ValueError: 某一行无法解析或格式错误（信息中带行号）
+    """
+    if isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as f:
+            return validate_jsonl(f, target)
+
+    count = 0
+    for line_no, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            validate_record(record)
+        except ValueError as e:
+            raise ValueError(f"第{line_no}行: {e}") from e
+        target.write(line)
+        target.write("\n")
+        count += 1
+    return count
+
+
+def import_records(registry: SessionRegistry, records: Iterable[Dict]) -> Dict[str, int]:
+    """
+    把记录导入会话注册表（保留原时间戳，同一会话的记录按顺序追加）
+
+    会话历史超过max_history时最早的消息会被挤掉，挤掉的条数在结果中单独报告
+
+    Args:
+        registry: 会话注册表
+        records: 记录（可以是生成器）
+
+    Returns:
+        Dict[str, int]: imported（导入的记录数）和 dropped（因超出历史上限被挤掉的消息数）
+    """
+    count = 0
+    dropped = 0
+    for record in records:
+        with registry.session(str(record["session_id"])) as manager:
+            before = len(manager)
+            manager.append(Message.from_dict(record))
+            dropped += before + 1 - len(manager)
+        count += 1
+
+    if dropped:
+        logger.warning(f"导入时有 {dropped} 条消息超出会话历史上限被丢弃")
+    logger.info(f"已导入 {count} 条对话记录")
+    return {"imported": count, "dropped": dropped}
+
+
+# 使用示例
+if __name__ == "__main__":
+    import io
+
+    registry = SessionRegistry()
+    with registry.session("alice") as manager:
+        manager.add_user_message("请把'你好'翻译成法语", "translation")
+        manager.add_assistant_message("Bonjour", "translation")
+        manager.add_user_message("bonjour怎么发音？", "pronunciation")
+
+    buffer = io.StringIO()
+    count = write_jsonl(iter_records(registry, intents={"translation"}), buffer)
+    print(f"导出 {count} 条:")
+    print(buffer.getvalue())
+
+    buffer.seek(0)
+    spool = io.StringIO()
+    validate_jsonl(buffer, spool)
+    spool.seek(0)
+    target = SessionRegistry()
+    print(import_records(target, read_jsonl(spool)))
+    print("导入后:", target.get_stats())
@@ -1,17 +1,37 @@
 """语音处理模块"""
 
 from speech.speech_to_text.recognizer import SpeechRecognizer
+from speech.speech_to_text.model_manager import WhisperModelManager
+from speech.speech_to_text.engines import STTEngine, create_engine, register_engine
+from speech.speech_to_text.streaming import StreamingTranscriber
+from speech.speech_to_text.stt_service import BatchedSTTService
+from speech.speech_to_text.transcript_cache import TranscriptCache
+from speech.speech_to_text.long_audio import LongAudioTranscriber
 from speech.speech_to_text.audio_capture import AudioCapture
 from speech.speech_to_text.vad import VoiceActivityDetector
+from speech.speech_to_text.trimmer import SilenceTrimmer
+from speech.speech_to_text.utterance_capture import UtteranceCapture
 from speech.text_to_speech.synthesizer import SpeechSynthesizer
 from speech.text_to_speech.audio_player import AudioPlayer
 from speech.text_to_speech.voice_config import VoiceConfig
+from speech.text_to_speech.audio_cache import AudioCache
 
 __all__ = [
     'SpeechRecognizer',
+    'WhisperModelManager',
+    'STTEngine',
+    'create_engine',
+    'register_engine',
+    'StreamingTranscriber',
+    'BatchedSTTService',
+    'TranscriptCache',
+    'LongAudioTranscriber',
     'AudioCapture',
     'VoiceActivityDetector',
+    'SilenceTrimmer',
+    'UtteranceCapture',
     'SpeechSynthesizer',
     'AudioPlayer',
-    'VoiceConfig'
+    'VoiceConfig',
+    'AudioCache'
 ]
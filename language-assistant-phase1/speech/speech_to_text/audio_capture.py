@@ -1,13 +1,84 @@
 """
 音频捕获模块
 从麦克风捕获音频输入
+
+默认使用PyAudio的回调模式：声卡数据在PortAudio的后台线程里放进有界队列，
+主线程做VAD、识别线程做识别时稍慢一些也不会让声卡缓冲区溢出；
+录到的音频直接写进缓冲区（第一次写入时按预设容量分配），stop_recording返回视图，不再拼接复制；
+调用方自己保存音频时（如整句录音）可以关闭这份累积
 """
 
+import queue
 import wave
+import numpy as np
 import pyaudio
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from utils.logger import logger
+from utils.metrics import metrics
+
+CAPTURE_DROPPED = metrics.counter(
+    "audio_capture_dropped_chunks_total", "录音队列满时丢弃的音频块数"
+)
+CAPTURE_OVERFLOWS = metrics.counter(
+    "audio_input_overflows_total", "声卡输入缓冲区溢出次数"
+)
+CAPTURE_QUEUE = metrics.gauge(
+    "audio_capture_queue_chunks", "录音队列中等待处理的音频块数"
+)
+
+
+class RecordingBuffer:
+    """按预设容量分配、容量不足时倍增的录音缓冲区（第一次写入时才分配）"""
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: 初始容量（字节）
+        """
+        self.capacity = capacity
+        self._data = np.empty(0, dtype=np.uint8)
+        self._view = memoryview(self._data)
+        self.length = 0
+        self.allocations = 0
+
+    def append(self, data: bytes) -> memoryview:
+        """
+        把一块音频写到缓冲区末尾
+
+        Args:
+            data: 音频数据（bytes或字节格式的内存视图）
+
+        Returns:
+            memoryview: 这块音频在缓冲区中的视图
+        """
+        start, end = self.length, self.length + len(data)
+        if end > len(self._data):
+            # 倍增扩容：之前返回的视图仍指向旧数组，内容不变
+            grown = np.empty(max(end, self.capacity, 2 * len(self._data)), dtype=np.uint8)
+            grown[:start] = self._data[:start]
+            self._data = grown
+            self._view = memoryview(grown)
+            self.allocations += 1
+        self._view[start:end] = data
+        self.length = end
+        return self._view[start:end]
+
+    def view(self) -> memoryview:
+        """已录音频的字节视图（不复制；下次clear后会被新录音覆盖，需要保留时自行复制）"""
+        return self._view[:self.length]
+
+    def samples(self, dtype: str = "<i2") -> np.ndarray:
+        """已录音频的采样数组视图（不复制）"""
+        usable = self.length - self.length % np.dtype(dtype).itemsize
+        return self._data[:usable].view(dtype)
+
+    def clear(self):
+        """清空（保留已分配的内存）"""
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
 
 
 class AudioCapture:
@@ -18,7 +89,11 @@ class AudioCapture:
         sample_rate: int = 16000,
         channels: int = 1,
         chunk_size: int = 1024,
-        format: int = pyaudio.paInt16
+        format: int = pyaudio.paInt16,
+        use_callback: bool = True,
+        queue_chunks: int = 64,
+        read_timeout: float = 2.0,
+        buffer_seconds: float = 30.0
     ):
         """
         初始化音频捕获器
@@ -28,58 +103,133 @@ class AudioCapture:
             channels: 声道数
             chunk_size: 每次读取的帧数
             format: 音频格式
+            use_callback: 是否使用回调模式在后台线程录音（False时在调用线程阻塞读取）
+            queue_chunks: 回调模式下队列最多缓存的音频块数（默认64块约4秒），满时丢弃最旧的块
+            read_timeout: 回调模式下等待下一块音频的最长时间（秒）
+            buffer_seconds: 录音缓冲区的初始容量（秒，第一次写入时分配），录音更长时自动倍增
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk_size = chunk_size
         self.format = format
+        self.use_callback = use_callback
+        self.read_timeout = read_timeout
 
         self.audio = pyaudio.PyAudio()
         self.stream = None
-        self.frames = []
+        self.buffer = RecordingBuffer(
+            int(buffer_seconds * sample_rate) * channels * self.audio.get_sample_size(format)
+        )
+
+        # 回调线程 -> 消费者的有界队列
+        self._queue: "queue.Queue[bytes]" = queue.Queue(maxsize=queue_chunks)
+        self.captured_chunks = 0
+        self.dropped_chunks = 0
+        self.input_overflows = 0
+        self._losses_at_start = (0, 0)
+        self._keep_audio = True
 
         logger.info("音频捕获器初始化完成")
 
-    def start_recording(self):
-        """开始录音"""
-        self.frames = []
+    def start_recording(self, keep_audio: bool = True):
+        """
+        开始录音（复用录音缓冲区，上次录音返回的视图会被覆盖）
+
+        Args:
+            keep_audio: 是否把录到的音频累积到录音缓冲区；调用方自己保存音频时设为False，
+                省去每块的复制，stop_recording返回空视图
+        """
+        self.buffer.clear()
+        self._keep_audio = keep_audio
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._losses_at_start = (self.dropped_chunks, self.input_overflows)
         self.stream = self.audio.open(
             format=self.format,
             channels=self.channels,
             rate=self.sample_rate,
             input=True,
-            frames_per_buffer=self.chunk_size
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._on_audio if self.use_callback else None
         )
         logger.info("开始录音...")
 
-    def record_chunk(self) -> bytes:
+    def _on_audio(self, in_data: bytes, frame_count: int, time_info: Dict, status_flags: int):
+        """PyAudio回调（在PortAudio的后台线程中调用）：只把数据放进队列，不做其他处理"""
+        self.captured_chunks += 1
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+            CAPTURE_OVERFLOWS.inc()
+        try:
+            self._queue.put_nowait(in_data)
+        except queue.Full:
+            # 消费跟不上时丢掉最旧的块，保证最新的音频不丢（只有这个线程放入，腾出位置后一定放得进）
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped_chunks += 1
+            CAPTURE_DROPPED.inc()
+            self._queue.put_nowait(in_data)
+        return None, pyaudio.paContinue
+
+    def record_chunk(self) -> memoryview:
         """
-        录制一个音频块
+        录制一个音频块（回调模式下从队列取出下一块）
 
         Returns:
-            bytes: 音频数据
+            memoryview: 这块音频在录音缓冲区中的视图（不累积音频时为这块数据本身的视图）
+
+        Raises:
+            RuntimeError: 录音流未启动，或回调模式下等待超时
         """
         if not self.stream:
             raise RuntimeError("录音流未启动")
 
-        data = self.stream.read(self.chunk_size)
-        self.frames.append(data)
-        return data
+        if self.use_callback:
+            try:
+                data = self._queue.get(timeout=self.read_timeout)
+            except queue.Empty:
+                raise RuntimeError(f"{self.read_timeout}秒内没有收到音频数据")
+            CAPTURE_QUEUE.set(self._queue.qsize())
+        else:
+            data = self.stream.read(self.chunk_size)
+        if not self._keep_audio:
+            return memoryview(data)
+        return self.buffer.append(data)
+
+    def get_stats(self) -> Dict:
+        """
+        获取录音统计
 
-    def stop_recording(self) -> bytes:
+        Returns:
+            Dict: 录到的块数、因队列满丢弃的块数、声卡输入溢出次数、队列中等待处理的块数
+        """
+        return {
+            "mode": "callback" if self.use_callback else "blocking",
+            "captured_chunks": self.captured_chunks,
+            "dropped_chunks": self.dropped_chunks,
+            "input_overflows": self.input_overflows,
+            "queued_chunks": self._queue.qsize()
+        }
+
+    def stop_recording(self) -> memoryview:
         """
         停止录音
 
         Returns:
-            bytes: 完整的音频数据
+            memoryview: 完整音频在录音缓冲区中的视图（下次开始录音前有效；不累积音频时为空）
         """
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
             self.stream = None
 
+        dropped = self.dropped_chunks - self._losses_at_start[0]
+        overflows = self.input_overflows - self._losses_at_start[1]
+        if dropped or overflows:
+            logger.warning(f"本次录音丢弃 {dropped} 块音频，声卡输入溢出 {overflows} 次")
         logger.info("停止录音")
-        return b''.join(self.frames)
+        return self.buffer.view()
 
     def save_to_file(self, filename: str, audio_data: Optional[bytes] = None):
         """
@@ -87,10 +237,10 @@ class AudioCapture:
 
         Args:
             filename: 文件名
-            audio_data: 音频数据（如果为None，使用当前frames）
+            audio_data: 音频数据（如果为None，使用录音缓冲区中的音频）
         """
         if audio_data is None:
-            audio_data = b''.join(self.frames)
+            audio_data = self.buffer.view()
 
         filepath = Path(filename)
         filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -103,7 +253,7 @@ class AudioCapture:
 
         logger.info(f"音频已保存到: {filename}")
 
-    def record_fixed_duration(self, duration: float) -> bytes:
+    def record_fixed_duration(self, duration: float) -> memoryview:
         """
         录制固定时长的音频
 
@@ -111,7 +261,7 @@ class AudioCapture:
             duration: 录制时长（秒）
 
         Returns:
-            bytes: 音频数据
+            memoryview: 音频数据
         """
         self.start_recording()
 
@@ -0,0 +1,434 @@
+"""
+语音识别引擎模块
+把具体的识别后端（openai-whisper、faster-whisper等）封装成统一接口，通过注册表按名称创建
+"""
+
+import time
+import wave
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+import numpy as np
+import torch
+import whisper
+import yaml
+
+from utils.logger import logger
+from utils.error_handler import SpeechRecognitionError
+from speech.speech_to_text.model_manager import (
+    WhisperModelManager, model_manager, decode_options, WHISPER_SAMPLE_RATE
+)
+
+DEFAULT_SETTINGS_PATH = Path(__file__).parent.parent.parent / "config" / "settings.yaml"
+
+# 引擎名称 -> 引擎类
+_ENGINES: Dict[str, Type["STTEngine"]] = {}
+
+
+def register_engine(name: str) -> Callable[[Type["STTEngine"]], Type["STTEngine"]]:
+    """
+    注册识别引擎（类装饰器）
+
+    Args:
+        name: 引擎名称（配置文件中speech_to_text.engine的取值）
+    """
+    def decorator(cls: Type["STTEngine"]) -> Type["STTEngine"]:
+        cls.name = name
+        _ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+def available_engines() -> List[str]:
+    """已注册的引擎名称"""
+    return sorted(_ENGINES)
+
+
+def create_engine(name: str, **options) -> "STTEngine":
+    """
+    按名称创建识别引擎
+
+    Args:
+        name: 引擎名称
+        **options: 传给引擎构造函数的参数（如model_name、compute_type）
+
+    Returns:
+        STTEngine: 识别引擎
+
+    Raises:
+        SpeechRecognitionError: 引擎未注册
+    """
+    cls = _ENGINES.get(name)
+    if cls is None:
+        raise SpeechRecognitionError(
+            f"未知的语音识别引擎: {name} (可用: {', '.join(available_engines())})"
+        )
+    return cls(**options)
+
+
+def load_stt_config(path: Union[str, Path] = DEFAULT_SETTINGS_PATH) -> Dict:
+    """
+    读取配置文件中的speech_to_text部分
+
+    Args:
+        path: 配置文件路径
+
+    Returns:
+        Dict: 语音识别配置（文件不存在时为空字典）
+    """
+    path = Path(path)
+    if not path.exists():
+        logger.warning(f"配置文件不存在，使用默认识别配置: {path}")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return (yaml.safe_load(f) or {}).get("speech_to_text") or {}
+
+
+def _read_wav(path: Union[str, Path]) -> np.ndarray:
+    """读取16位PCM WAV文件为float32数组（不做重采样）"""
+    with wave.open(str(path), "rb") as wf:
+        frames = wf.readframes(wf.getnframes())
+        channels = wf.getnchannels()
+    samples = np.frombuffer(frames, dtype="<i2").reshape(-1, channels)
+    return samples.mean(axis=1, dtype=np.float32) / 32768.0
+
+
+class STTEngine:
+    """识别引擎基类"""
+
+    name = ""
+
+    def __init__(self, model_name: str = "base", decode_params: Optional[Dict] = None):
+        """
+        初始化识别引擎
+
+        Args:
+            model_name: 模型名称
+            decode_params: 解码参数（beam_size, best_of, temperature, condition_on_previous_text）
+        """
+        self.model_name = model_name
+        self.decode_params = dict(decode_params or {})
+        self.model = None
+
+    def load(self):
+        """加载模型（已加载时立即返回）"""
+        raise NotImplementedError
+
+    def preload(self, warmup: bool = True, language: Optional[str] = None) -> Future:
+        """
+        在后台预加载模型（默认在当前线程加载）
+
+        Args:
+            warmup: 加载后是否做一次预热解码
+            language: 预热解码使用的语言
+
+        Returns:
+            Future: 加载完成后得到模型
+        """
+        future = Future()
+        try:
+            self.load()
+            future.set_result(self.model)
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: Optional[str]) -> str:
+        """
+        识别一段音频
+
+        Args:
+            audio: 音频文件路径，或16kHz单声道float32数组
+            language: 识别语言代码
+
+        Returns:
+            str: 识别文本
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str]) -> List[str]:
+        """
+        识别多段音频（默认逐段识别，支持批量解码的引擎可重写）
+
+        Args:
+            audios: 16kHz单声道float32音频列表
+            language: 识别语言代码
+
+        Returns:
+            List[str]: 与输入顺序一致的识别文本
+        """
+        return [self.transcribe(audio, language) for audio in audios]
+
+    def detect_language(self, audio: np.ndarray) -> Dict[str, float]:
+        """
+        检测音频的语种
+
+        Args:
+            audio: 16kHz单声道float32音频（通常只取开头几秒）
+
+        Returns:
+            Dict[str, float]: 语种代码 -> 概率
+        """
+        raise NotImplementedError(f"{self.name}引擎不支持语种识别")
+
+    def unload(self):
+        """释放模型引用"""
+        self.model = None
+
+    def get_stats(self) -> Optional[Dict]:
+        """模型加载统计（不支持时为None）"""
+        return None
+
+    def decode_signature(self) -> Dict:
+        """影响识别结果的引擎参数（模型名称和语言之外），用作识别结果缓存键的一部分"""
+        return {"decode_params": self.decode_params} if self.decode_params else {}
+
+
+@register_engine("whisper")
+class WhisperEngine(STTEngine):
+    """openai-whisper引擎（PyTorch，CPU上为fp32）"""
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        manager: Optional[WhisperModelManager] = None,
+        decode_params: Optional[Dict] = None
+    ):
+        """
+        初始化Whisper引擎
+
+        Args:
+            model_name: Whisper模型名称 (tiny, base, small, medium, large)
+            manager: 模型管理器（默认使用进程内共享的管理器）
+            decode_params: 传给model.transcribe的解码参数（默认使用Whisper的默认值）
+        """
+        super().__init__(model_name, decode_params)
+        self.manager = manager or model_manager
+
+    def load(self):
+        """获取共享的Whisper模型（正在预加载时等待完成）"""
+        if self.model is None:
+            self.model = self.manager.get(self.model_name)
+
+    def preload(self, warmup: bool = True, language: Optional[str] = None) -> Future:
+        """在后台线程预加载并预热模型"""
+        return self.manager.preload(self.model_name, warmup=warmup, language=language)
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: Optional[str]) -> str:
+        """识别一段音频"""
+        self.load()
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            verbose=False,
+            # 预设或engine_options中的参数（如fp16）覆盖按设备选择的默认值
+            **{**decode_options(self.model), **self.decode_params}
+        )
+        return result["text"].strip()
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: Optional[str]) -> List[str]:
+        """
+        批量识别（各自补齐到30秒后合并成一个批次解码）
+
+        超过30秒的音频无法放进一个窗口，单独识别
+        """
+        self.load()
+
+        texts: List[Optional[str]] = [None] * len(audios)
+        batch = []
+        for i, audio in enumerate(audios):
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                batch.append(i)
+            else:
+                texts[i] = self.transcribe(audio, language)
+
+        if batch:
+            n_mels = self.model.dims.n_mels
+            mel = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(torch.from_numpy(audios[i])), n_mels
+                )
+                for i in batch
+            ]).to(self.model.device)
+            # 批量解码没有温度回退，只取第一个温度
+            temperature = self.decode_params.get("temperature", 0.0)
+            if isinstance(temperature, (list, tuple)):
+                temperature = temperature[0]
+            options = whisper.DecodingOptions(
+                language=language,
+                without_timestamps=True,
+                temperature=temperature,
+                # 与model.transcribe相同：贪心时才用束搜索，采样时才用best_of
+                beam_size=self.decode_params.get("beam_size") if temperature == 0 else None,
+                best_of=self.decode_params.get("best_of") if temperature > 0 else None,
+                fp16=self.decode_params.get("fp16", decode_options(self.model).get("fp16", True))
+            )
+            for i, result in zip(batch, whisper.decode(self.model, mel, options)):
+                texts[i] = result.text.strip()
+
+        return texts
+
+    def detect_language(self, audio: np.ndarray) -> Dict[str, float]:
+        """用Whisper自带的语种检测（只跑一次编码器和一步解码，远比完整解码快）"""
+        self.load()
+        if not self.model.is_multilingual:
+            return {"en": 1.0}
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(torch.from_numpy(audio)), self.model.dims.n_mels
+        ).to(self.model.device)
+        _, probs = self.model.detect_language(mel)
+        return probs
+
+    def unload(self):
+        """释放模型（同时从共享管理器中移除）"""
+        self.manager.unload(self.model_name)
+        self.model = None
+
+    def get_stats(self) -> Optional[Dict]:
+        """模型加载统计"""
+        return self.manager.get_stats().get(self.model_name)
+
+
+def _load_ctranslate2_model(key: str) -> Any:
+    """加载faster-whisper模型，key格式为 "模型名称:计算类型:线程数" """
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError:
+        raise SpeechRecognitionError(
+            "faster-whisper引擎需要安装faster-whisper: pip install faster-whisper"
+        )
+    model_name, compute_type, cpu_threads = key.split(":")
+    return WhisperModel(
+        model_name, device="cpu", compute_type=compute_type, cpu_threads=int(cpu_threads)
+    )
+
+
+# faster-whisper模型与openai-whisper模型分开管理，同样在进程内共享
+ctranslate2_manager = WhisperModelManager(loader=_load_ctranslate2_model)
+
+
+@register_engine("faster-whisper")
+class FasterWhisperEngine(STTEngine):
+    """faster-whisper引擎（CTranslate2，CPU上使用int8量化权重，比fp32 PyTorch快数倍）"""
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        manager: Optional[WhisperModelManager] = None,
+        decode_params: Optional[Dict] = None
+    ):
+        """
+        初始化faster-whisper引擎
+
+        Args:
+            model_name: 模型名称 (tiny, base, small, medium, large-v3)
+            compute_type: 计算类型 (int8, int8_float32, float32)
+            cpu_threads: 推理线程数（0表示由CTranslate2自动决定）
+            manager: 模型管理器（默认使用进程内共享的faster-whisper管理器）
+            decode_params: 解码参数（与openai-whisper同名）
+        """
+        super().__init__(model_name, decode_params)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.manager = manager or ctranslate2_manager
+        self._key = f"{model_name}:{compute_type}:{cpu_threads}"
+
+    def load(self):
+        """获取共享的faster-whisper模型"""
+        if self.model is None:
+            self.model = self.manager.get(self._key)
+
+    def preload(self, warmup: bool = True, language: Optional[str] = None) -> Future:
+        """在后台线程预加载模型（faster-whisper首次推理没有明显的初始化开销，不做预热）"""
+        return self.manager.preload(self._key, warmup=False)
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: Optional[str]) -> str:
+        """识别一段音频"""
+        self.load()
+        params = dict(self.decode_params)
+        # 未指定beam_size时与openai-whisper默认一致使用贪心解码（faster-whisper默认为5）
+        params["beam_size"] = params.get("beam_size") or 1
+        # segments是惰性生成器，遍历时才真正解码
+        segments, _ = self.model.transcribe(audio, language=language, **params)
+        return "".join(segment.text for segment in segments).strip()
+
+    def detect_language(self, audio: np.ndarray) -> Dict[str, float]:
+        """用faster-whisper的语种检测"""
+        self.load()
+        _, _, all_probs = self.model.detect_language(audio)
+        return dict(all_probs)
+
+    def unload(self):
+        """释放模型（同时从共享管理器中移除）"""
+        self.manager.unload(self._key)
+        self.model = None
+
+    def get_stats(self) -> Optional[Dict]:
+        """模型加载统计"""
+        return self.manager.get_stats().get(self._key)
+
+    def decode_signature(self) -> Dict:
+        """量化方式也会改变识别结果"""
+        return {**super().decode_signature(), "compute_type": self.compute_type}
+
+
+@register_engine("fake")
+class FakeEngine(STTEngine):
+    """确定性的假引擎（用于测试和基准对照，不需要模型权重）"""
+
+    def __init__(
+        self,
+        model_name: str = "fake",
+        text: Optional[str] = None,
+        realtime_factor: float = 0.0,
+        decode_params: Optional[Dict] = None
+    ):
+        """
+        初始化假引擎
+
+        Args:
+            model_name: 模型名称（仅用于显示）
+            text: 固定返回的文本（默认返回音频时长，如 "1.50s"）
+            realtime_factor: 模拟的处理耗时与音频时长之比
+            decode_params: 解码参数（只记录，不影响结果）
+        """
+        super().__init__(model_name, decode_params)
+        self.text = text
+        self.realtime_factor = realtime_factor
+        self.calls: List[int] = []
+
+    def load(self):
+        """无需加载"""
+        self.model = self
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: Optional[str]) -> str:
+        """返回固定文本或音频时长"""
+        if isinstance(audio, (str, Path)):
+            audio = _read_wav(audio)
+        self.calls.append(len(audio))
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+        if self.realtime_factor:
+            time.sleep(duration * self.realtime_factor)
+        return self.text if self.text is not None else f"{duration:.2f}s"
+
+    def decode_signature(self) -> Dict:
+        """固定文本决定识别结果"""
+        return {**super().decode_signature(), "text": self.text}
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    print(f"可用引擎: {available_engines()}")
+    config = load_stt_config()
+    print(f"配置的引擎: {config.get('engine', 'whisper')}")
+
+    engine = create_engine("fake")
+    print(engine.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), "zh"))
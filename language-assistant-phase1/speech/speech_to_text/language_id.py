@@ -0,0 +1,150 @@
+"""
+语种识别模块
+解码前用音频开头几秒判断语种，按会话记住结果并带迟滞，避免在中法文之间来回跳
+"""
+
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+
+LANGUAGE_DETECTIONS = metrics.counter(
+    "stt_language_detections_total", "语种识别结果次数", ["language"]
+)
+LANGUAGE_SWITCHES = metrics.counter(
+    "stt_language_switches_total", "会话内识别语种切换次数"
+)
+
+
+class LanguageIdentifier:
+    """带迟滞的按会话语种识别器"""
+
+    def __init__(
+        self,
+        engine,
+        candidates: Sequence[str] = ("zh", "fr"),
+        default: Optional[str] = None,
+        probe_seconds: float = 3.0,
+        min_confidence: float = 0.5,
+        switch_margin: float = 0.2
+    ):
+        """
+        初始化语种识别器
+
+        Args:
+            engine: 识别引擎（需实现detect_language）
+            candidates: 候选语种，检测结果只在这些语种中比较
+            default: 置信度不足或检测失败时使用的语种（默认第一个候选）
+            probe_seconds: 只用音频开头这么多秒做检测
+            min_confidence: 会话第一次检测时，最高概率低于该值则使用默认语种
+            switch_margin: 新语种的概率至少比当前语种高出这么多才切换
+        """
+        self.engine = engine
+        self.candidates = list(candidates)
+        self.default = default or self.candidates[0]
+        self.probe_samples = int(probe_seconds * WHISPER_SAMPLE_RATE)
+        self.min_confidence = min_confidence
+        self.switch_margin = switch_margin
+
+        # 会话ID -> 当前语种
+        self._current: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._supported = True
+
+    def detect(self, audio: np.ndarray) -> Dict[str, float]:
+        """
+        检测语种概率（只保留候选语种并重新归一化）
+
+        Args:
+            audio: 16kHz单声道float32音频
+
+        Returns:
+            Dict[str, float]: 语种 -> 概率；检测失败时为空字典
+        """
+        if not self._supported:
+            return {}
+        try:
+            probs = self.engine.detect_language(audio[:self.probe_samples])
+        except NotImplementedError as e:
+            # 引擎不支持语种识别，之后不再尝试
+            self._supported = False
+            logger.warning(f"{e}，固定使用默认语种: {self.default}")
+            return {}
+        except Exception as e:
+            logger.warning(f"语种识别失败，使用默认语种: {e}")
+            return {}
+
+        scores = {language: float(probs.get(language, 0.0)) for language in self.candidates}
+        total = sum(scores.values())
+        if total <= 0:
+            return {}
+        return {language: score / total for language, score in scores.items()}
+
+    def choose(self, audio: np.ndarray, session_id: str = "default") -> str:
+        """
+        为一段音频选择解码语种
+
+        Args:
+            audio: 16kHz单声道float32音频
+            session_id: 会话ID，每个会话单独记住当前语种
+
+        Returns:
+            str: 解码语种
+        """
+        probs = self.detect(audio)
+        with self._lock:
+            current = self._current.get(session_id)
+            if not probs:
+                return current or self.default
+
+            best = max(probs, key=probs.get)
+            if current is None:
+                chosen = best if probs[best] >= self.min_confidence else self.default
+            elif best != current and probs[best] - probs.get(current, 0.0) >= self.switch_margin:
+                chosen = best
+                LANGUAGE_SWITCHES.inc()
+                logger.info(f"会话 {session_id} 识别语种切换: {current} -> {best}")
+            else:
+                chosen = current
+            self._current[session_id] = chosen
+
+        LANGUAGE_DETECTIONS.labels(chosen).inc()
+        logger.debug(f"语种识别: {probs} -> {chosen}")
+        return chosen
+
+    def current(self, session_id: str = "default") -> Optional[str]:
+        """会话当前的语种（尚未检测时为None）"""
+        return self._current.get(session_id)
+
+    def reset(self, session_id: Optional[str] = None):
+        """
+        清除记住的语种
+
+        Args:
+            session_id: 会话ID（None表示清除所有会话）
+        """
+        with self._lock:
+            if session_id is None:
+                self._current.clear()
+            else:
+                self._current.pop(session_id, None)
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    from speech.speech_to_text.engines import create_engine
+
+    identifier = LanguageIdentifier(create_engine("whisper", model_name="tiny"))
+    silence = np.zeros(WHISPER_SAMPLE_RATE * 2, dtype=np.float32)
+    print(f"检测结果: {identifier.detect(silence)}")
+    print(f"选择语种: {identifier.choose(silence)}")
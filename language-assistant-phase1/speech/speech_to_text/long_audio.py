@@ -0,0 +1,332 @@
+"""
+长音频识别模块
+在停顿处把长录音切成若干段，用进程池并行识别，按时间顺序逐段返回带时间戳的结果
+"""
+
+import multiprocessing
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.logger import logger
+from utils.error_handler import SpeechRecognitionError
+from speech.speech_to_text.recognizer import SpeechRecognizer, pcm16_to_float32
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+from speech.speech_to_text.trimmer import frame_rms
+
+
+class TranscriptSegment:
+    """一段带时间戳的识别结果"""
+
+    __slots__ = ("index", "start", "end", "text")
+
+    def __init__(self, index: int, start: float, end: float, text: str):
+        """
+        Args:
+            index: 段序号
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+            text: 识别文本
+        """
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def to_dict(self) -> Dict:
+        """转换为字典"""
+        return {"index": self.index, "start": self.start, "end": self.end, "text": self.text}
+
+    def __repr__(self):
+        return f"TranscriptSegment({self.start:.2f}-{self.end:.2f}s, {self.text!r})"
+
+
+def split_on_pauses(
+    audio: np.ndarray,
+    sample_rate: int = WHISPER_SAMPLE_RATE,
+    energy_threshold: float = 300.0,
+    min_pause_seconds: float = 0.5,
+    max_segment_seconds: float = 30.0,
+    frame_seconds: float = 0.03
+) -> List[Tuple[int, int]]:
+    """
+    在停顿处切分音频
+
+    先在每段足够长的静音中点切开，过长的段在后半部分最安静的帧处再切，丢掉纯静音段，
+    最后把相邻的段合并到不超过max_segment_seconds（Whisper一次处理30秒，段太短反而更慢、上下文更少）
+
+    Args:
+        audio: float32音频，取值范围[-1, 1]
+        sample_rate: 采样率
+        energy_threshold: 语音能量阈值（16位PCM的RMS，与VoiceActivityDetector一致）
+        min_pause_seconds: 可以切分的最短停顿
+        max_segment_seconds: 每段的最大时长
+        frame_seconds: 能量计算的帧长
+
+    Returns:
+        List[Tuple[int, int]]: 各段的 (起始采样, 结束采样)
+    """
+    frame = max(1, int(frame_seconds * sample_rate))
+    n = len(audio) // frame
+    if n == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    rms = frame_rms(audio, frame) * 32768
+    voiced = rms > energy_threshold
+    if not voiced.any():
+        return []
+
+    # 足够长的静音段（含开头结尾）在中点切开
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], (~voiced).astype(np.int8), [0]])))
+    min_pause = max(1, int(min_pause_seconds / frame_seconds))
+    cuts = [(s + e) // 2 for s, e in zip(edges[::2], edges[1::2]) if e - s >= min_pause]
+    bounds = sorted({0, n, *cuts})
+
+    max_frames = max(2, int(max_segment_seconds / frame_seconds))
+    pieces = []
+    for start, end in zip(bounds, bounds[1:]):
+        while end - start > max_frames:
+            low = start + max_frames // 2
+            cut = low + int(np.argmin(rms[low:start + max_frames]))
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    segments: List[List[int]] = []
+    for start, end in pieces:
+        if not voiced[start:end].any():
+            continue
+        if segments and end - segments[-1][0] <= max_frames:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end])
+
+    return [
+        (start * frame, len(audio) if end == n else end * frame)
+        for start, end in segments
+    ]
+
+
+def load_audio_file(path: Union[str, Path]) -> np.ndarray:
+    """
+    读取音频文件为16kHz单声道float32数组
+
+    WAV文件直接读取，其他格式交给Whisper通过ffmpeg解码
+
+    Args:
+        path: 音频文件路径
+
+    Returns:
+        np.ndarray: 音频数组
+
+    Raises:
+        SpeechRecognitionError: 文件不存在
+    """
+    path = Path(path)
+    if not path.exists():
+        raise SpeechRecognitionError(f"音频文件不存在: {path}")
+
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as wf:
+            if wf.getsampwidth() == 2:
+                return pcm16_to_float32(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+
+    import whisper
+    return whisper.load_audio(str(path))
+
+
+# 工作进程内的识别器（每个进程只加载一次模型）
+_worker_recognizer: Optional[SpeechRecognizer] = None
+
+
+def _init_worker(
+    engine: str,
+    model_name: str,
+    language: str,
+    engine_options: Dict,
+    threads: int,
+    languages: Sequence[str]
+):
+    """工作进程初始化：限制推理线程数并加载模型"""
+    global _worker_recognizer
+    import torch
+    torch.set_num_threads(threads)
+    _worker_recognizer = SpeechRecognizer(
+        model_name=model_name, language=language, engine=engine,
+        engine_options=engine_options, languages=languages
+    )
+    _worker_recognizer.load_model()
+
+
+def _transcribe_segment(audio: np.ndarray) -> str:
+    """在工作进程中识别一段音频（自动识别语种时各段独立判断，不依赖分到哪个进程）"""
+    return _worker_recognizer.recognize_batch([audio])[0]
+
+
+class LongAudioTranscriber:
+    """长音频并行识别器"""
+
+    def __init__(
+        self,
+        engine: str = "whisper",
+        model_name: str = "base",
+        language: str = "zh",
+        engine_options: Optional[Dict] = None,
+        workers: Optional[int] = None,
+        languages: Sequence[str] = ("zh", "fr"),
+        energy_threshold: float = 300.0,
+        min_pause_seconds: float = 0.5,
+        max_segment_seconds: float = 30.0
+    ):
+        """
+        初始化长音频识别器
+
+        工作进程用spawn方式启动，引擎需在模块导入时完成注册（如内置引擎）
+
+        Args:
+            engine: 识别引擎名称
+            model_name: 模型名称
+            language: 识别语言代码
+            engine_options: 创建引擎时的额外参数
+            workers: 工作进程数（默认CPU核数的一半，每个进程各持有一份模型）
+            languages: language为auto时的候选语种（第一个为默认）
+            energy_threshold: 切分用的语音能量阈值
+            min_pause_seconds: 可以切分的最短停顿
+            max_segment_seconds: 每段的最大时长
+        """
+        self.engine = engine
+        self.model_name = model_name
+        self.language = language
+        self.engine_options = dict(engine_options or {})
+        self.languages = tuple(languages)
+        cores = os.cpu_count() or 1
+        self.workers = workers or max(1, cores // 2)
+        self.threads_per_worker = max(1, cores // self.workers)
+        self.energy_threshold = energy_threshold
+        self.min_pause_seconds = min_pause_seconds
+        self.max_segment_seconds = max_segment_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """创建（或复用）进程池，模型在各进程启动时加载一次"""
+        if self._executor is None:
+            logger.info(
+                f"启动识别进程池: {self.workers} 个进程, 每个 {self.threads_per_worker} 线程 "
+                f"(引擎: {self.engine}, 模型: {self.model_name})"
+            )
+            # PyTorch的线程池在fork后可能死锁，使用spawn
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    self.engine, self.model_name, self.language,
+                    self.engine_options, self.threads_per_worker, self.languages
+                )
+            )
+        return self._executor
+
+    def iter_transcribe(
+        self,
+        audio: np.ndarray,
+        sample_rate: int = WHISPER_SAMPLE_RATE
+    ) -> Iterator[TranscriptSegment]:
+        """
+        并行识别，按时间顺序逐段产出结果（前面的段一完成就返回，不等全部结束）
+
+        Args:
+            audio: 16kHz单声道float32音频
+            sample_rate: 采样率
+
+        Yields:
+            TranscriptSegment: 识别结果
+        """
+        spans = split_on_pauses(
+            audio, sample_rate,
+            energy_threshold=self.energy_threshold,
+            min_pause_seconds=self.min_pause_seconds,
+            max_segment_seconds=self.max_segment_seconds
+        )
+        logger.info(f"长音频识别: {len(audio) / sample_rate:.1f}秒, 切分为 {len(spans)} 段")
+
+        executor = self._get_executor()
+        futures = [executor.submit(_transcribe_segment, audio[start:end]) for start, end in spans]
+        try:
+            for index, (future, (start, end)) in enumerate(zip(futures, spans)):
+                yield TranscriptSegment(index, start / sample_rate, end / sample_rate, future.result())
+        finally:
+            # 调用方提前停止迭代时，取消尚未开始的段
+            for future in futures:
+                future.cancel()
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        on_segment: Optional[Callable[[TranscriptSegment], None]] = None
+    ) -> List[TranscriptSegment]:
+        """
+        识别整段音频
+
+        Args:
+            audio: 16kHz单声道float32音频
+            on_segment: 每段完成时的回调（按时间顺序）
+
+        Returns:
+            List[TranscriptSegment]: 按时间顺序的识别结果
+        """
+        segments = []
+        for segment in self.iter_transcribe(audio):
+            segments.append(segment)
+            if on_segment:
+                on_segment(segment)
+        return segments
+
+    def transcribe_file(
+        self,
+        audio_file: Union[str, Path],
+        on_segment: Optional[Callable[[TranscriptSegment], None]] = None
+    ) -> List[TranscriptSegment]:
+        """
+        识别音频文件
+
+        Args:
+            audio_file: 音频文件路径
+            on_segment: 每段完成时的回调（按时间顺序）
+
+        Returns:
+            List[TranscriptSegment]: 按时间顺序的识别结果
+        """
+        return self.transcribe(load_audio_file(audio_file), on_segment)
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    if len(sys.argv) < 2:
+        print("用法: python long_audio.py <音频文件> [工作进程数]")
+        sys.exit(1)
+
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    with LongAudioTranscriber(model_name="base", language="zh", workers=workers) as transcriber:
+        for segment in transcriber.iter_transcribe(load_audio_file(sys.argv[1])):
+            print(f"[{segment.start:7.2f} - {segment.end:7.2f}] {segment.text}")
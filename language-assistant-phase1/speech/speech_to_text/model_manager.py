@@ -0,0 +1,231 @@
+"""
+Whisper模型管理模块
+进程内每种模型只加载一次，所有识别器共享同一份权重，支持后台预加载和预热
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import whisper
+
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.error_handler import SpeechRecognitionError
+
+MODEL_LOAD_SECONDS = metrics.gauge(
+    "stt_model_load_seconds", "语音识别模型加载耗时（秒）", ["model"]
+)
+MODEL_WEIGHTS_BYTES = metrics.gauge(
+    "stt_model_weights_bytes", "语音识别模型权重占用内存（字节）", ["model"]
+)
+
+# Whisper的输入采样率
+WHISPER_SAMPLE_RATE = 16000
+
+
+def _rss_bytes() -> Optional[int]:
+    """当前进程的常驻内存（仅Linux可用）"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    import resource
+    return pages * resource.getpagesize()
+
+
+def _weights_bytes(model: Any) -> Optional[int]:
+    """模型参数和缓冲区占用的字节数"""
+    if not hasattr(model, "parameters"):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def _best_effort(measure: Callable[[], Any], what: str) -> Any:
+    """执行一项统计，出错时记录日志并返回None"""
+    try:
+        return measure()
+    except Exception as e:
+        logger.warning(f"统计{what}失败（不影响使用）: {e}")
+        return None
+
+
+def decode_options(model: Any) -> Dict:
+    """CPU上关闭fp16，避免Whisper每次解码都打印警告"""
+    device = getattr(model, "device", None)
+    if device is not None and getattr(device, "type", None) != "cuda":
+        return {"fp16": False}
+    return {}
+
+
+class WhisperModelManager:
+    """Whisper模型管理器"""
+
+    def __init__(self, loader: Optional[Callable[[str], Any]] = None):
+        """
+        初始化模型管理器
+
+        Args:
+            loader: 模型加载函数（默认whisper.load_model）
+        """
+        self.loader = loader or whisper.load_model
+        self._models: Dict[str, Future] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, model_name: str):
+        """
+        取得模型对应的Future
+
+        Returns:
+            Tuple[Future, bool]: (Future, 是否由调用方负责加载)
+        """
+        with self._lock:
+            future = self._models.get(model_name)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._models[model_name] = future
+            return future, True
+
+    def _load(self, model_name: str, future: Future, warmup: bool, language: Optional[str]):
+        """加载模型并写入Future（可选预热解码）"""
+        logger.info(f"加载Whisper模型: {model_name}")
+        rss_before = _best_effort(_rss_bytes, "进程内存")
+        start = time.perf_counter()
+        # 加载出错要写入Future，否则等待get()的调用方会一直阻塞
+        try:
+            model = self.loader(model_name)
+        except Exception as e:
+            with self._lock:
+                # 允许之后重试
+                self._models.pop(model_name, None)
+            future.set_exception(SpeechRecognitionError(f"模型加载失败: {e}"))
+            logger.error(f"Whisper模型加载失败: {model_name}: {e}")
+            return
+
+        # 以下统计只用于观测，出错时记为None，不影响已加载的模型
+        load_seconds = time.perf_counter() - start
+        rss_after = _best_effort(_rss_bytes, "进程内存")
+        stats = {
+            "load_seconds": load_seconds,
+            "weights_bytes": _best_effort(lambda: _weights_bytes(model), "权重大小"),
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            "warmup_seconds": self._warmup(model, language) if warmup else None
+        }
+
+        with self._lock:
+            self._stats[model_name] = stats
+        _best_effort(lambda: MODEL_LOAD_SECONDS.labels(model_name).set(load_seconds), "加载耗时指标")
+        if stats["weights_bytes"] is not None:
+            _best_effort(lambda: MODEL_WEIGHTS_BYTES.labels(model_name).set(stats["weights_bytes"]), "权重指标")
+
+        future.set_result(model)
+        logger.info(
+            f"Whisper模型加载完成: {model_name} (耗时: {load_seconds:.2f}s, "
+            f"权重: {(stats['weights_bytes'] or 0) / 2**20:.1f} MB)"
+        )
+
+    @staticmethod
+    def _warmup(model: Any, language: Optional[str]) -> Optional[float]:
+        """用一秒静音做一次解码，提前完成首次推理的初始化开销"""
+        silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+        start = time.perf_counter()
+        try:
+            model.transcribe(silence, language=language, **decode_options(model))
+        except Exception as e:
+            logger.warning(f"模型预热失败（不影响使用）: {e}")
+            return None
+        return time.perf_counter() - start
+
+    def get(self, model_name: str, timeout: Optional[float] = None) -> Any:
+        """
+        获取模型（未加载时在当前线程加载；正在后台加载时等待）
+
+        Args:
+            model_name: 模型名称 (tiny, base, small, medium, large)
+            timeout: 等待后台加载的最长时间（秒）
+
+        Returns:
+            Any: 共享的模型对象
+
+        Raises:
+            SpeechRecognitionError: 模型加载失败
+        """
+        future, owner = self._claim(model_name)
+        if owner:
+            self._load(model_name, future, warmup=False, language=None)
+        return future.result(timeout)
+
+    def preload(
+        self,
+        model_name: str,
+        warmup: bool = True,
+        language: Optional[str] = None
+    ) -> Future:
+        """
+        在后台线程预加载模型
+
+        Args:
+            model_name: 模型名称
+            warmup: 加载后是否做一次预热解码
+            language: 预热解码使用的语言
+
+        Returns:
+            Future: 加载完成后得到模型
+        """
+        future, owner = self._claim(model_name)
+        if owner:
+            threading.Thread(
+                target=self._load,
+                args=(model_name, future, warmup, language),
+                name=f"whisper-preload-{model_name}",
+                daemon=True
+            ).start()
+        return future
+
+    def is_loaded(self, model_name: str) -> bool:
+        """模型是否已加载完成"""
+        future = self._models.get(model_name)
+        return future is not None and future.done() and future.exception() is None
+
+    def unload(self, model_name: str):
+        """释放模型（已持有引用的识别器不受影响）"""
+        with self._lock:
+            self._models.pop(model_name, None)
+            self._stats.pop(model_name, None)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        获取已加载模型的统计信息
+
+        Returns:
+            Dict[str, Dict]: 模型名称 -> 加载耗时、预热耗时、权重字节数、常驻内存增量
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# 进程内共享的模型管理器
+model_manager = WhisperModelManager()
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    future = model_manager.preload("tiny", warmup=True, language="zh")
+    print("后台加载中...")
+    model = model_manager.get("tiny")
+    assert model is future.result()
+
+    for name, stats in model_manager.get_stats().items():
+        print(f"{name}: {stats}")
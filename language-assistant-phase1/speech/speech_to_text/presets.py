@@ -0,0 +1,171 @@
+"""
+语音识别预设模块
+把模型大小和解码参数打包成命名预设，并可在启动时实测实时率自动选择
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.error_handler import SpeechRecognitionError
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+
+STT_CALIBRATION_RTF = metrics.gauge(
+    "stt_calibration_realtime_factor", "启动校准时测得的实时率", ["preset"]
+)
+
+# 按速度从快到慢排列
+STT_PRESETS: Dict[str, Dict] = {
+    # 最小的模型，贪心解码且不做温度回退
+    "realtime": {
+        "model_name": "tiny",
+        "decode_params": {"temperature": 0.0, "condition_on_previous_text": False}
+    },
+    # 贪心解码，只在压缩率或置信度异常时才回退到采样
+    "balanced": {
+        "model_name": "base",
+        "decode_params": {
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+            "condition_on_previous_text": False
+        }
+    },
+    # 更大的模型加束搜索
+    "accurate": {
+        "model_name": "small",
+        "decode_params": {
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+            "condition_on_previous_text": True
+        }
+    }
+}
+
+
+def get_preset(name: str) -> Dict:
+    """
+    获取预设
+
+    Args:
+        name: 预设名称 (realtime, balanced, accurate)
+
+    Returns:
+        Dict: {model_name, decode_params}
+
+    Raises:
+        SpeechRecognitionError: 预设不存在
+    """
+    preset = STT_PRESETS.get(name)
+    if preset is None:
+        raise SpeechRecognitionError(
+            f"未知的识别预设: {name} (可用: {', '.join(STT_PRESETS)}, auto)"
+        )
+    return preset
+
+
+def calibration_audio(seconds: float = 5.0) -> np.ndarray:
+    """生成校准用的合成音频（固定随机种子，每次结果相同）"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * WHISPER_SAMPLE_RATE)) / WHISPER_SAMPLE_RATE
+    # 按音节节奏起伏的谐波加少量噪声，比纯静音更接近真实的解码负载
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    voice = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((180, 360, 540), start=1))
+    return (0.1 * envelope * voice + 0.005 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def measure_rtf(recognizer, audio: np.ndarray) -> float:
+    """
+    测量识别器的实时率（先做一次短解码预热，不计入）
+
+    Args:
+        recognizer: 语音识别器
+        audio: 16kHz单声道float32音频
+
+    Returns:
+        float: 识别耗时 / 音频时长
+    """
+    language = recognizer.default_language
+    recognizer.load_model()
+    recognizer.engine.transcribe(audio[:WHISPER_SAMPLE_RATE], language)
+
+    start = time.perf_counter()
+    recognizer.engine.transcribe(audio, language)
+    return (time.perf_counter() - start) / (len(audio) / WHISPER_SAMPLE_RATE)
+
+
+def select_preset(
+    engine: str = "whisper",
+    language: str = "zh",
+    target_rtf: float = 0.5,
+    candidates: Optional[List[str]] = None,
+    audio: Optional[np.ndarray] = None,
+    engine_options: Optional[Dict] = None
+) -> Tuple[str, Dict[str, float]]:
+    """
+    从快到慢依次实测各预设，选出实时率不超过目标的最大预设
+
+    某个预设超出目标后不再测更大的预设；最快的预设也超出时仍选最快的
+
+    Args:
+        engine: 识别引擎名称
+        language: 识别语言代码
+        target_rtf: 目标实时率（识别耗时 / 音频时长）
+        candidates: 参与选择的预设（默认全部，按从快到慢排列）
+        audio: 校准音频（默认5秒合成音频）
+        engine_options: 创建引擎时的额外参数
+
+    Returns:
+        Tuple[str, Dict[str, float]]: (选中的预设, 预设 -> 实测实时率)
+    """
+    from speech.speech_to_text.recognizer import SpeechRecognizer
+
+    candidates = candidates or list(STT_PRESETS)
+    audio = audio if audio is not None else calibration_audio()
+    measured: Dict[str, float] = {}
+    recognizers = {}
+    selected = candidates[0]
+
+    for name in candidates:
+        recognizer = recognizers[name] = SpeechRecognizer(
+            language=language, engine=engine, engine_options=engine_options, preset=name
+        )
+        try:
+            rtf = measure_rtf(recognizer, audio)
+        except Exception as e:
+            logger.warning(f"预设校准失败，停止尝试更大的预设: {name}: {e}")
+            break
+
+        measured[name] = rtf
+        STT_CALIBRATION_RTF.labels(name).set(rtf)
+        logger.info(f"预设校准: {name} ({recognizer.model_name}) 实时率 {rtf:.3f}")
+        if rtf > target_rtf:
+            break
+        selected = name
+
+    # 释放校准时加载但没有选中的模型
+    keep = recognizers[selected].model_name
+    for recognizer in recognizers.values():
+        if recognizer.model_name != keep:
+            recognizer.engine.unload()
+
+    logger.info(f"自动选择识别预设: {selected} (目标实时率: {target_rtf})")
+    return selected, measured
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    for name, preset in STT_PRESETS.items():
+        print(f"{name}: {preset}")
+
+    selected, measured = select_preset(target_rtf=0.5)
+    print(f"\n实测实时率: {measured}")
+    print(f"选中预设: {selected}")
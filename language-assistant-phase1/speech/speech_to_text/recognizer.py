@@ -1,41 +1,233 @@
 """
 语音识别模块
-使用Whisper进行语音识别
+通过可替换的识别引擎（默认Whisper）进行语音识别
 """
 
-import whisper
+import json
+import threading
+import time
+import numpy as np
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, List, Optional, Sequence, Union
 from utils.logger import logger
+from utils.metrics import metrics
 from utils.error_handler import SpeechRecognitionError, handle_errors
+from speech.speech_to_text.model_manager import WhisperModelManager, WHISPER_SAMPLE_RATE
+from speech.speech_to_text.engines import (
+    STTEngine, create_engine, load_stt_config, DEFAULT_SETTINGS_PATH
+)
+from speech.speech_to_text.transcript_cache import TranscriptCache
+from speech.speech_to_text.presets import get_preset, select_preset
+from speech.speech_to_text.language_id import LanguageIdentifier
+
+STT_REALTIME_FACTOR = metrics.histogram(
+    "stt_realtime_factor", "识别耗时与音频时长之比", ["engine"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0)
+)
+
+# 分段识别结果之间不加空格的语言
+_UNSPACED_LANGUAGES = {"zh", "ja"}
+
+
+def join_texts(parts: List[str], language: Optional[str]) -> str:
+    """
+    拼接分段识别的文本（中文、日文直接相连，其他语言以空格分隔）
+
+    Args:
+        parts: 各段文本
+        language: 识别语言代码
+
+    Returns:
+        str: 拼接后的文本
+    """
+    separator = "" if language in _UNSPACED_LANGUAGES else " "
+    return separator.join(part for part in parts if part)
+
+
+def pcm16_to_float32(audio_data: bytes, sample_rate: int = 16000, channels: int = 1) -> np.ndarray:
+    """
+    把16位PCM字节转换成Whisper接受的16kHz单声道float32数组
+
+    Args:
+        audio_data: 16位小端PCM音频数据
+        sample_rate: 采样率
+        channels: 声道数
+
+    Returns:
+        np.ndarray: 取值范围[-1, 1]的float32数组
+    """
+    # frombuffer直接引用原字节，不复制；多余的半个采样丢弃
+    usable = len(audio_data) - len(audio_data) % (2 * channels)
+    samples = np.frombuffer(audio_data, dtype="<i2", count=usable // 2)
+
+    if channels > 1:
+        audio = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+        audio *= 1.0 / 32768.0
+    else:
+        # 唯一一次分配：int16 -> float32，随后原地缩放
+        audio = samples.astype(np.float32)
+        audio *= 1.0 / 32768.0
+
+    if sample_rate != WHISPER_SAMPLE_RATE and len(audio):
+        # 线性插值重采样（麦克风默认就是16kHz，通常不会走到这里）
+        duration = len(audio) / sample_rate
+        target = np.arange(int(duration * WHISPER_SAMPLE_RATE), dtype=np.float64) / WHISPER_SAMPLE_RATE
+        source = np.arange(len(audio), dtype=np.float64) / sample_rate
+        audio = np.interp(target, source, audio).astype(np.float32)
+
+    return audio
 
 
 class SpeechRecognizer:
     """语音识别器"""
 
-    def __init__(self, model_name: str = "base", language: str = "zh"):
+    def __init__(
+        self,
+        model_name: str = "base",
+        language: str = "zh",
+        manager: Optional[WhisperModelManager] = None,
+        engine: Union[str, STTEngine] = "whisper",
+        engine_options: Optional[Dict] = None,
+        cache: Optional[TranscriptCache] = None,
+        preset: Optional[str] = None,
+        languages: Sequence[str] = ("zh", "fr")
+    ):
         """
         初始化语音识别器
 
         Args:
-            model_name: Whisper模型名称 (tiny, base, small, medium, large)
-            language: 识别语言代码
+            model_name: 模型名称 (tiny, base, small, medium, large)
+            language: 识别语言代码；auto表示每段音频解码前先做语种识别
+            manager: 模型管理器（默认使用引擎自己的进程内共享管理器）
+            engine: 识别引擎名称（whisper, faster-whisper, fake）或引擎实例
+            engine_options: 创建引擎时的额外参数（如faster-whisper的compute_type）
+            cache: 识别结果缓存（相同音频和解码参数不重复识别）
+            preset: 识别预设 (realtime, balanced, accurate)，指定时覆盖model_name，
+                engine_options中的decode_params仍可覆盖预设的单项解码参数
+            languages: language为auto时的候选语种（第一个为默认）
         """
-        self.model_name = model_name
+        self.engine_options = dict(engine_options or {})
+        if preset is not None:
+            settings = get_preset(preset)
+            model_name = settings["model_name"]
+            self.engine_options["decode_params"] = {
+                **settings["decode_params"], **self.engine_options.get("decode_params", {})
+            }
+        self.preset = preset
+
+        if isinstance(engine, str):
+            options = dict(self.engine_options)
+            if manager is not None:
+                options["manager"] = manager
+            engine = create_engine(engine, model_name=model_name, **options)
+
+        self.engine = engine
+        self.model_name = engine.model_name
         self.language = language
-        self.model = None
+        self.cache = cache
 
-        logger.info(f"初始化语音识别器 (模型: {model_name}, 语言: {language})")
+        self.languages = tuple(languages)
+        self.language_id = LanguageIdentifier(engine, candidates=languages) if language == "auto" else None
+        # 最近一次解码使用的语种
+        self.last_language = None if self.language_id else language
+
+        # 长录音识别的进程池（首次使用时创建，close时关闭）
+        self._long_audio = None
+        self._long_audio_lock = threading.Lock()
+
+        logger.info(
+            f"初始化语音识别器 (引擎: {engine.name}, 模型: {self.model_name}, "
+            f"预设: {preset or '无'}, 语言: {language})"
+        )
+
+    @classmethod
+    def from_config(cls, path: Union[str, Path] = DEFAULT_SETTINGS_PATH, **overrides) -> "SpeechRecognizer":
+        """
+        按配置文件的speech_to_text部分创建识别器
+
+        Args:
+            path: 配置文件路径
+            **overrides: 覆盖配置的参数（engine, model_name, language, engine_options, cache, preset）
+
+        preset为auto时先实测各预设的实时率，选出不超过target_rtf的最大预设
+
+        Returns:
+            SpeechRecognizer: 语音识别器
+        """
+        config = load_stt_config(path)
+        engine = overrides.pop("engine", config.get("engine", "whisper"))
+        options = {
+            "model_name": config.get("model", "base"),
+            "language": config.get("language", "zh"),
+            "engine_options": (config.get("engine_options") or {}).get(engine)
+        }
+        if config.get("languages"):
+            options["languages"] = config["languages"]
+        cache_config = config.get("cache") or {}
+        if cache_config.get("enabled"):
+            cache_dir = cache_config.get("dir")
+            if cache_dir is not None and not Path(cache_dir).is_absolute():
+                # 相对路径以项目根目录为准
+                cache_dir = Path(path).parent.parent / cache_dir
+            options["cache"] = TranscriptCache(cache_dir, cache_config.get("max_entries", 1024))
+        options["preset"] = config.get("preset")
+        options.update(overrides)
+
+        if options["preset"] == "auto":
+            options["preset"], _ = select_preset(
+                engine=engine,
+                language=options["language"],
+                target_rtf=config.get("target_rtf", 0.5),
+                engine_options=options["engine_options"]
+            )
+        return cls(engine=engine, **options)
+
+    @property
+    def default_language(self) -> str:
+        """未做语种识别时使用的语种"""
+        return self.language_id.default if self.language_id else self.language
+
+    @property
+    def model(self):
+        """引擎当前持有的模型（未加载时为None）"""
+        return self.engine.model
 
     def load_model(self):
-        """加载Whisper模型"""
-        if self.model is None:
-            logger.info(f"加载Whisper模型: {self.model_name}")
-            try:
-                self.model = whisper.load_model(self.model_name)
-                logger.info("模型加载完成")
-            except Exception as e:
-                raise SpeechRecognitionError(f"模型加载失败: {e}")
+        """获取共享的识别模型（已预加载时立即返回，正在预加载时等待完成）"""
+        self.engine.load()
+
+    def preload(self, warmup: bool = True):
+        """
+        在后台预加载模型，避免第一次识别等待
+
+        Args:
+            warmup: 加载后是否做一次预热解码
+
+        Returns:
+            Future: 加载完成后得到模型
+        """
+        return self.engine.preload(warmup=warmup, language=self.default_language)
+
+    def resolve_language(self, audio: np.ndarray, session_id: str = "default") -> str:
+        """
+        确定一段音频的解码语种
+
+        Args:
+            audio: 16kHz单声道float32音频
+            session_id: 会话ID（自动识别时每个会话单独记住语种）
+
+        Returns:
+            str: 语种代码
+        """
+        if self.language_id is None:
+            return self.language
+        return self.language_id.choose(audio, session_id)
+
+    def _cache_key(self, audio: np.ndarray, language: str) -> str:
+        """计算音频在当前引擎、模型、语言下的缓存键"""
+        return self.cache.make_key(
+            audio, self.engine.name, self.model_name, language, self.engine.decode_signature()
+        )
 
     @handle_errors(default_return=None, raise_error=True)
     def recognize_file(self, audio_file: Union[str, Path]) -> str:
@@ -51,23 +243,21 @@ class SpeechRecognizer:
         Raises:
             SpeechRecognitionError: 识别失败
         """
-        self.load_model()
-
         audio_path = Path(audio_file)
         if not audio_path.exists():
             raise SpeechRecognitionError(f"音频文件不存在: {audio_file}")
 
         logger.info(f"识别音频文件: {audio_file}")
 
-        try:
-            # 使用Whisper进行转录
-            result = self.model.transcribe(
-                str(audio_path),
-                language=self.language,
-                verbose=False
-            )
+        if self.cache is not None or self.language_id is not None:
+            # 启用缓存或语种识别时先解码成数组
+            from speech.speech_to_text.long_audio import load_audio_file
+            return self.recognize_array(load_audio_file(audio_path))
+
+        self.load_model()
 
-            text = result["text"].strip()
+        try:
+            text = self.engine.transcribe(str(audio_path), self.language)
             logger.info(f"识别结果: {text}")
 
             return text
@@ -76,13 +266,21 @@ class SpeechRecognizer:
             raise SpeechRecognitionError(f"语音识别失败: {e}")
 
     @handle_errors(default_return=None, raise_error=True)
-    def recognize_audio_data(self, audio_data: bytes, sample_rate: int = 16000) -> str:
+    def recognize_array(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        session_id: str = "default",
+        use_cache: bool = True
+    ) -> str:
         """
-        识别音频数据
+        识别内存中的音频
 
         Args:
-            audio_data: 音频数据（字节）
-            sample_rate: 采样率
+            audio: 16kHz单声道float32音频，取值范围[-1, 1]
+            language: 指定解码语种（默认按识别器设置，auto时自动识别）
+            session_id: 会话ID（自动识别语种时使用）
+            use_cache: 是否查询和写入识别结果缓存（流式中间结果不会重复出现，不应占用缓存）
 
         Returns:
             str: 识别的文本
@@ -90,27 +288,192 @@ class SpeechRecognizer:
         Raises:
             SpeechRecognitionError: 识别失败
         """
-        # 将音频数据保存到临时文件
-        import tempfile
-        import wave
+        # 自动识别语种时按语种无关的键缓存，连同语种决定一起保存：
+        # 命中时不必再跑一次语种检测，也不改变会话的语种状态
+        auto = language is None and self.language_id is not None
+        key = None
+        if self.cache is not None and use_cache:
+            if auto:
+                key = self._cache_key(audio, "auto")
+                cached = self.cache.get(key)
+                if cached is not None:
+                    entry = json.loads(cached)
+                    self.last_language = entry["language"]
+                    logger.info(f"识别结果命中缓存: {entry['text']} (语种: {entry['language']})")
+                    return entry["text"]
+            else:
+                language = language or self.language
+                key = self._cache_key(audio, language)
+                text = self.cache.get(key)
+                if text is not None:
+                    self.last_language = language
+                    logger.info(f"识别结果命中缓存: {text}")
+                    return text
+
+        language = language or self.resolve_language(audio, session_id)
+        self.last_language = language
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+        self.load_model()
 
-            # 写入WAV文件
-            with wave.open(tmp_path, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(sample_rate)
-                wf.writeframes(audio_data)
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+        logger.info(f"识别音频: {duration:.2f}秒 (语种: {language})")
 
         try:
-            # 识别临时文件
-            text = self.recognize_file(tmp_path)
+            start = time.perf_counter()
+            text = self.engine.transcribe(audio, language)
+            if duration:
+                STT_REALTIME_FACTOR.labels(self.engine.name).observe((time.perf_counter() - start) / duration)
+            logger.info(f"识别结果: {text}")
+
+            if key is not None:
+                value = json.dumps({"language": language, "text": text}, ensure_ascii=False) if auto else text
+                self.cache.put(key, value)
+
             return text
-        finally:
-            # 删除临时文件
-            Path(tmp_path).unlink(missing_ok=True)
+
+        except Exception as e:
+            raise SpeechRecognitionError(f"语音识别失败: {e}")
+
+    @handle_errors(default_return=None, raise_error=True)
+    def recognize_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """
+        批量识别多段音频（Whisper引擎各自补齐到30秒后合并成一个批次解码）
+
+        自动识别语种时各段独立判断（不带会话迟滞），按语种分组解码
+
+        Args:
+            audios: 16kHz单声道float32音频列表
+
+        Returns:
+            List[str]: 与输入顺序一致的识别文本
+
+        Raises:
+            SpeechRecognitionError: 识别失败
+        """
+        languages = [self.language] * len(audios)
+        if self.language_id is not None:
+            for i, audio in enumerate(audios):
+                probs = self.language_id.detect(audio)
+                languages[i] = max(probs, key=probs.get) if probs else self.language_id.default
+
+        texts: List[Optional[str]] = [None] * len(audios)
+        keys: List[Optional[str]] = [None] * len(audios)
+        if self.cache is not None:
+            for i, audio in enumerate(audios):
+                keys[i] = self._cache_key(audio, languages[i])
+                texts[i] = self.cache.get(keys[i])
+
+        # 未命中的音频按缓存键去重，同一批里的重复音频只解码一次
+        pending: Dict = {}
+        for i, text in enumerate(texts):
+            if text is None:
+                pending.setdefault(keys[i] if keys[i] is not None else i, []).append(i)
+
+        if pending:
+            self.load_model()
+            groups: Dict[str, List[List[int]]] = {}
+            for indexes in pending.values():
+                groups.setdefault(languages[indexes[0]], []).append(indexes)
+
+            for language, group in groups.items():
+                try:
+                    results = self.engine.transcribe_batch(
+                        [audios[indexes[0]] for indexes in group], language
+                    )
+                except Exception as e:
+                    raise SpeechRecognitionError(f"批量识别失败: {e}")
+
+                for indexes, text in zip(group, results):
+                    for i in indexes:
+                        texts[i] = text
+                    if keys[indexes[0]] is not None:
+                        self.cache.put(keys[indexes[0]], text)
+
+        logger.info(f"批量识别完成: {len(audios)} 段音频 (解码 {len(pending)} 段)")
+        return texts
+
+    @handle_errors(default_return=None, raise_error=True)
+    def recognize_long_file(
+        self,
+        audio_file: Union[str, Path],
+        workers: Optional[int] = None,
+        on_segment=None
+    ) -> str:
+        """
+        识别长录音：在停顿处切段，多进程并行识别后按顺序拼接
+
+        进程池在多次调用间复用，不再需要时调用close()
+
+        Args:
+            audio_file: 音频文件路径
+            workers: 工作进程数（默认CPU核数的一半；与已有进程池不同时重建）
+            on_segment: 每段完成时的回调，参数为TranscriptSegment（按时间顺序）
+
+        Returns:
+            str: 识别的文本
+
+        Raises:
+            SpeechRecognitionError: 识别失败
+        """
+        segments = self._long_audio_transcriber(workers).transcribe_file(audio_file, on_segment)
+        return join_texts([segment.text for segment in segments], self.default_language)
+
+    def _long_audio_transcriber(self, workers: Optional[int]):
+        """获取长录音识别器，进程池在多次调用间复用（指定了不同的进程数时重建）"""
+        from speech.speech_to_text.long_audio import LongAudioTranscriber
+
+        with self._long_audio_lock:
+            if self._long_audio is not None and workers not in (None, self._long_audio.workers):
+                self._long_audio.close()
+                self._long_audio = None
+            if self._long_audio is None:
+                self._long_audio = LongAudioTranscriber(
+                    engine=self.engine.name,
+                    model_name=self.model_name,
+                    language=self.language,
+                    engine_options=self.engine_options,
+                    workers=workers,
+                    languages=self.languages
+                )
+            return self._long_audio
+
+    def close(self):
+        """关闭长录音识别的进程池"""
+        with self._long_audio_lock:
+            if self._long_audio is not None:
+                self._long_audio.close()
+                self._long_audio = None
+
+    @handle_errors(default_return=None, raise_error=True)
+    def recognize_audio_data(
+        self,
+        audio_data: bytes,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        language: Optional[str] = None,
+        session_id: str = "default",
+        use_cache: bool = True
+    ) -> str:
+        """
+        识别音频数据（直接在内存中转换，不写临时文件也不调用ffmpeg）
+
+        Args:
+            audio_data: 16位PCM音频数据（字节）
+            sample_rate: 采样率
+            channels: 声道数
+            language: 指定解码语种（默认按识别器设置，auto时自动识别）
+            session_id: 会话ID（自动识别语种时使用）
+            use_cache: 是否使用识别结果缓存
+
+        Returns:
+            str: 识别的文本
+
+        Raises:
+            SpeechRecognitionError: 识别失败
+        """
+        return self.recognize_array(
+            pcm16_to_float32(audio_data, sample_rate, channels), language, session_id, use_cache
+        )
 
     def get_model_info(self) -> dict:
         """
@@ -120,9 +483,14 @@ class SpeechRecognizer:
             dict: 模型信息
         """
         return {
+            "engine": self.engine.name,
             "model_name": self.model_name,
+            "preset": self.preset,
             "language": self.language,
-            "loaded": self.model is not None
+            "last_language": self.last_language,
+            "loaded": self.model is not None,
+            "load_stats": self.engine.get_stats(),
+            "cache": self.cache.get_stats() if self.cache is not None else None
         }
 
 
@@ -134,11 +502,13 @@ if __name__ == "__main__":
     # 添加项目路径
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-    print("🎤 Whisper语音识别测试\n")
+    print("🎤 语音识别测试\n")
 
     try:
         # 初始化识别器
-        recognizer = SpeechRecognizer(model_name="base", language="zh")
+        # 按config/settings.yaml选择引擎
+        recognizer = SpeechRecognizer.from_config()
+        print(f"识别引擎: {recognizer.get_model_info()['engine']}")
 
         # 如果有测试音频文件，进行识别
         test_file = Path("tmp/test_recording.wav")
@@ -0,0 +1,218 @@
+"""
+流式语音识别模块
+用户说话的同时在后台线程识别已录到的音频，输出中间结果；说完后只需识别最后一小段
+"""
+
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from utils.logger import logger
+from speech.speech_to_text.recognizer import SpeechRecognizer, join_texts
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+from speech.speech_to_text.trimmer import TRIMMED_SECONDS, SilenceTrimmer
+
+
+class StreamingTranscriber:
+    """流式识别器"""
+
+    def __init__(
+        self,
+        recognizer: SpeechRecognizer,
+        sample_rate: int = 16000,
+        window_seconds: float = 8.0,
+        interval_seconds: float = 1.0,
+        min_seconds: float = 0.5,
+        on_partial: Optional[Callable[[str], None]] = None,
+        trimmer: Optional[SilenceTrimmer] = None
+    ):
+        """
+        初始化流式识别器
+
+        Args:
+            recognizer: 语音识别器
+            sample_rate: 采样率
+            window_seconds: 识别窗口长度；未确认的音频超过该长度时，在窗口内最安静处切开并确认前一段
+            interval_seconds: 每录到多少秒新音频重新识别一次
+            min_seconds: 少于该长度的音频不输出中间结果
+            on_partial: 收到中间结果时的回调
+            trimmer: 静音裁剪器；设置后开始说话前的静音不做识别，最后一段识别前去掉结尾的静音
+        """
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.window_bytes = int(window_seconds * sample_rate) * 2
+        self.interval_bytes = int(interval_seconds * sample_rate) * 2
+        self.min_bytes = int(min_seconds * sample_rate) * 2
+        self.on_partial = on_partial
+        self.trimmer = trimmer
+
+        self.partial = ""
+        self._buffer = bytearray()
+        # 已确认部分的结束位置（字节）和文本
+        self._committed_bytes = 0
+        self._committed: List[str] = []
+        self._decoded_bytes = 0
+        self._decodes = 0
+        # 开始说话前丢掉的静音（字节）
+        self._speech_started = trimmer is None
+        self._skipped_bytes = 0
+        self._removed_seconds = 0.0
+
+        # 自动识别语种时，音频够语种检测用后固定本句的语种，后续的中间识别不再重复检测
+        self._language: Optional[str] = None
+        language_id = recognizer.language_id
+        self._probe_bytes = (
+            int(language_id.probe_samples / WHISPER_SAMPLE_RATE * sample_rate) * 2 if language_id else 0
+        )
+
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StreamingTranscriber":
+        """启动后台识别线程"""
+        self._thread = threading.Thread(target=self._run, name="streaming-stt", daemon=True)
+        self._thread.start()
+        return self
+
+    def feed(self, chunk: bytes):
+        """
+        追加录到的音频
+
+        Args:
+            chunk: 16位PCM音频块
+        """
+        with self._cond:
+            self._buffer.extend(chunk)
+            if len(self._buffer) - self._decoded_bytes >= self.interval_bytes:
+                self._cond.notify()
+
+    def _join(self, parts: List[str]) -> str:
+        """拼接各段识别结果"""
+        return join_texts(parts, self._language or self.recognizer.last_language)
+
+    def _quiet_cut(self, region: bytes, limit: int) -> int:
+        """在 region[:limit] 的后四分之一里找最安静的20ms帧，返回切分位置（字节）"""
+        frame = int(0.02 * self.sample_rate) * 2
+        start = (limit * 3 // 4) // frame * frame
+        samples = np.frombuffer(region, dtype="<i2", count=(limit - start) // 2, offset=start)
+        frames = samples[: len(samples) // (frame // 2) * (frame // 2)].reshape(-1, frame // 2)
+        if not len(frames):
+            return limit
+        energy = np.einsum("ij,ij->i", frames, frames, dtype=np.float64)
+        return start + int(np.argmin(energy)) * frame + frame // 2
+
+    def _skip_leading_silence(self, region: bytes) -> bytes:
+        """还没开始说话时丢掉开头的静音（保留前置余量），返回剩下的音频"""
+        segments = self.trimmer.find_segments(region)
+        if segments:
+            skip = segments[0][0]
+            self._speech_started = True
+        else:
+            skip = max(0, len(region) - self.trimmer.pre_pad * 2)
+        self._committed_bytes += skip
+        self._skipped_bytes += skip
+        TRIMMED_SECONDS.labels("leading").inc(skip / 2 / self.sample_rate)
+        return region[skip:]
+
+    def _decode(self, audio: bytes, partial: bool = False) -> str:
+        """识别一段音频，失败时返回空字符串；中间结果不使用识别缓存"""
+        self._decodes += 1
+        try:
+            text = self.recognizer.recognize_audio_data(
+                audio, self.sample_rate, language=self._language, use_cache=not partial
+            ) or ""
+            if self._language is None and len(audio) >= self._probe_bytes:
+                self._language = self.recognizer.last_language
+            return text
+        except Exception as e:
+            logger.warning(f"流式识别失败（忽略）: {e}")
+            return ""
+
+    def _run(self):
+        """后台识别循环；停止后正在进行的识别结果直接丢弃，未确认的音频由finish接管"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping
+                    or len(self._buffer) - self._decoded_bytes >= self.interval_bytes
+                )
+                if self._stopping:
+                    return
+                self._decoded_bytes = len(self._buffer)
+                region = bytes(self._buffer[self._committed_bytes:])
+
+                if not self._speech_started:
+                    region = self._skip_leading_silence(region)
+                    if not self._speech_started:
+                        continue
+
+            if len(region) > self.window_bytes:
+                # 未确认的音频太长：在安静处切开，前一段作为最终结果确认
+                cut = self._quiet_cut(region, self.window_bytes)
+                text = self._decode(region[:cut])
+                with self._cond:
+                    if self._stopping:
+                        return
+                    self._committed.append(text)
+                    self._committed_bytes += cut
+                region = region[cut:]
+
+            if len(region) < self.min_bytes:
+                continue
+
+            partial = self._join(self._committed + [self._decode(region, partial=True)])
+            with self._cond:
+                if self._stopping:
+                    return
+                self.partial = partial
+            if self.on_partial:
+                self.on_partial(partial)
+
+    def _stop_worker(self):
+        """通知后台线程停止（不等待正在进行的识别，确认的部分此后不再变化）"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread = None
+
+    def finish(self) -> str:
+        """
+        说话结束：识别最后未确认的一段并返回完整结果
+
+        Returns:
+            str: 完整识别文本
+        """
+        self._stop_worker()
+        tail = bytes(self._buffer[self._committed_bytes:])
+        if self.trimmer is not None:
+            # 已经开始说话时开头是句中的停顿，只去掉结尾的静音
+            tail = self.trimmer.trim(tail, leading=not self._speech_started)
+        self._removed_seconds = (
+            len(self._buffer) - self._committed_bytes - len(tail) + self._skipped_bytes
+        ) / 2 / self.sample_rate
+        parts = list(self._committed)
+        if tail:
+            parts.append(self._decode(tail))
+        text = self._join(parts)
+        logger.info(
+            f"流式识别完成: {len(self._buffer) / 2 / self.sample_rate:.2f}秒音频, "
+            f"识别 {self._decodes} 次, 最后一段 {len(tail) / 2 / self.sample_rate:.2f}秒, "
+            f"裁掉静音 {self._removed_seconds:.2f}秒"
+        )
+        return text
+
+    def cancel(self):
+        """放弃识别"""
+        self._stop_worker()
+
+    @property
+    def removed_seconds(self) -> float:
+        """识别前裁掉的静音时长（秒），finish之后有效"""
+        return self._removed_seconds
+
+    @property
+    def audio(self) -> bytes:
+        """目前录到的全部音频"""
+        return bytes(self._buffer)
@@ -0,0 +1,256 @@
+"""
+批量语音识别服务模块
+多个会话共用一个识别模型：请求先进入优先级队列，后台线程在短时间窗口内凑成批次一起解码
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.error_handler import SpeechRecognitionError
+from speech.speech_to_text.recognizer import SpeechRecognizer, pcm16_to_float32
+from speech.speech_to_text.model_manager import WHISPER_SAMPLE_RATE
+
+STT_BATCH_SIZE = metrics.histogram(
+    "stt_batch_size", "每批识别的音频段数", buckets=(1, 2, 4, 8, 16, 32)
+)
+STT_QUEUE_WAIT = metrics.histogram(
+    "stt_queue_wait_seconds", "识别请求在队列中的等待时间（秒）"
+)
+
+
+def _cpu_cores() -> int:
+    """当前进程可用的CPU核数"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class _Request:
+    """队列中的一个识别请求"""
+
+    __slots__ = ("audio", "future", "enqueued")
+
+    def __init__(self, audio: np.ndarray):
+        self.audio = audio
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+
+class BatchedSTTService:
+    """批量语音识别服务"""
+
+    def __init__(
+        self,
+        recognizer: SpeechRecognizer,
+        max_batch_size: int = 8,
+        max_wait: float = 0.05,
+        decode_batch: Optional[Callable[[List[np.ndarray]], List[str]]] = None
+    ):
+        """
+        初始化识别服务
+
+        Args:
+            recognizer: 语音识别器（所有请求共用其模型）
+            max_batch_size: 每批最多的音频段数
+            max_wait: 最早的请求最多等待多久就开始解码（秒），限制凑批带来的额外延迟
+            decode_batch: 批量解码函数（默认recognizer.recognize_batch）
+        """
+        self.recognizer = recognizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.decode_batch = decode_batch or recognizer.recognize_batch
+
+        # (优先级, 序号, 请求)，优先级数值越小越先处理，同优先级先进先出
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._batches = 0
+        self._requests = 0
+        self._audio_seconds = 0.0
+        self._busy_seconds = 0.0
+        self._cores = _cpu_cores()
+
+        logger.info(f"批量识别服务初始化完成 (批大小: {max_batch_size}, 最长等待: {max_wait}s)")
+
+    def start(self) -> "BatchedSTTService":
+        """启动后台解码线程"""
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="stt-batch-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务（队列中剩余的请求会先处理完）"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(
+        self,
+        audio: Union[bytes, np.ndarray],
+        priority: int = 0,
+        sample_rate: int = 16000
+    ) -> Future:
+        """
+        提交识别请求
+
+        Args:
+            audio: 16位PCM字节或16kHz float32数组
+            priority: 优先级（数值越小越优先，如实时对话用0，离线转写用10）
+            sample_rate: PCM字节的采样率
+
+        Returns:
+            Future: 结果为识别文本
+        """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = pcm16_to_float32(bytes(audio), sample_rate)
+
+        request = _Request(audio)
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("识别服务未启动")
+            heapq.heappush(self._queue, (priority, next(self._seq), request))
+            self._cond.notify()
+        return request.future
+
+    def transcribe(
+        self,
+        audio: Union[bytes, np.ndarray],
+        priority: int = 0,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        提交请求并等待结果
+
+        Args:
+            audio: 16位PCM字节或16kHz float32数组
+            priority: 优先级
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            str: 识别文本
+        """
+        return self.submit(audio, priority).result(timeout)
+
+    def _next_batch(self) -> List[_Request]:
+        """等待并取出下一批请求；服务停止且队列为空时返回空列表"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or not self._running)
+            if not self._queue:
+                return []
+
+            # 从最早的请求入队起最多等max_wait，期间凑满一批就立即开始
+            oldest = min(request.enqueued for _, _, request in self._queue)
+            deadline = oldest + self.max_wait
+            while len(self._queue) < self.max_batch_size and self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(self.max_batch_size, len(self._queue))
+            return [heapq.heappop(self._queue)[2] for _ in range(count)]
+
+    def _run(self):
+        """后台解码循环"""
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            start = time.monotonic()
+            for request in batch:
+                STT_QUEUE_WAIT.observe(start - request.enqueued)
+
+            try:
+                texts = self.decode_batch([request.audio for request in batch])
+            except Exception as e:
+                logger.error(f"批量识别失败: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            finally:
+                elapsed = time.monotonic() - start
+                with self._cond:
+                    self._busy_seconds += elapsed
+
+            for request, text in zip(batch, texts):
+                request.future.set_result(text)
+            if len(texts) != len(batch):
+                # 结果数与请求数不符时，没有对应结果的请求必须失败，否则调用方会一直等待
+                logger.error(f"批量识别返回 {len(texts)} 条结果，请求有 {len(batch)} 条")
+                for request in batch[len(texts):]:
+                    request.future.set_exception(
+                        SpeechRecognitionError(f"批量识别结果数量不符: {len(texts)}/{len(batch)}")
+                    )
+
+            with self._cond:
+                self._batches += 1
+                self._requests += len(batch)
+                self._audio_seconds += sum(len(r.audio) for r in batch) / WHISPER_SAMPLE_RATE
+            STT_BATCH_SIZE.observe(len(batch))
+            logger.debug(f"识别批次完成: {len(batch)} 段, 耗时 {elapsed:.3f}s")
+
+    def get_stats(self) -> Dict:
+        """
+        获取吞吐统计
+
+        Returns:
+            Dict: 批次数、请求数、平均批大小、实时率（识别耗时与音频时长之比，与STT_REALTIME_FACTOR一致）
+                以及每核吞吐（每核每秒处理的音频秒数）
+        """
+        with self._cond:
+            batches, requests, queued = self._batches, self._requests, len(self._queue)
+            audio_seconds, busy_seconds = self._audio_seconds, self._busy_seconds
+        realtime_factor = busy_seconds / audio_seconds if audio_seconds else 0.0
+        audio_per_busy_second = audio_seconds / busy_seconds if busy_seconds else 0.0
+        return {
+            "batches": batches,
+            "requests": requests,
+            "queued": queued,
+            "avg_batch_size": requests / batches if batches else 0.0,
+            "audio_seconds": audio_seconds,
+            "busy_seconds": busy_seconds,
+            "realtime_factor": realtime_factor,
+            "cpu_cores": self._cores,
+            "audio_seconds_per_core_second": audio_per_busy_second / self._cores
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    recognizer = SpeechRecognizer(model_name="tiny", language="zh")
+    with BatchedSTTService(recognizer, max_batch_size=4) as service:
+        silence = np.zeros(WHISPER_SAMPLE_RATE * 2, dtype=np.float32)
+        futures = [service.submit(silence, priority=i % 2) for i in range(8)]
+        print([future.result() for future in futures])
+        print(service.get_stats())
@@ -0,0 +1,200 @@
+"""
+识别结果缓存模块
+按音频内容和解码参数缓存识别文本：内存LRU一级缓存 + 磁盘二级缓存
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+STT_CACHE_REQUESTS = metrics.counter(
+    "stt_cache_requests_total", "识别结果缓存请求次数", ["result"]
+)
+
+
+class TranscriptCache:
+    """识别结果缓存"""
+
+    KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_entries: int = 1024):
+        """
+        初始化识别结果缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录（None表示只用内存缓存）
+            max_entries: 内存缓存的最大条目数
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        logger.info(f"识别结果缓存初始化完成 (内存: {max_entries} 条, 磁盘: {self.cache_dir or '无'})")
+
+    @staticmethod
+    def make_key(
+        audio: np.ndarray,
+        engine: str,
+        model_name: str,
+        language: Optional[str],
+        options: Optional[Dict] = None
+    ) -> str:
+        """
+        计算缓存键
+
+        Args:
+            audio: 16kHz单声道float32音频
+            engine: 识别引擎名称
+            model_name: 模型名称
+            language: 识别语言代码
+            options: 影响识别结果的解码参数
+
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        header = json.dumps(
+            [engine, model_name, language, options or {}, str(audio.dtype)],
+            sort_keys=True, ensure_ascii=False
+        )
+        digest = hashlib.sha256(header.encode("utf-8"))
+        digest.update(b"\x1f")
+        # 直接对数组内存求摘要，不复制
+        digest.update(memoryview(np.ascontiguousarray(audio)).cast("B"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """
+        获取缓存键对应的文件路径
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Path: 文件路径（按前两位分目录）
+        """
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def _remember(self, key: str, text: str):
+        """写入内存缓存（超出容量时淘汰最久未使用的条目）"""
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        查找缓存的识别文本
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[str]: 识别文本，未命中时返回None
+        """
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                STT_CACHE_REQUESTS.labels("memory_hit").inc()
+                return text
+
+        if self.cache_dir is not None and self.KEY_PATTERN.match(key):
+            try:
+                text = self.path_for(key).read_text(encoding="utf-8")
+            except OSError:
+                text = None
+            if text is not None:
+                self._remember(key, text)
+                self.disk_hits += 1
+                STT_CACHE_REQUESTS.labels("disk_hit").inc()
+                return text
+
+        self.misses += 1
+        STT_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def put(self, key: str, text: str):
+        """
+        写入识别文本
+
+        Args:
+            key: 缓存键
+            text: 识别文本
+        """
+        self._remember(key, text)
+        if self.cache_dir is None:
+            return
+
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_text(text, encoding="utf-8")
+            # 原子替换，读者不会看到写了一半的文件
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"识别结果写入磁盘缓存失败（忽略）: {e}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def clear_memory(self):
+        """清空内存缓存（磁盘缓存保留）"""
+        with self._lock:
+            self._memory.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+            "cache_dir": str(self.cache_dir) if self.cache_dir is not None else None
+        }
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    cache = TranscriptCache("tmp/stt_cache", max_entries=2)
+    audio = np.zeros(16000, dtype=np.float32)
+    key = cache.make_key(audio, "whisper", "base", "zh")
+
+    print(f"第1次: {cache.get(key)!r}")
+    cache.put(key, "你好")
+    print(f"第2次: {cache.get(key)!r}")
+    cache.clear_memory()
+    print(f"清空内存后: {cache.get(key)!r}")
+    print(cache.get_stats())
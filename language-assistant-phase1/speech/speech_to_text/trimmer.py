@@ -0,0 +1,220 @@
+"""
+静音裁剪模块
+识别前按帧找出语音段，去掉开头和结尾的静音（保留少量前后余量），并统计裁掉的时长
+
+传入VAD时按它当前的（自适应）阈值逐帧判断，与录音时判断开始和结束说话的标准一致
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from speech.speech_to_text.engines import DEFAULT_SETTINGS_PATH, load_stt_config
+from speech.speech_to_text.vad import VoiceActivityDetector, frame_features, frame_view
+
+TRIMMED_SECONDS = metrics.counter(
+    "stt_trimmed_seconds_total", "识别前裁掉的静音时长（秒）", ["position"]
+)
+
+
+def frame_rms(samples: np.ndarray, frame: int) -> np.ndarray:
+    """
+    按帧计算RMS能量（不足一帧的结尾丢弃）
+
+    Args:
+        samples: 一维采样数组（int16或float32）
+        frame: 每帧采样数
+
+    Returns:
+        np.ndarray: 每帧的RMS，单位与输入采样相同
+    """
+    n = len(samples) // frame
+    frames = samples[:n * frame].reshape(n, frame)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame)
+
+
+class SilenceTrimmer:
+    """静音裁剪器"""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        energy_threshold: float = 300.0,
+        pre_pad: float = 0.2,
+        post_pad: float = 0.3,
+        min_gap: float = 0.5,
+        frame_seconds: float = 0.02,
+        vad: Optional[VoiceActivityDetector] = None
+    ):
+        """
+        初始化静音裁剪器
+
+        Args:
+            sample_rate: 采样率
+            energy_threshold: 语音能量阈值（16位PCM的RMS；传入vad时不使用）
+            pre_pad: 每段语音前保留的静音（秒），避免切掉起始的弱辅音
+            post_pad: 每段语音后保留的静音（秒）
+            min_gap: 短于该时长的停顿不切分（秒）
+            frame_seconds: 能量计算的帧长（秒；传入vad时使用VAD的帧长和帧移）
+            vad: 语音活动检测器（设置后按其当前阈值和逐帧判断找语音段，采样率也以它为准）
+        """
+        self.vad = vad
+        self.energy_threshold = energy_threshold
+        if vad is None:
+            self.sample_rate = sample_rate
+            self.frame = max(1, int(frame_seconds * sample_rate))
+            self._frame_tail = 0
+        else:
+            engine = vad.engine
+            self.sample_rate = engine.sample_rate
+            self.frame = engine.hop
+            # 帧有重叠时最后一帧比帧移长
+            self._frame_tail = max(0, engine.frame - engine.hop)
+        self.pre_pad = int(pre_pad * self.sample_rate)
+        self.post_pad = int(post_pad * self.sample_rate)
+        self.min_gap_frames = max(1, int(min_gap * self.sample_rate / self.frame))
+
+        self.last_stats: Dict = {}
+        self.total_seconds = 0.0
+        self.removed_seconds = 0.0
+
+    @classmethod
+    def from_config(
+        cls,
+        path: Union[str, Path] = DEFAULT_SETTINGS_PATH,
+        sample_rate: int = 16000,
+        vad: Optional[VoiceActivityDetector] = None
+    ) -> Optional["SilenceTrimmer"]:
+        """
+        按配置文件speech_to_text部分的trim设置创建裁剪器
+
+        Args:
+            path: 配置文件路径
+            sample_rate: 采样率
+            vad: 录音时使用的语音活动检测器（设置后不使用配置中的energy_threshold）
+
+        Returns:
+            Optional[SilenceTrimmer]: 裁剪器；配置中关闭时为None
+        """
+        config = load_stt_config(path)
+        trim_config = config.get("trim") or {}
+        if not trim_config.get("enabled", True):
+            return None
+        return cls(
+            sample_rate=sample_rate,
+            energy_threshold=config.get("energy_threshold", 300.0),
+            pre_pad=trim_config.get("pre_pad", 0.2),
+            post_pad=trim_config.get("post_pad", 0.3),
+            vad=vad
+        )
+
+    def find_segments(self, audio_data: bytes) -> List[Tuple[int, int]]:
+        """
+        找出语音段
+
+        Args:
+            audio_data: 16位PCM单声道音频
+
+        Returns:
+            List[Tuple[int, int]]: 各段的 (起始字节, 结束字节)，已加上前后余量；没有语音时为空列表
+        """
+        samples = np.frombuffer(audio_data, dtype="<i2", count=len(audio_data) // 2)
+        voiced = self._voiced_frames(samples)
+        if not voiced.any():
+            return []
+
+        # 连续的语音帧
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], voiced.astype(np.int8), [0]])))
+        starts, ends = edges[::2], edges[1::2]
+
+        # 停顿足够长的地方才切开
+        split = starts[1:] - ends[:-1] >= self.min_gap_frames
+        starts = np.concatenate([starts[:1], starts[1:][split]]) * self.frame
+        ends = np.concatenate([ends[:-1][split], ends[-1:]]) * self.frame
+
+        starts = np.maximum(starts - self.pre_pad, 0)
+        ends = np.minimum(ends + self._frame_tail + self.post_pad, len(samples))
+        return [(int(start) * 2, int(end) * 2) for start, end in zip(starts, ends)]
+
+    def _voiced_frames(self, samples: np.ndarray) -> np.ndarray:
+        """逐帧判断是否为语音（使用VAD时不改变其流式状态）"""
+        if self.vad is None:
+            return frame_rms(samples, self.frame) > self.energy_threshold
+        engine = self.vad.engine
+        features = frame_features(frame_view(samples, engine.frame, engine.hop), engine.sample_rate, engine.speech_band)
+        return engine.decide(features, engine.threshold)
+
+    def trim(self, audio_data: bytes, leading: bool = True) -> bytes:
+        """
+        去掉开头和结尾的静音
+
+        Args:
+            audio_data: 16位PCM单声道音频
+            leading: 是否裁掉开头的静音（音频接在已识别的部分之后时只裁结尾）
+
+        Returns:
+            bytes: 裁剪后的音频（没有语音时为空）
+        """
+        segments = self.find_segments(audio_data)
+        start, end = (segments[0][0], segments[-1][1]) if segments else (0, 0)
+        if not leading:
+            start = 0
+
+        bytes_per_second = self.sample_rate * 2
+        total = len(audio_data) / bytes_per_second
+        kept = (end - start) / bytes_per_second
+        # 没有语音时全部算作开头（只裁结尾时算作结尾）
+        leading_seconds = (start / bytes_per_second if segments else total) if leading else 0.0
+        trailing_seconds = total - kept - leading_seconds
+        self.last_stats = {
+            "original_seconds": total,
+            "kept_seconds": kept,
+            "leading_seconds": leading_seconds,
+            "trailing_seconds": trailing_seconds,
+            "segments": len(segments)
+        }
+        self.total_seconds += total
+        self.removed_seconds += total - kept
+        TRIMMED_SECONDS.labels("leading").inc(leading_seconds)
+        TRIMMED_SECONDS.labels("trailing").inc(trailing_seconds)
+
+        if kept < total:
+            logger.info(
+                f"裁掉静音: 开头 {leading_seconds:.2f}秒, 结尾 {trailing_seconds:.2f}秒 "
+                f"({total:.2f}秒 -> {kept:.2f}秒)"
+            )
+        return audio_data[start:end]
+
+    def get_stats(self) -> Dict:
+        """
+        获取累计裁剪统计
+
+        Returns:
+            Dict: 处理总时长、裁掉的时长和比例、最近一次的裁剪详情
+        """
+        return {
+            "total_seconds": self.total_seconds,
+            "removed_seconds": self.removed_seconds,
+            "removed_ratio": self.removed_seconds / self.total_seconds if self.total_seconds else 0.0,
+            "last": dict(self.last_stats)
+        }
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    silence = np.zeros(16000, dtype=np.int16)
+    speech = np.random.default_rng(0).integers(-5000, 5000, 16000, dtype=np.int16)
+    audio = np.concatenate([silence, speech, silence, speech, silence]).tobytes()
+
+    trimmer = SilenceTrimmer()
+    print(f"语音段: {trimmer.find_segments(audio)}")
+    trimmed = trimmer.trim(audio)
+    print(f"裁剪: {len(audio)} -> {len(trimmed)} 字节")
+    print(trimmer.get_stats())
@@ -0,0 +1,261 @@
+"""
+整句录音模块
+环形缓冲区始终保留最近几百毫秒的音频，检测到开始说话时把这段前置音频一并放进句子，
+避免丢掉第一个音节；开始和结束都带迟滞，整句以一块连续内存的视图返回
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+
+from utils.logger import logger
+from utils.metrics import metrics
+from speech.speech_to_text.audio_capture import AudioCapture
+from speech.speech_to_text.vad import VoiceActivityDetector
+
+UTTERANCES = metrics.counter(
+    "voice_utterances_total", "检测到的整句录音次数", ["end"]
+)
+
+
+class PreRollBuffer:
+    """预分配的环形缓冲区，始终保留最近写入的若干采样"""
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: 容量（采样数）
+        """
+        self.capacity = capacity
+        self.total = 0
+        self._data = np.zeros(capacity, dtype=np.int16)
+
+    def write(self, samples: np.ndarray):
+        """
+        写入采样（超出容量时覆盖最旧的部分）
+
+        Args:
+            samples: int16采样
+        """
+        count = len(samples)
+        samples = samples[-self.capacity:]
+        start = (self.total + count - len(samples)) % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        self.total += count
+
+    def read_into(self, start: int, out: np.ndarray) -> int:
+        """
+        把从第start个采样（累计位置）到最新的部分复制到out开头（已被覆盖的部分跳过）
+
+        Args:
+            start: 起始位置（累计写入的采样序号）
+            out: 目标数组
+
+        Returns:
+            int: 复制的采样数
+        """
+        start = max(start, self.total - self.capacity, 0)
+        count = min(self.total - start, len(out))
+        offset = start % self.capacity
+        first = min(count, self.capacity - offset)
+        out[:first] = self._data[offset:offset + first]
+        out[first:count] = self._data[:count - first]
+        return count
+
+    def clear(self):
+        """清空"""
+        self.total = 0
+
+
+class UtteranceCapture:
+    """带前置缓冲和迟滞的整句录音器"""
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        capture: Optional[AudioCapture] = None,
+        pre_roll: float = 0.3,
+        onset: float = 0.06,
+        hangover: Optional[float] = None,
+        release_ratio: float = 0.7,
+        max_duration: float = 10.0
+    ):
+        """
+        初始化整句录音器
+
+        Args:
+            vad: 语音活动检测器（使用其中的FrameVAD按帧判断）
+            capture: 音频捕获器（只调用feed时可以不传）
+            pre_roll: 开始说话前保留的音频（秒）
+            onset: 连续这么长的语音帧才算开始说话（秒），过滤按键声等短促噪声
+            hangover: 连续这么长的静音才算说完（秒，默认为vad.silence_threshold）
+            release_ratio: 说话过程中能量阈值降为原来的这个比例（迟滞，避免句尾弱音把一句话切断）
+            max_duration: 一句话的最大时长（秒，不含前置音频）
+        """
+        self.vad = vad
+        self.engine = vad.engine
+        self.capture = capture
+        self.sample_rate = self.engine.sample_rate
+        hop = self.engine.hop
+        self.pre_roll = int(pre_roll * self.sample_rate)
+        self.onset_frames = max(1, round(onset * self.sample_rate / hop))
+        self.hangover_frames = max(1, round(
+            (vad.silence_threshold if hangover is None else hangover) * self.sample_rate / hop
+        ))
+        self.release_ratio = release_ratio
+
+        # 环形缓冲区要能容纳前置音频、开始判定的那几帧和一个录音块
+        self._ring = PreRollBuffer(self.pre_roll + self.onset_frames * hop + self.engine.frame + self.sample_rate)
+        self._buffer = np.zeros(self.pre_roll + int(max_duration * self.sample_rate), dtype=np.int16)
+        self._limit = len(self._buffer)
+
+        self.active = False
+        self._run = 0
+        self._frames = 0
+        self._start = 0
+        self._length = 0
+
+    @property
+    def current(self) -> Optional[memoryview]:
+        """正在录制的这句话（尚未开始说话时为None）"""
+        return self._view(self._length) if self.active else None
+
+    def _view(self, length: int) -> memoryview:
+        """句子缓冲区前length个采样的字节视图"""
+        return memoryview(self._buffer[:length]).cast("B")
+
+    def _begin(self, start: int):
+        """开始说话：把环形缓冲区里从start开始的音频复制到句子缓冲区"""
+        self._length = self._ring.read_into(start, self._buffer[:self._limit])
+        self._start = self._ring.total - self._length
+        self.active = True
+        self._run = 0
+        logger.debug(f"检测到开始说话，前置音频 {(start + self.pre_roll - self._start) / self.sample_rate:.2f}秒")
+
+    def _end(self, end: int, reason: str) -> memoryview:
+        """说完：返回从开始到end（累计位置）的整句"""
+        length = min(end - self._start, self._length)
+        self.active = False
+        self._run = 0
+        UTTERANCES.labels(reason).inc()
+        logger.info(f"录到一句话: {length / self.sample_rate:.2f}秒 ({reason})")
+        return self._view(length)
+
+    def feed(self, chunk: bytes) -> Optional[memoryview]:
+        """
+        处理一块录音
+
+        Args:
+            chunk: 16位PCM音频块
+
+        Returns:
+            Optional[memoryview]: 一句话结束时返回整句的字节视图（下一句开始前有效，需要保留时自行复制），否则为None
+        """
+        samples = np.frombuffer(chunk, dtype="<i2")
+        self._ring.write(samples)
+        if self.active:
+            count = min(len(samples), self._limit - self._length)
+            self._buffer[self._length:self._length + count] = samples[:count]
+            self._length += count
+
+        features = self.engine.process_features(chunk)
+        onset = features["speech"]
+        hold = self.engine.decide(features, features["threshold"] * self.release_ratio)
+        hop, frame = self.engine.hop, self.engine.frame
+
+        utterance = None
+        for i in range(len(onset)):
+            if not self.active:
+                self._run = self._run + 1 if onset[i] else 0
+                if self._run >= self.onset_frames:
+                    self._begin((self._frames + i - self._run + 1) * hop - self.pre_roll)
+            else:
+                self._run = 0 if hold[i] else self._run + 1
+                if self._run >= self.hangover_frames:
+                    utterance = self._end((self._frames + i) * hop + frame, "silence")
+                    break
+        self._frames += len(onset)
+
+        if utterance is None and self.active and self._length >= self._limit:
+            utterance = self._end(self._start + self._length, "max_duration")
+        return utterance
+
+    def reset(self):
+        """清除所有状态（背景噪声估计保留）"""
+        self._ring.clear()
+        self.engine.reset()
+        self.active = False
+        self._run = 0
+        self._frames = 0
+        self._length = 0
+
+    def record(
+        self,
+        max_duration: Optional[float] = None,
+        max_wait: float = 5.0,
+        on_chunk: Optional[Callable[[memoryview], None]] = None
+    ) -> Optional[memoryview]:
+        """
+        从麦克风录一句话
+
+        Args:
+            max_duration: 一句话的最大时长（秒，不超过初始化时的设置）
+            max_wait: 等待开始说话的最长时间（秒）
+            on_chunk: 句子每增加一段音频时的回调（开始说话时先收到前置音频）
+
+        Returns:
+            Optional[memoryview]: 整句的字节视图；等待超时时为None
+
+        Raises:
+            RuntimeError: 未设置音频捕获器
+        """
+        if self.capture is None:
+            raise RuntimeError("未设置音频捕获器")
+
+        self.reset()
+        self._limit = len(self._buffer)
+        if max_duration is not None:
+            self._limit = min(self._limit, self.pre_roll + int(max_duration * self.sample_rate))
+        chunk_seconds = self.capture.chunk_size / self.capture.sample_rate
+
+        utterance = None
+        delivered = 0
+        waited = 0.0
+        # 整句保存在自己的缓冲区里，录音器不必再累积一份
+        self.capture.start_recording(keep_audio=False)
+        try:
+            while utterance is None:
+                utterance = self.feed(self.capture.record_chunk())
+                current = utterance if utterance is not None else self.current
+                if current is None:
+                    waited += chunk_seconds
+                    if waited >= max_wait:
+                        logger.info(f"{max_wait:.1f}秒内未检测到语音")
+                        break
+                elif on_chunk and len(current) > delivered:
+                    on_chunk(current[delivered:])
+                    delivered = len(current)
+        finally:
+            self.capture.stop_recording()
+        return utterance
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    with AudioCapture() as capture:
+        recorder = UtteranceCapture(VoiceActivityDetector(silence_threshold=1.0), capture)
+        print("🎤 请说话...")
+        utterance = recorder.record(max_wait=10.0)
+        if utterance is None:
+            print("未检测到语音")
+        else:
+            capture.save_to_file("tmp/utterance.wav", utterance.tobytes())
+            print(f"✓ 录到 {len(utterance) / 2 / capture.sample_rate:.2f} 秒，已保存到 tmp/utterance.wav")
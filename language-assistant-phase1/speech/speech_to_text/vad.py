@@ -1,11 +1,247 @@
 """
 语音活动检测（Voice Activity Detection）模块
 检测音频中是否有人声
+
+按帧一次性计算整段缓冲区的能量、过零率和频带能量（步长视图，不复制数据，宽类型累加不会溢出），
+阈值随背景噪声自适应
 """
 
+import math
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
 import numpy as np
-from typing import Optional
+from numpy.lib.stride_tricks import sliding_window_view
+
 from utils.logger import logger
+from utils.metrics import metrics
+
+VAD_NOISE_FLOOR = metrics.gauge(
+    "vad_noise_floor_rms", "VAD估计的背景噪声能量（16位PCM的RMS）"
+)
+
+
+def frame_view(samples: np.ndarray, frame: int, hop: int) -> np.ndarray:
+    """
+    按帧切分（步长视图，不复制数据；不足一帧的结尾丢弃）
+
+    Args:
+        samples: 一维采样数组
+        frame: 每帧采样数
+        hop: 帧移采样数
+
+    Returns:
+        np.ndarray: (帧数, frame) 的只读视图
+    """
+    if len(samples) < frame:
+        return np.empty((0, frame), dtype=samples.dtype)
+    return sliding_window_view(samples, frame)[::hop]
+
+
+@lru_cache(maxsize=8)
+def _spectrum_setup(frame: int, sample_rate: int, speech_band: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """每种帧长的窗函数和频带起始频点（流式处理时每块都要用，缓存起来）"""
+    freqs = np.fft.rfftfreq(frame, 1.0 / sample_rate)
+    edges = np.concatenate([[0], np.searchsorted(freqs, speech_band)])
+    return np.hanning(frame), edges
+
+
+def low_percentile(values: np.ndarray, percentile: float) -> float:
+    """取百分位数（向下取最近的元素，比np.percentile开销小，流式处理时每块都要算）"""
+    k = int(percentile / 100 * (len(values) - 1))
+    return float(np.partition(values, k)[k])
+
+
+def frame_features(
+    frames: np.ndarray,
+    sample_rate: int = 16000,
+    speech_band: Tuple[float, float] = (300.0, 3400.0)
+) -> Dict[str, np.ndarray]:
+    """
+    计算每帧的特征
+
+    Args:
+        frames: (帧数, 帧长) 的16位PCM采样
+        sample_rate: 采样率
+        speech_band: 语音主要能量所在的频带（Hz）
+
+    Returns:
+        Dict[str, np.ndarray]: energy（RMS）、zcr（过零率）、
+            band_ratio（低于/位于/高于语音频带的能量占比，形状为 (帧数, 3)）
+    """
+    n, frame = frames.shape
+    if n == 0:
+        return {"energy": np.empty(0), "zcr": np.empty(0), "band_ratio": np.empty((0, 3))}
+
+    energy = np.sqrt(np.einsum("ij,ij->i", frames, frames, dtype=np.float64) / frame)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame - 1)
+
+    window, edges = _spectrum_setup(frame, sample_rate, tuple(speech_band))
+    spectrum = np.fft.rfft(frames * window, axis=1)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    bands = np.add.reduceat(power, edges, axis=1)
+    band_ratio = bands / np.maximum(bands.sum(axis=1, keepdims=True), 1e-12)
+
+    return {"energy": energy, "zcr": zcr, "band_ratio": band_ratio}
+
+
+class FrameVAD:
+    """按帧的语音活动检测引擎"""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_seconds: float = 0.02,
+        hop_seconds: Optional[float] = None,
+        energy_threshold: Optional[float] = None,
+        noise_margin: float = 3.0,
+        initial_noise_floor: float = 100.0,
+        min_threshold: float = 150.0,
+        noise_time_constant: float = 5.0,
+        noise_percentile: float = 10.0,
+        speech_band: Tuple[float, float] = (300.0, 3400.0),
+        min_band_ratio: float = 0.3,
+        fricative_zcr: float = 0.3
+    ):
+        """
+        初始化检测引擎
+
+        Args:
+            sample_rate: 采样率
+            frame_seconds: 帧长（秒）
+            hop_seconds: 帧移（秒，默认等于帧长）
+            energy_threshold: 固定能量阈值（None表示按背景噪声自适应）
+            noise_margin: 自适应阈值 = 背景噪声 × noise_margin
+            initial_noise_floor: 背景噪声的初始估计（默认对应原来的固定阈值300）
+            min_threshold: 自适应阈值的下限（避免数字静音后把微弱噪声当成语音）
+            noise_time_constant: 噪声上升时的跟踪时间常数（秒）；噪声下降时立即跟上
+            noise_percentile: 用每批帧能量的这个百分位数估计背景噪声
+            speech_band: 语音主要能量所在的频带（Hz）
+            min_band_ratio: 语音频带能量占比下限（过滤风扇声等低频噪声）
+            fricative_zcr: 过零率超过该值时不要求频带占比（s、f、ch等清辅音能量集中在高频）
+        """
+        self.sample_rate = sample_rate
+        self.frame = max(2, int(frame_seconds * sample_rate))
+        self.hop = max(1, int((hop_seconds or frame_seconds) * sample_rate))
+        self.energy_threshold = energy_threshold
+        self.noise_margin = noise_margin
+        self.min_threshold = min_threshold
+        self.noise_time_constant = noise_time_constant
+        self.noise_percentile = noise_percentile
+        self.speech_band = speech_band
+        self.min_band_ratio = min_band_ratio
+        self.fricative_zcr = fricative_zcr
+
+        self.noise_floor = initial_noise_floor
+        # 上一批不足一帧的剩余采样
+        self._pending = np.empty(0, dtype=np.int16)
+
+    @property
+    def threshold(self) -> float:
+        """当前的能量阈值"""
+        if self.energy_threshold is not None:
+            return self.energy_threshold
+        return max(self.min_threshold, self.noise_floor * self.noise_margin)
+
+    def decide(self, features: Dict[str, np.ndarray], threshold: float) -> np.ndarray:
+        """
+        按特征判断每帧是否为语音
+
+        Args:
+            features: frame_features的结果
+            threshold: 能量阈值
+
+        Returns:
+            np.ndarray: 每帧是否为语音
+        """
+        in_band = features["band_ratio"][:, 1] >= self.min_band_ratio
+        fricative = features["zcr"] >= self.fricative_zcr
+        return (features["energy"] > threshold) & (in_band | fricative)
+
+    def analyze(self, audio: Union[bytes, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        批量分析整段音频（不影响流式状态）
+
+        自适应模式下用整段音频的低百分位帧能量估计背景噪声
+
+        Args:
+            audio: 16位PCM音频（bytes或int16数组）
+
+        Returns:
+            Dict[str, np.ndarray]: 各帧特征，以及 speech（每帧是否为语音）和 threshold（使用的阈值）
+        """
+        samples = np.frombuffer(audio, dtype="<i2") if isinstance(audio, (bytes, bytearray)) else audio
+        features = frame_features(frame_view(samples, self.frame, self.hop), self.sample_rate, self.speech_band)
+
+        threshold = self.threshold
+        if self.energy_threshold is None and len(features["energy"]):
+            noise = low_percentile(features["energy"], self.noise_percentile)
+            threshold = max(self.min_threshold, noise * self.noise_margin)
+
+        features["speech"] = self.decide(features, threshold)
+        features["threshold"] = threshold
+        return features
+
+    def process(self, chunk: bytes) -> np.ndarray:
+        """
+        流式处理一块音频，返回其中完整帧的判断结果（不足一帧的部分留到下一块）
+
+        Args:
+            chunk: 16位PCM音频块
+
+        Returns:
+            np.ndarray: 每帧是否为语音
+        """
+        return self.process_features(chunk)["speech"]
+
+    def process_features(self, chunk: bytes) -> Dict[str, np.ndarray]:
+        """
+        流式处理一块音频，返回其中完整帧的特征和判断结果
+
+        Args:
+            chunk: 16位PCM音频块
+
+        Returns:
+            Dict[str, np.ndarray]: 各帧特征，以及 speech（每帧是否为语音）和 threshold（使用的阈值）
+        """
+        samples = np.frombuffer(chunk, dtype="<i2")
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+        frames = frame_view(samples, self.frame, self.hop)
+        consumed = len(frames) * self.hop
+        self._pending = samples[consumed:].copy()
+
+        features = frame_features(frames, self.sample_rate, self.speech_band)
+        threshold = self.threshold
+        features["speech"] = self.decide(features, threshold)
+        features["threshold"] = threshold
+        if len(frames):
+            self._update_noise_floor(features["energy"])
+        return features
+
+    def _update_noise_floor(self, energy: np.ndarray):
+        """用一批帧的低百分位能量更新背景噪声估计"""
+        quiet = low_percentile(energy, self.noise_percentile)
+        if quiet < self.noise_floor:
+            self.noise_floor = quiet
+        else:
+            # 噪声上升时按时间常数缓慢跟踪，避免持续说话被当成噪声
+            alpha = 1.0 - math.exp(-len(energy) * self.hop / self.sample_rate / self.noise_time_constant)
+            self.noise_floor += alpha * (quiet - self.noise_floor)
+        VAD_NOISE_FLOOR.set(self.noise_floor)
+
+    def reset(self, noise_floor: Optional[float] = None):
+        """
+        清除流式状态（背景噪声估计默认保留，同一环境下下次录音不必重新适应）
+
+        Args:
+            noise_floor: 重新设定的背景噪声估计
+        """
+        self._pending = np.empty(0, dtype=np.int16)
+        if noise_floor is not None:
+            self.noise_floor = noise_floor
 
 
 class VoiceActivityDetector:
@@ -13,22 +249,30 @@ class VoiceActivityDetector:
 
     def __init__(
         self,
-        energy_threshold: float = 300,
-        silence_threshold: float = 0.5
+        energy_threshold: Optional[float] = None,
+        silence_threshold: float = 0.5,
+        sample_rate: int = 16000
     ):
         """
         初始化VAD
 
         Args:
-            energy_threshold: 能量阈值
+            energy_threshold: 能量阈值（None表示按背景噪声自适应）
             silence_threshold: 静音时长阈值（秒）
+            sample_rate: 采样率
         """
-        self.energy_threshold = energy_threshold
+        self.engine = FrameVAD(sample_rate=sample_rate, energy_threshold=energy_threshold)
         self.silence_threshold = silence_threshold
         self.silence_duration = 0.0
+        self._last_speech = False
 
         logger.info("语音活动检测器初始化完成")
 
+    @property
+    def energy_threshold(self) -> float:
+        """当前的能量阈值"""
+        return self.engine.threshold
+
     def calculate_energy(self, audio_data: bytes) -> float:
         """
         计算音频能量
@@ -41,15 +285,15 @@ class VoiceActivityDetector:
         """
         # 将字节数据转换为numpy数组
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
+        if not len(audio_array):
+            return 0.0
 
-        # 计算RMS能量
-        energy = np.sqrt(np.mean(audio_array ** 2))
-
-        return energy
+        # 计算RMS能量（用float64累加，int16平方会溢出）
+        return float(np.sqrt(np.dot(audio_array, audio_array.astype(np.float64)) / len(audio_array)))
 
     def is_speech(self, audio_data: bytes) -> bool:
         """
-        检测音频中是否有语音
+        检测音频中是否有语音（任意一帧为语音即可）
 
         Args:
             audio_data: 音频数据
@@ -57,12 +301,14 @@ class VoiceActivityDetector:
         Returns:
             bool: True表示有语音，False表示静音
         """
-        energy = self.calculate_energy(audio_data)
-        is_speech = energy > self.energy_threshold
+        threshold = self.engine.threshold
+        frames = self.engine.process(audio_data)
+        if len(frames):
+            self._last_speech = bool(frames.any())
 
-        logger.debug(f"音频能量: {energy:.2f}, 是否为语音: {is_speech}")
+        logger.debug(f"语音帧: {int(frames.sum())}/{len(frames)}, 阈值: {threshold:.1f}, 是否为语音: {self._last_speech}")
 
-        return is_speech
+        return self._last_speech
 
     def detect_silence_end(
         self,
@@ -96,6 +342,8 @@ class VoiceActivityDetector:
     def reset(self):
         """重置检测器状态"""
         self.silence_duration = 0.0
+        self._last_speech = False
+        self.engine.reset()
         logger.debug("VAD状态已重置")
 
 
@@ -116,7 +364,8 @@ if __name__ == "__main__":
     speech_data = np.random.randint(-5000, 5000, 1024, dtype=np.int16).tobytes()
     print(f"测试1 - 有语音: {vad.is_speech(speech_data)}")
 
-    # 测试2: 静音音频（模拟）
+    # 测试2: 静音音频（模拟，与上一段不连续，先清除流式状态）
+    vad.reset()
     silence_data = np.random.randint(-100, 100, 1024, dtype=np.int16).tobytes()
     print(f"测试2 - 静音: {vad.is_speech(silence_data)}")
 
@@ -128,3 +377,10 @@ if __name__ == "__main__":
         print(f"  第{i+1}次检测 (静音时长: {vad.silence_duration:.2f}s): {'应停止' if should_stop else '继续'}")
         if should_stop:
             break
+
+    # 测试4: 自适应阈值
+    engine = FrameVAD()
+    noise = np.random.default_rng(0).normal(0, 400, 16000).astype(np.int16).tobytes()
+    print(f"\n测试4 - 背景噪声较大时: 初始阈值 {engine.threshold:.0f}, ", end="")
+    engine.process(noise)
+    print(f"适应后阈值 {engine.threshold:.0f}")
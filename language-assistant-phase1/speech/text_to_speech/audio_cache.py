@@ -0,0 +1,197 @@
+"""
+音频缓存模块
+按内容寻址缓存合成的语音文件
+"""
+
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from utils.logger import logger
+from utils.error_handler import SpeechSynthesisError
+from utils.metrics import metrics
+
+CACHE_REQUESTS = metrics.counter(
+    "audio_cache_requests_total", "语音缓存请求次数", ["result"]
+)
+
+
+class AudioCache:
+    """内容寻址的语音缓存"""
+
+    KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self, cache_dir: Union[str, Path], synthesizer, suffix: str = ".mp3"):
+        """
+        初始化音频缓存
+
+        Args:
+            cache_dir: 缓存目录
+            synthesizer: 语音合成器（SpeechSynthesizer）
+            suffix: 音频文件后缀
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.synthesizer = synthesizer
+        self.suffix = suffix
+
+        # 每个键一把锁和持有/等待它的线程数，避免同一文本被并发重复合成
+        self._locks: Dict[str, List] = {}
+        self._locks_guard = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"音频缓存初始化完成 (目录: {self.cache_dir})")
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str, volume: str) -> str:
+        """
+        计算缓存键
+
+        Args:
+            text: 文本内容
+            voice: 语音ID
+            rate: 语速
+            volume: 音量
+
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        payload = "\x1f".join([text, voice, rate, volume])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def is_valid_key(cls, key: str) -> bool:
+        """检查缓存键格式是否合法"""
+        return bool(cls.KEY_PATTERN.match(key))
+
+    def path_for(self, key: str) -> Path:
+        """
+        获取缓存键对应的文件路径
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Path: 文件路径（按前两位分目录）
+        """
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """
+        查找已缓存的音频
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Path]: 文件路径，不存在时返回None
+        """
+        if not self.is_valid_key(key):
+            return None
+
+        path = self.path_for(key)
+        return path if path.is_file() else None
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """持有键对应的锁；最后一个使用者释放后才从表中移除，等待者始终拿到同一把锁"""
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def get_or_synthesize(self, text: str, language: Optional[str] = None) -> Tuple[str, Path, bool]:
+        """
+        获取文本的语音文件，未命中时合成并写入缓存
+
+        Args:
+            text: 要合成的文本
+            language: 语言类型（如果为None，自动检测）
+
+        Returns:
+            Tuple[str, Path, bool]: (缓存键, 文件路径, 是否命中缓存)
+
+        Raises:
+            SpeechSynthesisError: 合成失败
+        """
+        if not text or not text.strip():
+            raise SpeechSynthesisError("文本不能为空")
+
+        voice = self.synthesizer.resolve_voice(text, language)
+        key = self.make_key(text, voice, self.synthesizer.rate, self.synthesizer.volume)
+        path = self.path_for(key)
+
+        if path.is_file():
+            self.hits += 1
+            CACHE_REQUESTS.labels("hit").inc()
+            return key, path, True
+
+        with self._key_lock(key):
+            # 等锁期间可能已被其他请求写入
+            if path.is_file():
+                self.hits += 1
+                CACHE_REQUESTS.labels("hit").inc()
+                return key, path, True
+
+            self.misses += 1
+            CACHE_REQUESTS.labels("miss").inc()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp{self.suffix}")
+
+            try:
+                self.synthesizer.synthesize(text, str(tmp_path), language)
+                # 原子替换，读者不会看到写了一半的文件
+                os.replace(tmp_path, path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+        logger.info(f"语音已缓存: {key[:12]}...")
+        return key, path, False
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "cache_dir": str(self.cache_dir)
+        }
+
+
+# 使用示例
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # 添加项目路径
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    from speech.text_to_speech.synthesizer import SpeechSynthesizer
+
+    cache = AudioCache("tmp/audio_cache", SpeechSynthesizer())
+
+    for attempt in range(2):
+        start = time.perf_counter()
+        key, path, cached = cache.get_or_synthesize("Bonjour")
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"第{attempt + 1}次: {path} (命中: {cached}, 耗时: {elapsed:.1f}ms)")
+
+    print(cache.get_stats())
@@ -71,6 +71,21 @@ class SpeechSynthesizer:
         else:
             return self.french_voice
 
+    def resolve_voice(self, text: str, language: Optional[str] = None) -> str:
+        """
+        获取合成指定文本时将使用的语音
+
+        Args:
+            text: 文本内容
+            language: 语言类型（如果为None，自动检测）
+
+        Returns:
+            str: 语音ID
+        """
+        if language is None:
+            language = self._detect_language(text)
+        return self._get_voice_for_language(language)
+
     @handle_errors(default_return=False, raise_error=True)
     async def synthesize_async(
         self,
@@ -0,0 +1,131 @@
+"""
+测试音频缓存
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from speech.text_to_speech.audio_cache import AudioCache
+
+
+class FakeSynthesizer:
+    """记录调用次数的假合成器"""
+
+    def __init__(self):
+        self.rate = "+0%"
+        self.volume = "+0%"
+        self.calls = 0
+
+    def resolve_voice(self, text, language=None):
+        return "fr-FR-DeniseNeural"
+
+    def synthesize(self, text, output_file, language=None):
+        self.calls += 1
+        Path(output_file).write_bytes(text.encode("utf-8"))
+        return True
+
+
+class FlakySynthesizer(FakeSynthesizer):
+    """第一次合成失败的慢合成器，记录同时进行的合成数"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self.guard = threading.Lock()
+
+    def synthesize(self, text, output_file, language=None):
+        with self.guard:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            first = self.calls == 0
+        try:
+            time.sleep(0.1)
+            if first:
+                self.calls += 1
+                raise RuntimeError("网络错误")
+            return super().synthesize(text, output_file, language)
+        finally:
+            with self.guard:
+                self.active -= 1
+
+
+def test_audio_cache():
+    """测试音频缓存功能"""
+    print("🧪 测试音频缓存\n")
+
+    synthesizer = FakeSynthesizer()
+    cache = AudioCache(tempfile.mkdtemp(), synthesizer)
+
+    # 测试首次合成
+    print("1. 测试首次合成")
+    key, path, cached = cache.get_or_synthesize("Bonjour")
+    assert not cached, "首次请求不应命中缓存"
+    assert path.read_bytes() == b"Bonjour", "缓存文件内容应为合成结果"
+    assert synthesizer.calls == 1
+    print("  ✓ 首次合成功能正常\n")
+
+    # 测试重复请求命中缓存
+    print("2. 测试缓存命中")
+    key2, path2, cached = cache.get_or_synthesize("Bonjour")
+    assert cached and key2 == key and path2 == path, "重复请求应命中同一缓存"
+    assert synthesizer.calls == 1, "命中缓存时不应再次合成"
+    print("  ✓ 缓存命中功能正常\n")
+
+    # 测试缓存键包含语速
+    print("3. 测试缓存键")
+    assert AudioCache.make_key("Bonjour", "v", "+0%", "+0%") != \
+        AudioCache.make_key("Bonjour", "v", "+10%", "+0%"), "语速不同键应不同"
+    assert AudioCache.is_valid_key(key)
+    print("  ✓ 缓存键功能正常\n")
+
+    # 测试查找
+    print("4. 测试查找")
+    assert cache.lookup(key) == path
+    assert cache.lookup("../../etc/passwd") is None, "非法键应返回None"
+    assert cache.lookup("0" * 64) is None, "不存在的键应返回None"
+    print("  ✓ 查找功能正常\n")
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+    # 测试并发合成：合成失败后，等待者和新来的请求仍共用同一把锁
+    print("5. 测试并发合成")
+    synthesizer = FlakySynthesizer()
+    cache = AudioCache(tempfile.mkdtemp(), synthesizer)
+    results = []
+
+    def request():
+        try:
+            results.append(cache.get_or_synthesize("Salut")[2])
+        except RuntimeError:
+            results.append(None)
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.15)
+    late = [threading.Thread(target=request) for _ in range(4)]
+    for thread in late:
+        thread.start()
+    for thread in threads + late:
+        thread.join()
+    assert synthesizer.max_active == 1, "同一文本不应同时合成"
+    assert synthesizer.calls == 2, f"失败一次后只应再合成一次: {synthesizer.calls}"
+    assert sorted(results, key=str) == [False] + [None] + [True] * 6
+    assert cache._locks == {}, "所有请求结束后应移除锁"
+    print("  ✓ 并发合成功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_audio_cache()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,168 @@
+"""
+测试回调模式的音频捕获
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pyaudio
+
+from speech.speech_to_text.audio_capture import AudioCapture
+from speech.speech_to_text.utterance_capture import UtteranceCapture
+from speech.speech_to_text.vad import VoiceActivityDetector
+
+
+class FakeStream:
+    """保存回调的假录音流，由测试代替PortAudio线程调用回调"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.closed = False
+
+    def push(self, data, status=0):
+        assert self.callback(data, len(data) // 2, {}, status) == (None, pyaudio.paContinue)
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePyAudio:
+    """记录open参数的假PyAudio"""
+
+    def __init__(self):
+        self.stream = None
+
+    def open(self, **kwargs):
+        self.stream = FakeStream(kwargs.get("stream_callback"))
+        return self.stream
+
+    def get_sample_size(self, format):
+        return 2
+
+    def terminate(self):
+        pass
+
+
+def make_capture(**kwargs):
+    """创建使用假PyAudio的捕获器"""
+    capture = AudioCapture(**kwargs)
+    capture.audio = FakePyAudio()
+    return capture
+
+
+def chunk(value, size=1024):
+    """生成取值恒定的音频块"""
+    return np.full(size, value, dtype=np.int16).tobytes()
+
+
+def tone_chunk(amplitude, size=1024):
+    """生成440Hz正弦波音频块"""
+    t = np.arange(size) / 16000
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+
+
+def test_audio_capture():
+    """测试回调模式录音功能"""
+    print("🧪 测试回调模式录音\n")
+
+    # 测试回调入队
+    print("1. 测试回调入队")
+    capture = make_capture(read_timeout=0.2)
+    capture.start_recording()
+    stream = capture.audio.stream
+    assert stream.callback is not None, "默认应使用回调模式"
+    for i in range(3):
+        stream.push(chunk(i))
+    assert [capture.record_chunk() for _ in range(3)] == [chunk(i) for i in range(3)], "应按顺序取出"
+    try:
+        capture.record_chunk()
+        assert False, "没有数据时应超时"
+    except RuntimeError:
+        pass
+    print("  ✓ 回调数据按顺序取出\n")
+
+    # 测试溢出统计
+    print("2. 测试溢出统计")
+    capture = make_capture(queue_chunks=4)
+    capture.start_recording()
+    stream = capture.audio.stream
+    start = time.perf_counter()
+    for i in range(10):
+        stream.push(chunk(i), status=pyaudio.paInputOverflow if i == 5 else 0)
+    assert time.perf_counter() - start < 0.1, "队列满时回调不应阻塞"
+    assert [capture.record_chunk() for _ in range(4)] == [chunk(i) for i in range(6, 10)], "应丢弃最旧的块"
+    stats = capture.get_stats()
+    assert stats["captured_chunks"] == 10 and stats["dropped_chunks"] == 6 and stats["input_overflows"] == 1
+    assert capture.stop_recording() == b"".join(chunk(i) for i in range(6, 10))
+    assert stream.closed and capture.stream is None
+    print(f"  ✓ {stats}\n")
+
+    # 测试后台录音时VAD在另一个线程消费
+    print("3. 测试并发消费")
+    capture = make_capture()
+    recorder = UtteranceCapture(VoiceActivityDetector(energy_threshold=300, silence_threshold=0.3), capture)
+    audio = [chunk(0)] * 10 + [tone_chunk(3000)] * 15 + [chunk(0)] * 20
+
+    def produce():
+        while capture.audio.stream is None:
+            time.sleep(0.001)
+        for data in audio:
+            capture.audio.stream.push(data)
+            time.sleep(0.002)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    utterance = recorder.record(max_wait=5.0)
+    producer.join()
+    samples = np.frombuffer(utterance, dtype=np.int16)
+    assert tone_chunk(3000) * 15 in utterance.tobytes(), "整句应包含全部语音"
+    assert capture.get_stats()["dropped_chunks"] == 0
+    assert capture.buffer.allocations == 0 and len(capture.stop_recording()) == 0, "整句录音时录音器不应累积音频"
+    print(f"  ✓ 录到 {len(samples) / 16000:.2f} 秒\n")
+
+    # 测试阻塞模式
+    print("4. 测试阻塞模式")
+    capture = make_capture(use_callback=False)
+    capture.start_recording()
+    assert capture.audio.stream.callback is None
+    assert capture.get_stats()["mode"] == "blocking"
+    print("  ✓ 阻塞模式不注册回调\n")
+
+    # 测试录音缓冲区
+    print("5. 测试录音缓冲区")
+    capture = make_capture(buffer_seconds=0.1)
+    capture.start_recording()
+    stream = capture.audio.stream
+    views = []
+    for i in range(5):
+        stream.push(chunk(i))
+        views.append(capture.record_chunk())
+    audio = capture.stop_recording()
+    assert audio == b"".join(chunk(i) for i in range(5))
+    assert all(view == chunk(i) for i, view in enumerate(views)), "扩容后之前的视图应保持不变"
+    assert capture.buffer.allocations == 3, f"容量应倍增: {capture.buffer.allocations}"
+    samples = capture.buffer.samples()
+    assert np.shares_memory(samples, np.frombuffer(audio, dtype=np.uint8)), "采样数组应是缓冲区的视图"
+    assert np.shares_memory(np.frombuffer(views[-1], dtype=np.uint8), samples)
+    capture.start_recording()
+    capture.audio.stream.push(chunk(9))
+    capture.record_chunk()
+    assert capture.stop_recording() == chunk(9) and capture.buffer.allocations == 3, "再次录音应复用缓冲区"
+    print(f"  ✓ 分配 {capture.buffer.allocations} 次\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_audio_capture()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,107 @@
+"""
+测试后端对话记录和音频接口
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "backend"))
+
+import app as backend
+from mcp.session_registry import SessionRegistry
+from speech.text_to_speech.audio_cache import AudioCache
+
+
+class FakeSynthesizer:
+    """把文本写成音频文件的假合成器"""
+
+    rate = "+0%"
+    volume = "+0%"
+
+    def resolve_voice(self, text, language=None):
+        return "fr-FR-DeniseNeural"
+
+    def synthesize(self, text, output_file, language=None):
+        Path(output_file).write_bytes(text.encode("utf-8"))
+        return True
+
+
+def test_backend_api():
+    """测试后端接口功能"""
+    print("🧪 测试后端接口\n")
+
+    client = backend.app.test_client()
+    backend.session_registry = SessionRegistry()
+    token = backend.app.config["TRANSCRIPT_ADMIN_TOKEN"]
+
+    # 测试对话记录接口的权限
+    print("1. 测试对话记录接口权限")
+    try:
+        backend.app.config["TRANSCRIPT_ADMIN_TOKEN"] = None
+        assert client.get("/api/sessions/export").status_code == 404, "未配置令牌时接口应关闭"
+        assert client.post("/api/sessions/import", data="").status_code == 404
+
+        backend.app.config["TRANSCRIPT_ADMIN_TOKEN"] = "s3cret"
+        assert client.get("/api/sessions/export").status_code == 401
+        wrong = {"Authorization": "Bearer nope"}
+        assert client.post("/api/sessions/import", data="", headers=wrong).status_code == 401
+        print("  ✓ 没有令牌不能导出或导入\n")
+
+        # 测试导入导出
+        print("2. 测试导入导出")
+        headers = {"Authorization": "Bearer s3cret"}
+        body = '{"session_id": "alice", "role": "user", "content": "salut"}\n[1, 2]\n'
+        response = client.post("/api/sessions/import", data=body, headers=headers)
+        assert response.status_code == 400 and "第2行" in response.get_json()["error"]
+        assert "alice" not in backend.session_registry, "有一行不合法时不应导入任何记录"
+
+        body = '{"session_id": "alice", "role": "user", "content": "salut", "timestamp": "2024-05-01T10:00:00Z"}\n'
+        response = client.post("/api/sessions/import", data=body, headers=headers)
+        assert response.get_json() == {"imported": 1, "dropped": 0}
+
+        response = client.get("/api/sessions/export?since=2024-05-01T09:00:00Z", headers=headers)
+        assert response.status_code == 200 and '"content": "salut"' in response.get_data(as_text=True)
+        assert client.get("/api/sessions/export?since=nope", headers=headers).status_code == 400
+        print("  ✓ 导入导出正常\n")
+    finally:
+        backend.app.config["TRANSCRIPT_ADMIN_TOKEN"] = token
+
+    # 测试音频接口
+    print("3. 测试音频接口")
+    audio_cache = backend.audio_cache
+    backend.audio_cache = AudioCache(tempfile.mkdtemp(), FakeSynthesizer())
+    try:
+        response = client.post("/api/pronunciation", json={"text": "bonjour"})
+        url = response.get_json()["audio_url"]
+        key = url.rsplit("/", 1)[1]
+
+        response = client.get(url)
+        assert response.status_code == 200 and response.data == b"bonjour"
+        assert response.headers["ETag"] == f'"{key}"', "内容寻址的键即ETag"
+        assert "immutable" in response.headers["Cache-Control"]
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+        response = client.get(url, headers={"If-None-Match": f'"{key}"'})
+        assert response.status_code == 304 and response.data == b"", "ETag一致时应返回304"
+
+        response = client.get(url, headers={"Range": "bytes=3-"})
+        assert response.status_code == 206 and response.data == b"jour"
+        assert response.headers["Content-Range"] == "bytes 3-6/7"
+        assert client.get(url, headers={"Range": "bytes=10-"}).status_code == 416
+
+        assert client.get("/api/audio/" + "0" * 64).status_code == 404
+        assert client.get("/api/audio/not-a-key").status_code == 404
+        print("  ✓ ETag和Range请求正常\n")
+    finally:
+        backend.audio_cache = audio_cache
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_backend_api()
+    sys.exit(0 if success else 1)
@@ -54,10 +54,24 @@ def test_conversation_manager():
     assert stats['assistant_messages'] == 2, "助手消息数应该是2"
     print("  ✓ 统计信息功能正常\n")
 
+    # 测试历史溢出
+    print("6. 测试历史溢出")
+    for i in range(3):
+        manager.add_user_message(f"问题{i}")
+    stats = manager.get_stats()
+    assert stats['total_messages'] == 5, "总消息数不应超过上限"
+    assert stats['user_messages'] == 4 and stats['assistant_messages'] == 1, \
+        f"溢出后角色计数错误: {stats}"
+    assert [msg.content for msg in manager.get_context_window(2)] == ["问题1", "问题2"]
+    assert len(manager.get_history(limit=50)) == 5
+    assert manager.get_history()[-1].to_dict()['role'] == "user"
+    print("  ✓ 历史溢出功能正常\n")
+
     # 测试清空历史
-    print("6. 测试清空历史")
+    print("7. 测试清空历史")
     manager.clear_history()
     assert len(manager) == 0, "清空后应该没有消息"
+    assert manager.get_stats()['user_messages'] == 0, "清空后计数应归零"
     print("  ✓ 清空历史功能正常\n")
 
     print("✅ 所有测试通过！")
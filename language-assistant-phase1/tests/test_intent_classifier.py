@@ -0,0 +1,109 @@
+"""
+测试意图分类器
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from mcp.intent_classifier import DEFAULT_DEV_CORPUS, DEFAULT_MODEL, IntentClassifier, load_corpus
+from mcp.intent_detector import IntentDetector, IntentType
+
+# 训练语料和校准语料里都没有的说法
+HELD_OUT = {
+    "explanation": ["这个句子写得对吗", "为什么要用虚拟式", "le和la怎么区分", "这句话哪里有问题"],
+    "translation": ["'早安'法语怎么说", "把这句翻成中文：il fait beau", "请把'我喜欢猫'译成法语"],
+    "vocabulary": ["soleil是什么意思", "教我几个动物的单词", "petit的反义词是什么"],
+    "pronunciation": ["bonsoir怎么读", "这个音怎么发", "oui的发音"],
+    "conversation": ["你喜欢看书吗", "今天好冷啊", "你叫什么名字", "我刚下班", "推荐一家餐厅吧", "你几岁了"],
+}
+
+
+def test_intent_classifier():
+    """测试意图分类功能"""
+    print("🧪 测试意图分类器\n")
+
+    texts, labels = load_corpus()
+    classifier = IntentClassifier().fit(texts, labels)
+
+    # 测试训练集拟合
+    print("1. 测试训练集拟合")
+    predictions = classifier.predict_batch(texts)
+    accuracy = np.mean([label == pred for label, (pred, _) in zip(labels, predictions)])
+    assert accuracy > 0.9, f"训练集准确率过低: {accuracy:.2f}"
+    print(f"  ✓ 训练集准确率: {accuracy:.2f}\n")
+
+    # 测试批量与单条预测一致
+    print("2. 测试批量预测")
+    samples = ["这句法语对吗", "croissant怎么读", "", "chien是什么意思"]
+    batch = classifier.predict_batch(samples)
+    assert batch == [classifier.predict(text) for text in samples], "批量结果应与单条一致"
+    proba = classifier.predict_proba_batch(samples)
+    assert np.allclose(proba.sum(axis=1), 1.0), "概率之和应为1"
+    print("  ✓ 批量预测功能正常\n")
+
+    # 测试模型保存和加载
+    print("3. 测试模型保存和加载")
+    model_path = Path(tempfile.mkdtemp()) / "intent_model.npz"
+    classifier.save(model_path)
+    loaded = IntentClassifier.load(model_path)
+    assert [label for label, _ in loaded.predict_batch(samples)] == \
+        [label for label, _ in batch], "加载后的模型预测应一致"
+    print(f"  ✓ 模型大小: {model_path.stat().st_size / 1024:.1f} KB\n")
+
+    # 测试校准
+    print("4. 测试校准")
+    dev_texts, dev_labels = load_corpus(DEFAULT_DEV_CORPUS)
+    assert not set(dev_texts) & set(texts), "校准语料不能与训练语料重复"
+    classifier.calibrate(dev_texts, dev_labels)
+    assert classifier.temperature > 1.0, "朴素贝叶斯的概率应被拉平"
+    classifier.save(model_path)
+    loaded = IntentClassifier.load(model_path)
+    assert (loaded.temperature, loaded.threshold) == (classifier.temperature, classifier.threshold)
+    print(f"  ✓ 温度 {classifier.temperature:.2f}, 阈值 {classifier.threshold:.2f}\n")
+
+    # 测试随代码发布的模型
+    print("5. 测试发布的模型")
+    shipped = IntentClassifier.load_or_train()
+    assert DEFAULT_MODEL.exists() and shipped.threshold is not None, "应加载发布的已校准模型，而不是重新训练"
+    assert shipped.predict_batch(samples) == loaded.predict_batch(samples), "发布的模型应与语料训练结果一致，修改语料后需重新生成"
+    print("  ✓ 发布的模型与语料一致\n")
+
+    # 测试未参与训练和校准的说法
+    print("6. 测试未见过的说法")
+    seen = set(texts) | set(dev_texts)
+    held_out = [(text, label) for label, phrases in HELD_OUT.items() for text in phrases]
+    assert not seen & {text for text, _ in held_out}
+    routed = [
+        label if prob >= shipped.threshold else "conversation"
+        for label, prob in shipped.predict_batch([text for text, _ in held_out])
+    ]
+    accuracy = np.mean([pred == label for pred, (_, label) in zip(routed, held_out)])
+    assert accuracy >= 0.9, f"未见过的说法准确率过低: {accuracy:.2f}"
+    misrouted = [text for pred, (text, label) in zip(routed, held_out) if label == "conversation" and pred != label]
+    assert misrouted == [], f"闲聊不应被分到学习意图: {misrouted}"
+    print(f"  ✓ 准确率: {accuracy:.2f}\n")
+
+    # 测试作为关键词匹配的后备
+    print("7. 测试意图检测器后备")
+    detector = IntentDetector(classifier=shipped)
+    assert detector.threshold == shipped.threshold, "默认使用校准得到的阈值"
+    assert detector.detect("这个句子写得对吗") == IntentType.EXPLANATION, "应识别为解释请求"
+    assert detector.detect("bonsoir怎么读") == IntentType.PRONUNCIATION
+    assert detector.detect("周末你做什么") == IntentType.CONVERSATION, "闲聊不应被分到翻译"
+    assert detector.detect_batch(["这句话哪里有问题", "你叫什么名字"]) == \
+        [IntentType.EXPLANATION, IntentType.CONVERSATION]
+    print("  ✓ 后备功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_intent_classifier()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,67 @@
+"""
+测试关键词匹配器
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.keyword_matcher import KeywordMatcher
+from mcp.intent_detector import IntentDetector, IntentType
+
+
+def test_keyword_matcher():
+    """测试关键词匹配功能"""
+    print("🧪 测试关键词匹配器\n")
+
+    # 测试重叠关键词
+    print("1. 测试重叠关键词")
+    matcher = KeywordMatcher({
+        "explanation": ["什么意思", "是什么意思", "用法"],
+        "translation": ["用法语", "怎么说", "French"],
+    })
+    counts = matcher.count("用法语怎么说'这是什么意思'")
+    assert counts == {"explanation": 3, "translation": 2}, f"计数错误: {counts}"
+    print("  ✓ 重叠关键词功能正常\n")
+
+    # 测试大小写和重复命中
+    print("2. 测试大小写和重复命中")
+    counts = matcher.count("french FRENCH French")
+    assert counts["translation"] == 1, "同一关键词只应计一次"
+    assert matcher.count("今天天气真好") == {"explanation": 0, "translation": 0}
+    print("  ✓ 大小写和重复命中功能正常\n")
+
+    # 测试与子串扫描结果一致
+    print("3. 测试与子串扫描结果一致")
+    detector = IntentDetector(use_classifier=False)
+    samples = [
+        "请把'你好'翻译成法语",
+        "bonjour怎么发音？",
+        "passé composé和imparfait的用法区别是什么意思",
+        "Comment dit-on 'merci' en français ?",
+    ]
+    for text in samples:
+        expected = {
+            intent: sum(1 for word in words if word.lower() in text.lower())
+            for intent, words in detector.keywords.items()
+        }
+        assert detector.score(text) == expected, f"得分不一致: {text}"
+    print("  ✓ 结果一致\n")
+
+    # 测试按得分选择意图
+    print("4. 测试按得分选择意图")
+    result = detector.analyze("passé composé和imparfait的用法区别是什么意思")
+    assert result["intent"] == IntentType.EXPLANATION
+    assert result["scores"][IntentType.EXPLANATION] >= 3
+    assert detector.analyze("今天天气真好")["confidence"] == 0.5
+    print("  ✓ 意图选择功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_keyword_matcher()
+    sys.exit(0 if success else 1)
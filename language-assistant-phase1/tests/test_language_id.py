@@ -0,0 +1,119 @@
+"""
+测试语种识别
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import FakeEngine, STTEngine
+from speech.speech_to_text.language_id import LanguageIdentifier
+from speech.speech_to_text.recognizer import SpeechRecognizer
+from speech.speech_to_text.streaming import StreamingTranscriber
+from speech.speech_to_text.transcript_cache import TranscriptCache
+
+
+class BilingualEngine(STTEngine):
+    """音频幅度即法语概率的假引擎，识别结果为"语种:采样数" """
+
+    name = "bilingual"
+
+    def __init__(self):
+        super().__init__("fake")
+        self.detections = []
+        self.decodes = []
+
+    def load(self):
+        self.model = self
+
+    def detect_language(self, audio):
+        self.detections.append(len(audio))
+        fr = float(np.abs(audio).max()) if len(audio) else 0.0
+        return {"fr": fr, "zh": 1.0 - fr, "en": 0.0}
+
+    def transcribe(self, audio, language):
+        self.decodes.append(language)
+        return f"{language}:{len(audio)}"
+
+
+def utterance(p_fr, seconds=1.0):
+    """生成法语概率为p_fr的音频"""
+    return np.full(int(seconds * 16000), p_fr, dtype=np.float32)
+
+
+def test_language_id():
+    """测试语种识别功能"""
+    print("🧪 测试语种识别\n")
+
+    # 测试迟滞
+    print("1. 测试会话迟滞")
+    identifier = LanguageIdentifier(BilingualEngine(), candidates=("zh", "fr"), switch_margin=0.2)
+    assert identifier.choose(utterance(0.9), "a") == "fr"
+    assert identifier.choose(utterance(0.45), "a") == "fr", "差距不足时不应切换"
+    assert identifier.choose(utterance(0.2), "a") == "zh", "差距足够时应切换"
+    assert identifier.choose(utterance(0.55), "b") == "fr", "会话之间互不影响"
+    assert identifier.current("a") == "zh" and identifier.current("b") == "fr"
+
+    strict = LanguageIdentifier(BilingualEngine(), candidates=("zh", "fr"), default="zh", min_confidence=0.7)
+    assert strict.choose(utterance(0.6)) == "zh", "首次检测置信度不足时应使用默认语种"
+    identifier.reset("a")
+    assert identifier.current("a") is None
+
+    fallback = LanguageIdentifier(FakeEngine(), candidates=("fr", "zh"))
+    assert fallback.choose(utterance(0.9)) == "fr", "引擎不支持检测时应使用默认语种"
+    print("  ✓ 迟滞功能正常\n")
+
+    # 测试识别器自动选择语种
+    print("2. 测试自动选择解码语种")
+    engine = BilingualEngine()
+    recognizer = SpeechRecognizer(engine=engine, language="auto")
+    assert recognizer.recognize_array(utterance(0.9, seconds=10)) == "fr:160000"
+    assert engine.detections == [48000], "只应用开头3秒做检测"
+    assert engine.decodes == ["fr"], "不应额外做一次完整解码"
+    assert recognizer.last_language == "fr"
+    assert recognizer.recognize_array(utterance(0.2), session_id="other") == "zh:16000"
+    assert recognizer.recognize_array(utterance(0.2), language="fr") == "fr:16000", "显式语种不做检测"
+    assert len(engine.detections) == 2
+
+    texts = recognizer.recognize_batch([utterance(0.9), utterance(0.1), utterance(0.8, 2)])
+    assert texts == ["fr:16000", "zh:16000", "fr:32000"], f"批量识别应按语种分组: {texts}"
+    assert engine.decodes[-3:] == ["fr", "fr", "zh"]
+
+    # 缓存命中时不再做语种检测，也不改变会话的语种状态
+    engine = BilingualEngine()
+    recognizer = SpeechRecognizer(engine=engine, language="auto", cache=TranscriptCache())
+    assert recognizer.recognize_array(utterance(0.9)) == "fr:16000"
+    assert recognizer.recognize_array(utterance(0.2)) == "zh:16000"
+    assert recognizer.recognize_array(utterance(0.9)) == "fr:16000"
+    assert recognizer.last_language == "fr", "命中缓存时应恢复当时的语种"
+    assert len(engine.detections) == 2 and len(engine.decodes) == 2, "命中缓存时不应再检测或解码"
+    assert recognizer.language_id.current("default") == "zh", "命中缓存不应改变会话语种"
+    assert recognizer.recognize_array(utterance(0.9), language="zh") == "zh:16000", "显式语种使用各自的缓存"
+    print("  ✓ 自动选择解码语种正常\n")
+
+    # 测试流式识别固定语种
+    print("3. 测试流式识别")
+    engine = BilingualEngine()
+    recognizer = SpeechRecognizer(engine=engine, language="auto")
+    transcriber = StreamingTranscriber(recognizer, interval_seconds=0.5).start()
+    audio = (utterance(0.9, seconds=5) * 32767).astype(np.int16).tobytes()
+    for start in range(0, len(audio), 3200):
+        transcriber.feed(audio[start:start + 3200])
+        time.sleep(0.002)
+    text = transcriber.finish()
+    assert text.startswith("fr:"), f"识别结果错误: {text}"
+    assert len(engine.detections) < len(engine.decodes), "本句语种确定后不应每次都检测"
+    print(f"  ✓ 解码 {len(engine.decodes)} 次，检测 {len(engine.detections)} 次\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_language_id()
+    sys.exit(0 if success else 1)
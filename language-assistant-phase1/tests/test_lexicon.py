@@ -0,0 +1,81 @@
+"""
+测试意图词表热加载
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.lexicon import load_lexicon, LexiconWatcher, DEFAULT_LEXICON_PATH
+from mcp.intent_detector import IntentDetector, IntentType, DEFAULT_KEYWORDS
+
+
+LEXICON_V1 = """
+version: "test-1"
+intents:
+  translation: ["翻译"]
+  pronunciation: ["发音"]
+"""
+
+LEXICON_V2 = """
+version: "test-2"
+intents:
+  translation: ["翻译"]
+  pronunciation: ["发音", "念"]
+"""
+
+
+def test_lexicon():
+    """测试词表加载和热更新功能"""
+    print("🧪 测试意图词表\n")
+
+    # 测试内置词表文件
+    print("1. 测试内置词表文件")
+    compiled = load_lexicon(DEFAULT_LEXICON_PATH, IntentType)
+    assert compiled.keywords == DEFAULT_KEYWORDS, "词表文件应与内置词表一致"
+    assert compiled.version.startswith("2026"), f"版本号错误: {compiled.version}"
+    print(f"  ✓ 版本: {compiled.version}\n")
+
+    # 测试热加载
+    print("2. 测试热加载")
+    path = Path(tempfile.mkdtemp()) / "lexicon.yaml"
+    path.write_text(LEXICON_V1, encoding="utf-8")
+    detector = IntentDetector(use_classifier=False, lexicon_path=path)
+    assert detector.lexicon_version.startswith("test-1+")
+    assert detector.detect("这个词怎么念") == IntentType.CONVERSATION
+
+    watcher = LexiconWatcher(path, detector._swap_lexicon, IntentType)
+    assert not watcher.check(), "文件未变化时不应重新加载"
+    path.write_text(LEXICON_V2, encoding="utf-8")
+    assert watcher.check(), "文件变化后应重新加载"
+    result = detector.analyze("这个词怎么念")
+    assert result["intent"] == IntentType.PRONUNCIATION
+    assert result["lexicon_version"].startswith("test-2+")
+    print(f"  ✓ 已切换到: {detector.lexicon_version}\n")
+
+    # 测试错误词表不影响服务
+    print("3. 测试错误词表")
+    path.write_text("intents:\n  unknown_intent: [\"x\"]\n", encoding="utf-8")
+    assert not watcher.check(), "错误词表不应生效"
+    path.write_text("intents: [broken", encoding="utf-8")
+    assert not detector.reload(), "错误词表不应生效"
+    assert detector.lexicon_version.startswith("test-2+"), "应保留旧版本"
+    print("  ✓ 保留旧版本\n")
+
+    # 测试文件缺失时使用内置词表
+    print("4. 测试内置词表回退")
+    fallback = IntentDetector(use_classifier=False, lexicon_path=path.parent / "missing.yaml")
+    assert fallback.lexicon_version == "builtin"
+    assert fallback.detect("bonjour怎么发音？") == IntentType.PRONUNCIATION
+    print("  ✓ 回退功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_lexicon()
+    sys.exit(0 if success else 1)
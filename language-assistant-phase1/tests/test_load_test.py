@@ -0,0 +1,49 @@
+"""
+测试压力测试工具的统计函数
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "backend"))
+
+from load_test import parse_mix, percentile
+
+
+def test_load_test():
+    """测试压力测试统计功能"""
+    print("🧪 测试压力测试工具\n")
+
+    # 测试最近秩分位数
+    print("1. 测试分位数")
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5, "秩为 ceil(0.5 * 10) = 5"
+    assert percentile(values, 90) == 9
+    assert percentile(values, 95) == 10
+    assert percentile(values, 99) == 10
+    assert percentile(values, 0) == 1 and percentile(values, 100) == 10
+    values = list(range(1, 101))
+    assert [percentile(values, pct) for pct in (50, 90, 95, 99)] == [50, 90, 95, 99], "整数秩不应多取一位"
+    assert percentile([7], 50) == 7
+    assert percentile([], 99) == 0.0
+    print("  ✓ 分位数正确\n")
+
+    # 测试请求比例解析
+    print("2. 测试请求比例")
+    assert parse_mix("chat=0.7, translate=0.3") == {"chat": 0.7, "translate": 0.3}
+    try:
+        parse_mix("upload=1")
+        assert False, "应拒绝未知接口"
+    except ValueError:
+        pass
+    print("  ✓ 比例解析正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_load_test()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,112 @@
+"""
+测试长音频并行识别
+"""
+
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.long_audio import LongAudioTranscriber, split_on_pauses
+from speech.speech_to_text.recognizer import SpeechRecognizer
+
+SAMPLE_RATE = 16000
+
+
+def make_recording(speech_seconds, pause_seconds=1.0):
+    """生成录音：每段恒定幅度的"语音"之间隔pause_seconds秒静音，首尾各0.5秒静音"""
+    pause = np.zeros(int(pause_seconds * SAMPLE_RATE), dtype=np.float32)
+    parts = [np.zeros(SAMPLE_RATE // 2, dtype=np.float32)]
+    for seconds in speech_seconds:
+        parts += [np.full(int(seconds * SAMPLE_RATE), 0.3, dtype=np.float32), pause]
+    parts[-1] = np.zeros(SAMPLE_RATE // 2, dtype=np.float32)
+    return np.concatenate(parts)
+
+
+def test_long_audio():
+    """测试长音频识别功能"""
+    print("🧪 测试长音频识别\n")
+
+    # 测试停顿切分
+    print("1. 测试停顿切分")
+    assert split_on_pauses(np.zeros(SAMPLE_RATE * 5, dtype=np.float32)) == [], "纯静音不应产生分段"
+
+    audio = make_recording([2.0, 1.0, 2.0])
+    spans = split_on_pauses(audio, max_segment_seconds=3.0)
+    assert len(spans) == 3, f"应在每个停顿处切开: {spans}"
+    for (start, end), (next_start, _) in zip(spans, spans[1:]):
+        assert end == next_start, "相邻分段应首尾相接"
+    assert 0 < spans[0][0] < SAMPLE_RATE // 2 and spans[-1][1] < len(audio), "首尾的纯静音应丢弃"
+
+    merged = split_on_pauses(audio, max_segment_seconds=30.0)
+    assert len(merged) == 1, f"总长不超过上限时应合并为一段: {merged}"
+
+    continuous = np.full(SAMPLE_RATE * 10, 0.3, dtype=np.float32)
+    spans = split_on_pauses(continuous, max_segment_seconds=3.0)
+    assert all(end - start <= 3 * SAMPLE_RATE for start, end in spans), "过长的段应强制切开"
+    assert spans[0][0] == 0 and spans[-1][1] == len(continuous)
+    print("  ✓ 停顿切分功能正常\n")
+
+    # 测试并行识别并按顺序返回
+    print("2. 测试并行识别")
+    audio = make_recording([2.5, 1.0, 2.0, 0.5])
+    streamed = []
+    with LongAudioTranscriber(
+        engine="fake", language="fr", workers=2, max_segment_seconds=3.0,
+        engine_options={"realtime_factor": 0.2}
+    ) as transcriber:
+        segments = transcriber.transcribe(audio, on_segment=streamed.append)
+
+        assert [segment.index for segment in segments] == [0, 1, 2, 3]
+        assert streamed == segments, "回调应按时间顺序逐段调用"
+        for segment in segments:
+            assert segment.text == f"{segment.end - segment.start:.2f}s", "时间戳应与识别的音频一致"
+        assert segments[0].start < 0.5 and segments[-1].end <= len(audio) / SAMPLE_RATE
+
+        # 进程池复用：第二次识别不再重新加载模型
+        first = next(transcriber.iter_transcribe(audio))
+        assert first.to_dict() == segments[0].to_dict()
+    print(f"  ✓ {segments}\n")
+
+    # 测试识别器入口
+    print("3. 测试识别长录音文件")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "lesson.wav"
+        with wave.open(str(wav_path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes((make_recording([1.0, 1.0]) * 32767).astype(np.int16).tobytes())
+
+        recognizer = SpeechRecognizer(engine="fake", language="fr", engine_options={"text": "bonjour"})
+        try:
+            assert recognizer.recognize_long_file(wav_path, workers=1) == "bonjour"
+            executor = recognizer._long_audio._executor
+            assert recognizer.recognize_long_file(wav_path) == "bonjour"
+            assert recognizer._long_audio._executor is executor, "再次识别应复用进程池"
+        finally:
+            recognizer.close()
+        assert recognizer._long_audio is None
+
+        recognizer = SpeechRecognizer(
+            engine="fake", language="auto", languages=("fr", "zh"), engine_options={"text": "bonjour"}
+        )
+        try:
+            assert recognizer.recognize_long_file(wav_path, workers=1) == "bonjour"
+            assert recognizer._long_audio.languages == ("fr", "zh"), "工作进程应使用识别器的候选语种"
+        finally:
+            recognizer.close()
+    print("  ✓ 识别长录音文件功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_long_audio()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,65 @@
+"""
+测试指标统计
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.metrics import MetricsRegistry
+
+
+def test_metrics():
+    """测试指标统计功能"""
+    print("🧪 测试指标统计\n")
+
+    registry = MetricsRegistry()
+
+    # 测试计数器
+    print("1. 测试计数器")
+    counter = registry.counter("intent_total", "意图分布", ["intent"])
+    counter.labels("translation").inc()
+    counter.labels(intent="translation").inc(2)
+    assert counter.labels("translation").value == 3, "计数应该是3"
+    assert registry.counter("intent_total", "意图分布", ["intent"]) is counter, \
+        "重复注册应返回同一指标"
+    print("  ✓ 计数器功能正常\n")
+
+    # 测试仪表
+    print("2. 测试仪表")
+    gauge = registry.gauge("sessions", "活跃会话数")
+    gauge.inc(5)
+    gauge.dec(2)
+    assert gauge.labels().value == 3, "仪表值应该是3"
+    print("  ✓ 仪表功能正常\n")
+
+    # 测试直方图
+    print("3. 测试直方图")
+    histogram = registry.histogram("latency_seconds", "耗时", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.labels("stt").observe(value)
+    child = histogram.labels("stt")
+    assert child.counts == [1, 2, 1], "分桶计数不正确"
+    assert child.count == 4
+    print("  ✓ 直方图功能正常\n")
+
+    # 测试Prometheus导出
+    print("4. 测试Prometheus导出")
+    text = registry.render()
+    assert "# TYPE intent_total counter" in text
+    assert 'intent_total{intent="translation"} 3' in text
+    assert 'latency_seconds_bucket{stage="stt",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="stt",le="1"} 3' in text
+    assert 'latency_seconds_bucket{stage="stt",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{stage="stt"} 4' in text
+    print("  ✓ 导出功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_metrics()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,93 @@
+"""
+测试离线LLM模拟服务
+不需要API密钥和网络连接
+"""
+
+import os
+import sys
+import json
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+
+from llm.mock_server import MockLLMServer, LatencyModel
+from llm.config import LLMConfig
+from llm.api_client import LLMClient
+
+
+def make_client(server: MockLLMServer) -> LLMClient:
+    """创建指向模拟服务的客户端（只在读取配置时临时修改环境变量，不影响之后的测试）"""
+    env = {"QWEN_API_KEY": os.environ.get("QWEN_API_KEY", "mock-key"), "QWEN_API_URL": server.url}
+    with patch.dict(os.environ, env):
+        return LLMClient(LLMConfig())
+
+
+def test_mock_llm_server():
+    """测试模拟服务的阻塞和流式接口"""
+    print("🧪 测试LLM模拟服务\n")
+
+    with MockLLMServer(port=0, chunk_tokens=3) as server:
+        # 测试LLMClient对话
+        print("1. 测试LLMClient对话")
+        client = make_client(server)
+        response = client.chat("请把'你好'翻译成法语", intent_type="translation")
+        assert "bonjour" in response.lower(), "翻译响应应该包含'bonjour'"
+        assert client.chat("请把'你好'翻译成法语") == response, "相同问题应得到相同回答"
+        print("  ✓ 对话功能正常\n")
+
+        # 测试SSE流式响应
+        print("2. 测试流式响应")
+        payload = {
+            "model": "qwen-turbo",
+            "input": {"messages": [{"role": "user", "content": "bonjour怎么发音？"}]},
+            "parameters": {"incremental_output": True}
+        }
+        resp = requests.post(
+            server.url,
+            json=payload,
+            headers={"X-DashScope-SSE": "enable"},
+            stream=True,
+            timeout=5
+        )
+        events = [
+            json.loads(line[len("data:"):])
+            for line in resp.iter_lines(decode_unicode=True)
+            if line and line.startswith("data:")
+        ]
+        assert len(events) > 1, "流式响应应该包含多个事件"
+        assert events[-1]["output"]["finish_reason"] == "stop"
+        text = "".join(event["output"]["text"] for event in events)
+        assert text == MockLLMServer.answer_for(payload["input"]["messages"])
+
+        deltas = list(client.chat_stream("请把'你好'翻译成法语", intent_type="translation"))
+        assert len(deltas) > 1, "LLMClient应逐段返回"
+        assert "".join(deltas).strip() == response, "流式结果应与阻塞结果一致"
+        print("  ✓ 流式响应功能正常\n")
+
+    # 测试限流注入
+    print("3. 测试限流注入")
+    with MockLLMServer(port=0, throttle_rate=1.0) as server:
+        resp = requests.post(server.url, json=payload, timeout=5)
+        assert resp.status_code == 429, "应返回429"
+        assert resp.json()["code"] == "Throttling.RateQuota"
+    print("  ✓ 限流注入功能正常\n")
+
+    # 测试延迟分布
+    print("4. 测试延迟分布")
+    model = LatencyModel.parse("uniform:0.1,0.2")
+    samples = [model.sample(random.Random(i)) for i in range(20)]
+    assert all(0.1 <= s <= 0.2 for s in samples)
+    print("  ✓ 延迟分布功能正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_mock_llm_server()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,146 @@
+"""
+测试Whisper模型管理器
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import WhisperEngine
+from speech.speech_to_text.model_manager import WhisperModelManager
+from speech.speech_to_text.recognizer import SpeechRecognizer
+
+
+class FakeModel:
+    """记录解码调用的假模型"""
+
+    def __init__(self, name):
+        self.name = name
+        self.decodes = []
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.decodes.append((len(audio), language))
+        return {"text": ""}
+
+
+class FakeLoader:
+    """模拟耗时加载并记录调用次数"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, name):
+        self.calls.append(name)
+        time.sleep(self.delay)
+        return FakeModel(name)
+
+
+def test_model_manager():
+    """测试模型管理功能"""
+    print("🧪 测试模型管理器\n")
+
+    # 测试并发获取只加载一次
+    print("1. 测试只加载一次")
+    loader = FakeLoader()
+    manager = WhisperModelManager(loader=loader)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(manager.get("base")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == ["base"], f"模型应只加载一次: {loader.calls}"
+    assert all(model is results[0] for model in results), "应共享同一个模型"
+    print("  ✓ 只加载一次\n")
+
+    # 测试后台预加载和预热
+    print("2. 测试后台预加载")
+    start = time.perf_counter()
+    future = manager.preload("small", warmup=True, language="zh")
+    assert time.perf_counter() - start < loader.delay, "预加载不应阻塞调用方"
+    model = manager.get("small")
+    assert model is future.result() and manager.is_loaded("small")
+    assert model.decodes == [(16000, "zh")], "应做一次预热解码"
+    print("  ✓ 后台预加载功能正常\n")
+
+    # 测试识别器共享模型
+    print("3. 测试识别器共享模型")
+    first = SpeechRecognizer(model_name="small", manager=manager)
+    second = SpeechRecognizer(model_name="small", manager=manager)
+    first.load_model()
+    second.load_model()
+    assert first.model is second.model is model
+    assert loader.calls == ["base", "small"]
+    print("  ✓ 识别器共享模型\n")
+
+    # 测试统计信息
+    print("4. 测试统计信息")
+    stats = manager.get_stats()
+    assert stats["base"]["load_seconds"] >= loader.delay
+    assert stats["base"]["warmup_seconds"] is None
+    assert stats["small"]["warmup_seconds"] is not None
+    assert first.get_model_info()["load_stats"] == stats["small"]
+    print("  ✓ 统计信息正常\n")
+
+    # 测试解码参数覆盖默认值
+    print("5. 测试解码参数")
+
+    class CPUModel(FakeModel):
+        device = SimpleNamespace(type="cpu")
+
+        def transcribe(self, audio, language=None, **kwargs):
+            self.options = kwargs
+            return {"text": " salut "}
+
+    engine = WhisperEngine("base", manager=WhisperModelManager(loader=CPUModel), decode_params={"fp16": True})
+    assert engine.transcribe(np.zeros(16000, dtype=np.float32), "fr") == "salut"
+    assert engine.model.options["fp16"] is True, "显式的fp16应覆盖CPU上的默认值"
+    engine = WhisperEngine("base", manager=WhisperModelManager(loader=CPUModel))
+    engine.transcribe(np.zeros(16000, dtype=np.float32), "fr")
+    assert engine.model.options["fp16"] is False
+    print("  ✓ 解码参数正常\n")
+
+    # 测试加载失败后可以重试
+    print("6. 测试加载失败")
+
+    def broken_loader(name):
+        raise RuntimeError("磁盘已满")
+
+    broken = WhisperModelManager(loader=broken_loader)
+    for _ in range(2):
+        try:
+            broken.get("base")
+            assert False, "应抛出异常"
+        except Exception as e:
+            assert "模型加载失败" in str(e)
+    assert not broken.is_loaded("base")
+
+    class BrokenWeights(FakeModel):
+        def parameters(self):
+            raise RuntimeError("无法统计权重")
+
+    broken = WhisperModelManager(loader=BrokenWeights)
+    future = broken.preload("base")
+    model = future.result(timeout=5)
+    assert isinstance(model, BrokenWeights), "统计出错不应让加载成功的模型失败"
+    assert broken.is_loaded("base") and broken.get_stats()["base"]["weights_bytes"] is None
+    print("  ✓ 加载失败处理正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_model_manager()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,218 @@
+"""
+测试语音识别器（使用假模型，不需要Whisper权重）
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.model_manager import WhisperModelManager
+from speech.speech_to_text.recognizer import SpeechRecognizer, pcm16_to_float32
+from speech.speech_to_text.streaming import StreamingTranscriber
+from speech.speech_to_text.stt_service import BatchedSTTService
+from speech.speech_to_text.transcript_cache import TranscriptCache
+from utils.error_handler import SpeechRecognitionError
+
+
+class FakeModel:
+    """记录输入音频的假模型"""
+
+    def __init__(self):
+        self.inputs = []
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.inputs.append(audio)
+        return {"text": f" {len(audio)} samples "}
+
+
+class WordModel(FakeModel):
+    """把每段恒定幅度的声音识别成一个"单词"（幅度/1000即单词编号）"""
+
+    def transcribe(self, audio, language=None, **kwargs):
+        self.inputs.append(audio)
+        # 找出连续的非静音片段，每段取中点的幅度
+        voiced = np.concatenate([[0], (audio != 0).astype(np.int8), [0]])
+        edges = np.flatnonzero(np.diff(voiced))
+        words = [
+            f"w{int(round(audio[(start + end) // 2] * 32768 / 1000))}"
+            for start, end in zip(edges[::2], edges[1::2])
+        ]
+        return {"text": " ".join(words)}
+
+
+class GatedModel(WordModel):
+    """第一次识别阻塞到 release 被设置，模拟说完时还在进行的中间识别"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def transcribe(self, audio, language=None, **kwargs):
+        if not self.started.is_set():
+            self.started.set()
+            self.release.wait(5)
+        return super().transcribe(audio, language, **kwargs)
+
+
+def make_recognizer(model=None, language="zh"):
+    """创建使用假模型的识别器"""
+    model = model or FakeModel()
+    manager = WhisperModelManager(loader=lambda name: model)
+    return SpeechRecognizer(model_name="base", language=language, manager=manager), model
+
+
+def make_utterance(words):
+    """生成"单词"音频：每个单词0.6秒，之间隔0.3秒静音"""
+    silence = np.zeros(4800, dtype=np.int16)
+    parts = []
+    for word in words:
+        parts += [np.full(9600, word * 1000, dtype=np.int16), silence]
+    return np.concatenate(parts).tobytes()
+
+
+def test_recognizer():
+    """测试语音识别功能"""
+    print("🧪 测试语音识别器\n")
+
+    # 测试PCM转换
+    print("1. 测试PCM转换")
+    pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+    audio = pcm16_to_float32(pcm.tobytes())
+    assert audio.dtype == np.float32
+    assert np.allclose(audio, [0.0, 0.5, -1.0, 32767 / 32768])
+    assert len(pcm16_to_float32(pcm.tobytes() + b"\x01")) == 4, "多余的半个采样应丢弃"
+    stereo = np.array([100, 300, -200, 200], dtype=np.int16).tobytes()
+    assert np.allclose(pcm16_to_float32(stereo, channels=2) * 32768, [200, 0])
+    assert len(pcm16_to_float32(np.zeros(8000, dtype=np.int16).tobytes(), sample_rate=8000)) == 16000
+    print("  ✓ PCM转换功能正常\n")
+
+    # 测试内存识别
+    print("2. 测试内存识别")
+    recognizer, model = make_recognizer()
+    text = recognizer.recognize_audio_data(np.zeros(16000, dtype=np.int16).tobytes())
+    assert text == "16000 samples", f"识别结果错误: {text}"
+    assert isinstance(model.inputs[0], np.ndarray), "应直接传入数组而不是文件路径"
+    print("  ✓ 内存识别功能正常\n")
+
+    # 测试流式识别
+    print("3. 测试流式识别")
+    recognizer, model = make_recognizer(WordModel(), language="fr")
+    partials = []
+    transcriber = StreamingTranscriber(
+        recognizer, window_seconds=3.0, interval_seconds=0.5, on_partial=partials.append
+    ).start()
+    audio = make_utterance(range(1, 9))
+    for start in range(0, len(audio), 3200):
+        transcriber.feed(audio[start:start + 3200])
+        time.sleep(0.005)
+    text = transcriber.finish()
+    assert text == " ".join(f"w{i}" for i in range(1, 9)), f"识别结果错误: {text}"
+    assert partials, "说话过程中应有中间结果"
+    assert len(model.inputs[-1]) <= 3 * 16000, "结束后只应识别最后一个窗口"
+    last_seconds = len(model.inputs[-1]) / 16000
+
+    # 说完时不等待进行中的中间识别，中间结果不写入缓存
+    recognizer, model = make_recognizer(GatedModel(), language="fr")
+    recognizer.cache = TranscriptCache()
+    stale = []
+    transcriber = StreamingTranscriber(recognizer, interval_seconds=0.5, on_partial=stale.append).start()
+    transcriber.feed(make_utterance([1, 2]))
+    assert model.started.wait(5), "应开始中间识别"
+    start = time.perf_counter()
+    assert transcriber.finish() == "w1 w2"
+    assert time.perf_counter() - start < 1.0, "不应等待进行中的中间识别"
+    model.release.set()
+    time.sleep(0.1)
+    assert stale == [], "停止后完成的中间结果应丢弃"
+    cache_stats = recognizer.cache.get_stats()
+    assert cache_stats["misses"] == 1 and cache_stats["memory_entries"] == 1, f"只有最终结果使用缓存: {cache_stats}"
+    print(f"  ✓ 中间结果 {len(partials)} 次，最后一段 {last_seconds:.2f} 秒\n")
+
+    # 测试批量识别服务
+    print("4. 测试批量识别服务")
+    batches = []
+
+    def decode_batch(audios):
+        batches.append(len(audios))
+        time.sleep(0.02)
+        return [str(len(audio)) for audio in audios]
+
+    recognizer, _ = make_recognizer()
+    with BatchedSTTService(recognizer, max_batch_size=4, max_wait=0.05, decode_batch=decode_batch) as service:
+        futures = [service.submit(np.zeros(1600 * (i + 1), dtype=np.float32)) for i in range(10)]
+        results = [future.result(timeout=5) for future in futures]
+        assert results == [str(1600 * (i + 1)) for i in range(10)], "结果应与请求一一对应"
+        assert max(batches) == 4 and sum(batches) == 10, f"批次划分错误: {batches}"
+
+        # 凑不满一批时最多等待max_wait
+        start = time.perf_counter()
+        assert service.transcribe(np.zeros(3200, dtype=np.int16).tobytes(), timeout=5) == "3200"
+        assert time.perf_counter() - start < 0.5, "单个请求不应长时间等待凑批"
+
+        stats = service.get_stats()
+        assert stats["requests"] == 11 and stats["audio_seconds_per_core_second"] > 0
+        assert abs(stats["realtime_factor"] - stats["busy_seconds"] / stats["audio_seconds"]) < 1e-9
+        assert stats["realtime_factor"] < 1, "实时率为识别耗时与音频时长之比，越小越快"
+    print(f"  ✓ 批次: {batches}\n")
+
+    # 测试优先级
+    print("5. 测试优先级")
+    order = []
+    release = threading.Event()
+
+    def ordered_decode(audios):
+        release.wait(5)
+        order.extend(len(audio) for audio in audios)
+        return ["" for _ in audios]
+
+    with BatchedSTTService(recognizer, max_batch_size=1, max_wait=0.0, decode_batch=ordered_decode) as service:
+        futures = [service.submit(np.zeros(1, dtype=np.float32))]
+        time.sleep(0.05)
+        for size, priority in [(10, 5), (20, 0), (30, 5)]:
+            futures.append(service.submit(np.zeros(size, dtype=np.float32), priority=priority))
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+    assert order == [1, 20, 10, 30], f"高优先级应先处理，同优先级先进先出: {order}"
+    print("  ✓ 优先级功能正常\n")
+
+    # 测试解码失败
+    print("6. 测试解码失败")
+
+    def broken_decode(audios):
+        raise RuntimeError("显存不足")
+
+    with BatchedSTTService(recognizer, decode_batch=broken_decode) as service:
+        try:
+            service.transcribe(np.zeros(16, dtype=np.float32), timeout=5)
+            assert False, "应抛出异常"
+        except RuntimeError as e:
+            assert "显存不足" in str(e)
+
+    def short_decode(audios):
+        return ["bonjour"] * (len(audios) - 1)
+
+    with BatchedSTTService(recognizer, max_batch_size=2, max_wait=0.5, decode_batch=short_decode) as service:
+        futures = [service.submit(np.zeros(16, dtype=np.float32)) for _ in range(2)]
+        assert futures[0].result(timeout=5) == "bonjour"
+        try:
+            futures[1].result(timeout=5)
+            assert False, "没有对应结果的请求应失败"
+        except SpeechRecognitionError as e:
+            assert "数量不符" in str(e)
+    print("  ✓ 解码失败处理正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_recognizer()
+    sys.exit(0 if success else 1)
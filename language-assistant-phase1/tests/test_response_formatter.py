@@ -0,0 +1,79 @@
+"""
+测试响应格式化器
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.response_formatter import ResponseFormatter, StreamingFormatter
+
+
+RESPONSE = """**Bonjour** 的发音：
+
+🔊 音标：`[bɔ̃ʒuʁ]`
+
+1. **bon** [bɔ̃] - 鼻化元音
+2. **jour** [ʒuʁ] - 舌尖后缩
+- 重音在第二个音节
+* 2024年的新教材也这样标注
+## 小结
+单独的*星号和未闭合的**粗体
+不影响后续输出"""
+
+
+def random_deltas(text, rng):
+    """把文本随机切成1~4个字符的片段，模拟模型的增量输出"""
+    deltas, i = [], 0
+    while i < len(text):
+        step = rng.randint(1, 4)
+        deltas.append(text[i:i + step])
+        i += step
+    return deltas
+
+
+def test_response_formatter():
+    """测试响应格式化功能"""
+    print("🧪 测试响应格式化器\n")
+
+    formatter = ResponseFormatter()
+
+    # 测试按意图格式化
+    print("1. 测试按意图格式化")
+    assert formatter.format_with_intent("Bonjour", "translation") == "📝 翻译结果:\nBonjour"
+    assert formatter.format_with_intent("Salut", "unknown") == "💬 Salut"
+    print("  ✓ 按意图格式化功能正常\n")
+
+    # 测试流式结果与整体格式化一致
+    print("2. 测试流式格式化")
+    rng = random.Random(0)
+    for _ in range(200):
+        chunks = list(formatter.stream_with_intent(random_deltas(RESPONSE, rng), "pronunciation"))
+        assert "".join(chunks) == formatter.format_with_intent(RESPONSE, "pronunciation")
+    print("  ✓ 拼接结果一致\n")
+
+    # 测试不输出半截标记
+    print("3. 测试标记完整性")
+    streamer = StreamingFormatter()
+    assert streamer.feed("发音：**Bon") == "发音：", "未闭合的粗体应缓冲"
+    assert streamer.feed("jour") == ""
+    assert streamer.feed("** 好") == "**Bonjour** 好", "闭合后整体输出"
+    assert streamer.feed("\n1") == "\n", "行首可能是列表标记"
+    assert streamer.feed(". 音标") == "1. 音标"
+    assert streamer.feed("\n2024年") == "\n2024年", "不是列表标记时立即输出"
+    assert streamer.feed("单个*") == "单个", "单个星号可能是粗体开头"
+    assert streamer.feed("号") == "*号"
+    assert streamer.feed("`code") == ""
+    assert streamer.flush() == "`code", "结束时输出剩余内容"
+    print("  ✓ 标记完整性正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_response_formatter()
+    sys.exit(0 if success else 1)
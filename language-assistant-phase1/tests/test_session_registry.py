@@ -0,0 +1,143 @@
+"""
+测试会话注册表
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.session_registry import SessionRegistry
+
+
+def add_turn(registry, session_id, text):
+    """向会话添加一轮对话"""
+    with registry.session(session_id) as manager:
+        manager.add_user_message(text)
+        manager.add_assistant_message(f"回复: {text}")
+
+
+def test_session_registry():
+    """测试会话注册表功能"""
+    print("🧪 测试会话注册表\n")
+
+    spill_dir = Path(tempfile.mkdtemp())
+    registry = SessionRegistry(max_history=6, max_messages=4, idle_ttl=60, spill_dir=spill_dir)
+
+    # 测试按需创建
+    print("1. 测试按需创建")
+    add_turn(registry, "alice", "bonjour怎么发音？")
+    add_turn(registry, "bob", "merci是什么意思")
+    assert len(registry) == 2, "应有2个会话"
+    assert registry.get_stats()["total_messages"] == 4
+    print("  ✓ 按需创建功能正常\n")
+
+    # 测试超出预算后淘汰最久未用的会话
+    print("2. 测试预算淘汰")
+    add_turn(registry, "carol", "请翻译'你好'")
+    assert "alice" not in registry, "最久未用的会话应被淘汰"
+    assert "bob" in registry and "carol" in registry
+    assert len(list(spill_dir.glob("*.json"))) == 1, "淘汰的会话应落盘"
+    print("  ✓ 预算淘汰功能正常\n")
+
+    # 测试落盘会话的恢复
+    print("3. 测试会话恢复")
+    with registry.session("alice") as manager:
+        history = [msg.content for msg in manager.get_history()]
+    assert history == ["bonjour怎么发音？", "回复: bonjour怎么发音？"], f"恢复的历史错误: {history}"
+    assert registry.get_stats()["restored"] == 1
+    print("  ✓ 会话恢复功能正常\n")
+
+    # 测试空闲淘汰
+    print("4. 测试空闲淘汰")
+    active = len(registry)
+    evicted = registry.evict_idle(now=registry._sessions["alice"].last_used + 61)
+    assert evicted == active and len(registry) == 0, "所有会话都应空闲超时"
+    with registry.session("bob") as manager:
+        assert len(manager) == 2, "空闲淘汰的会话应能恢复"
+    print("  ✓ 空闲淘汰功能正常\n")
+
+    # 测试不同会话互不阻塞
+    print("5. 测试会话并发")
+    registry = SessionRegistry(max_history=100)
+    entered = threading.Event()
+    other_done = threading.Event()
+    errors = []
+
+    def run(target, *args):
+        """在线程中执行，把异常带回主线程"""
+        try:
+            target(*args)
+        except BaseException as e:
+            errors.append(e)
+
+    def hold_alice():
+        with registry.session("alice"):
+            entered.set()
+            # 持有alice期间，bob的请求应能完成
+            if not other_done.wait(timeout=5):
+                raise AssertionError("不同会话不应互相阻塞")
+
+    holder = threading.Thread(target=run, args=(hold_alice,))
+    holder.start()
+    assert entered.wait(timeout=5)
+    add_turn(registry, "bob", "au revoir")
+    other_done.set()
+    holder.join()
+    assert errors == [], errors
+
+    threads = [
+        threading.Thread(target=run, args=(add_turn, registry, "shared", f"问题{i}"))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [], errors
+    with registry.session("shared") as manager:
+        contents = sorted(msg.content for msg in manager.messages)
+    expected = sorted([f"问题{i}" for i in range(8)] + [f"回复: 问题{i}" for i in range(8)])
+    assert contents == expected, "同一会话的并发写入应串行化且不丢失"
+    assert registry.get_stats()["total_messages"] == 16 + 2
+    print("  ✓ 会话并发功能正常\n")
+
+    # 测试首次访问同一会话的竞争
+    print("6. 测试首次访问竞争")
+    registry = SessionRegistry(max_history=100, spill_dir=tempfile.mkdtemp())
+    restore = registry._restore
+
+    def slow_restore(session_id):
+        time.sleep(0.05)
+        return restore(session_id)
+
+    registry._restore = slow_restore
+    start = threading.Barrier(4)
+
+    def first_access(i):
+        start.wait(timeout=5)
+        add_turn(registry, "new", f"第{i}次")
+
+    threads = [threading.Thread(target=run, args=(first_access, i)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [], errors
+    with registry.session("new") as manager:
+        contents = sorted(msg.content for msg in manager.messages)
+    assert contents == sorted([f"第{i}次" for i in range(4)] + [f"回复: 第{i}次" for i in range(4)]), contents
+    assert registry.get_stats()["total_messages"] == 8
+    print("  ✓ 只有占位的线程加载会话\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_session_registry()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,101 @@
+"""
+测试识别前的静音裁剪
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import FakeEngine
+from speech.speech_to_text.recognizer import SpeechRecognizer
+from speech.speech_to_text.streaming import StreamingTranscriber
+from speech.speech_to_text.trimmer import SilenceTrimmer
+from speech.speech_to_text.utterance_capture import UtteranceCapture
+from speech.speech_to_text.vad import VoiceActivityDetector
+
+
+def pcm(*pieces):
+    """按 (秒数, 幅度) 拼接16kHz的16位PCM音频"""
+    return np.concatenate([
+        np.full(int(seconds * 16000), amplitude, dtype=np.int16) for seconds, amplitude in pieces
+    ]).tobytes()
+
+
+def test_silence_trimmer():
+    """测试静音裁剪功能"""
+    print("🧪 测试静音裁剪\n")
+
+    # 测试开头结尾裁剪
+    print("1. 测试开头结尾裁剪")
+    trimmer = SilenceTrimmer(pre_pad=0.2, post_pad=0.3)
+    audio = pcm((1.0, 0), (1.0, 3000), (0.2, 0), (1.0, 3000), (1.5, 0))
+    trimmed = trimmer.trim(audio)
+    assert len(trimmed) == int((0.2 + 2.2 + 0.3) * 16000) * 2, f"裁剪长度错误: {len(trimmed)}"
+    assert trimmed == audio[int(0.8 * 16000) * 2:int(3.5 * 16000) * 2], "应保留语音和前后余量"
+    stats = trimmer.last_stats
+    assert abs(stats["leading_seconds"] - 0.8) < 1e-6 and abs(stats["trailing_seconds"] - 1.2) < 1e-6
+    assert stats["segments"] == 1, "短停顿不应切分"
+    assert trimmer.trim(pcm((2.0, 0), (0.5, 100))) == b"", "没有语音时应返回空"
+    assert abs(trimmer.get_stats()["removed_seconds"] - (2.0 + 2.5)) < 1e-6
+    print(f"  ✓ {stats['original_seconds']:.1f}秒 -> {stats['kept_seconds']:.1f}秒\n")
+
+    # 测试分段
+    print("2. 测试语音分段")
+    segments = trimmer.find_segments(pcm((0.5, 0), (1.0, 3000), (2.0, 0), (1.0, 3000)))
+    assert segments == [(0.3 * 32000, 1.8 * 32000), (3.3 * 32000, 4.5 * 32000)], f"分段错误: {segments}"
+    assert trimmer.trim(pcm((1.0, 3000), (1.0, 0)), leading=False) == pcm((1.0, 3000), (0.3, 0))
+    print(f"  ✓ {len(segments)} 段\n")
+
+    # 测试流式识别
+    print("3. 测试流式识别跳过静音")
+    engine = FakeEngine()
+    transcriber = StreamingTranscriber(
+        SpeechRecognizer(engine=engine, language="fr"),
+        interval_seconds=0.5, trimmer=SilenceTrimmer()
+    ).start()
+    audio = pcm((2.0, 0), (1.0, 3000), (1.0, 0))
+    for start in range(0, len(audio), 3200):
+        transcriber.feed(audio[start:start + 3200])
+        time.sleep(0.005)
+    text = transcriber.finish()
+    assert text == "1.50s", f"只应识别语音和前后余量: {text}"
+    assert max(engine.calls) <= int(2.2 * 16000), f"不应识别开头的静音: {engine.calls}"
+    assert abs(transcriber.removed_seconds - 2.5) < 1e-6
+    print(f"  ✓ 识别 {len(engine.calls)} 次，裁掉 {transcriber.removed_seconds:.2f} 秒\n")
+
+    # 测试与VAD使用同一个阈值
+    print("4. 测试按VAD的自适应阈值裁剪")
+    vad = VoiceActivityDetector(silence_threshold=0.5)
+    recorder = UtteranceCapture(vad)
+    t = np.arange(int(2.8 * 16000)) / 16000
+    quiet = (300 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)  # RMS约212，低于固定阈值300
+    audio = np.concatenate([np.zeros(16000, dtype=np.int16), quiet, np.zeros(16000, dtype=np.int16)]).tobytes()
+    utterances = []
+    for offset in range(0, len(audio), 2048):
+        utterance = recorder.feed(audio[offset:offset + 2048])
+        if utterance is not None:
+            utterances.append(utterance.tobytes())
+    assert len(utterances) == 1, "VAD应录到这句轻声的话"
+    assert SilenceTrimmer().trim(utterances[0]) == b"", "固定阈值会把轻声的话全部裁掉"
+    trimmed = SilenceTrimmer(vad=vad).trim(utterances[0])
+    assert len(trimmed) >= len(quiet) * 2, f"按VAD阈值裁剪应保留整句: {len(trimmed) / 32000:.2f}秒"
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        vad.engine.process(rng.normal(0, 400, 16000).astype(np.int16).tobytes())
+    noisy = np.concatenate([rng.normal(0, 400, 32000), 8000 * np.sin(2 * np.pi * 440 * t[:16000])]).astype(np.int16)
+    trimmed = SilenceTrimmer(vad=vad).trim(noisy.tobytes())
+    assert len(trimmed) < 1.5 * 32000, f"背景噪声高于300时也应裁掉开头: {len(trimmed) / 32000:.2f}秒"
+    print(f"  ✓ 阈值 {vad.energy_threshold:.0f}\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_silence_trimmer()
+    sys.exit(0 if success else 1)
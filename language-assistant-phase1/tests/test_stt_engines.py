@@ -0,0 +1,117 @@
+"""
+测试语音识别引擎注册表
+"""
+
+import importlib.util
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import (
+    STTEngine, FakeEngine, available_engines, create_engine, register_engine
+)
+from speech.speech_to_text.recognizer import SpeechRecognizer
+from speech.speech_to_text.stt_service import BatchedSTTService
+from utils.error_handler import SpeechRecognitionError
+
+
+def test_stt_engines():
+    """测试识别引擎功能"""
+    print("🧪 测试语音识别引擎\n")
+
+    # 测试注册表
+    print("1. 测试注册表")
+    assert {"whisper", "faster-whisper", "fake"} <= set(available_engines())
+    try:
+        create_engine("paraformer")
+        assert False, "未注册的引擎应抛出异常"
+    except SpeechRecognitionError as e:
+        assert "paraformer" in str(e) and "whisper" in str(e)
+
+    @register_engine("echo-language")
+    class EchoEngine(STTEngine):
+        def load(self):
+            self.model = self
+
+        def transcribe(self, audio, language):
+            return language
+
+    recognizer = SpeechRecognizer(engine="echo-language", language="fr")
+    assert recognizer.recognize_array(np.zeros(160, dtype=np.float32)) == "fr"
+    assert recognizer.recognize_batch([np.zeros(16, dtype=np.float32)] * 3) == ["fr"] * 3
+    print(f"  ✓ 可用引擎: {available_engines()}\n")
+
+    # 测试假引擎
+    print("2. 测试假引擎")
+    recognizer = SpeechRecognizer(engine="fake")
+    assert recognizer.recognize_audio_data(np.zeros(24000, dtype=np.int16).tobytes()) == "1.50s"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav_path = Path(tmp_dir) / "test.wav"
+        with wave.open(str(wav_path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(np.zeros(8000, dtype=np.int16).tobytes())
+        assert recognizer.recognize_file(wav_path) == "0.50s"
+
+    engine = FakeEngine(text="bonjour")
+    recognizer = SpeechRecognizer(engine=engine)
+    with BatchedSTTService(recognizer, max_wait=0.01) as service:
+        assert service.transcribe(np.zeros(16000, dtype=np.float32), timeout=5) == "bonjour"
+    assert engine.calls == [16000]
+    info = recognizer.get_model_info()
+    assert info["engine"] == "fake" and info["loaded"]
+    print("  ✓ 假引擎功能正常\n")
+
+    # 测试按配置创建
+    print("3. 测试按配置创建")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "settings.yaml"
+        config_path.write_text(
+            "speech_to_text:\n"
+            "  engine: fake\n"
+            "  model: tiny\n"
+            "  language: fr\n"
+            "  engine_options:\n"
+            "    fake:\n"
+            "      text: salut\n",
+            encoding="utf-8"
+        )
+        recognizer = SpeechRecognizer.from_config(config_path)
+        assert recognizer.engine.name == "fake" and recognizer.model_name == "tiny"
+        assert recognizer.language == "fr"
+        assert recognizer.recognize_array(np.zeros(16, dtype=np.float32)) == "salut"
+
+        recognizer = SpeechRecognizer.from_config(config_path, engine="whisper")
+        assert recognizer.engine.name == "whisper" and recognizer.model is None
+
+        recognizer = SpeechRecognizer.from_config(Path(tmp_dir) / "missing.yaml")
+        assert recognizer.engine.name == "whisper" and recognizer.model_name == "base"
+    print("  ✓ 按配置创建功能正常\n")
+
+    # 测试可选依赖缺失
+    print("4. 测试faster-whisper依赖")
+    if importlib.util.find_spec("faster_whisper") is None:
+        recognizer = SpeechRecognizer(engine="faster-whisper", engine_options={"compute_type": "int8"})
+        try:
+            recognizer.recognize_array(np.zeros(16, dtype=np.float32))
+            assert False, "缺少faster-whisper时应抛出异常"
+        except SpeechRecognitionError as e:
+            assert "faster-whisper" in str(e)
+        print("  ✓ 未安装faster-whisper时给出明确错误\n")
+    else:
+        print("  ✓ 已安装faster-whisper，跳过\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_stt_engines()
+    sys.exit(0 if success else 1)
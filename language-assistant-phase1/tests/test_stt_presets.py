@@ -0,0 +1,114 @@
+"""
+测试语音识别预设和自动选择
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import STTEngine, register_engine
+from speech.speech_to_text.presets import STT_PRESETS, select_preset
+from speech.speech_to_text.recognizer import SpeechRecognizer
+from utils.error_handler import SpeechRecognitionError
+
+# 各模型模拟的实时率
+SIMULATED_RTF = {"tiny": 0.05, "base": 0.15, "small": 0.6}
+
+
+@register_engine("simulated-cpu")
+class SimulatedEngine(STTEngine):
+    """按模型大小模拟识别耗时的引擎"""
+
+    unloaded = []
+
+    def load(self):
+        self.model = self
+
+    def unload(self):
+        SimulatedEngine.unloaded.append(self.model_name)
+        super().unload()
+
+    def transcribe(self, audio, language):
+        time.sleep(len(audio) / 16000 * SIMULATED_RTF[self.model_name])
+        return self.model_name
+
+
+def test_stt_presets():
+    """测试识别预设功能"""
+    print("🧪 测试语音识别预设\n")
+
+    # 测试预设参数
+    print("1. 测试预设参数")
+    recognizer = SpeechRecognizer(engine="fake", model_name="large", preset="realtime")
+    assert recognizer.model_name == "tiny", "预设应覆盖模型名称"
+    assert recognizer.engine.decode_params == STT_PRESETS["realtime"]["decode_params"]
+
+    recognizer = SpeechRecognizer(
+        engine="fake", preset="accurate", engine_options={"decode_params": {"beam_size": 2}}
+    )
+    assert recognizer.engine.decode_params["beam_size"] == 2, "显式参数应覆盖预设的单项"
+    assert recognizer.engine.decode_params["best_of"] == 5
+    assert recognizer.get_model_info()["preset"] == "accurate"
+
+    signatures = {
+        name: str(SpeechRecognizer(engine="fake", preset=name).engine.decode_signature())
+        for name in STT_PRESETS
+    }
+    assert len(set(signatures.values())) == len(STT_PRESETS), "不同预设的缓存键应不同"
+
+    try:
+        SpeechRecognizer(engine="fake", preset="turbo")
+        assert False, "未知预设应抛出异常"
+    except SpeechRecognitionError as e:
+        assert "turbo" in str(e)
+    print("  ✓ 预设参数正常\n")
+
+    # 测试按实时率自动选择
+    print("2. 测试自动选择")
+    audio = np.zeros(8000, dtype=np.float32)
+    selected, measured = select_preset(engine="simulated-cpu", target_rtf=0.3, audio=audio)
+    assert selected == "balanced", f"应选实时率不超过目标的最大预设: {measured}"
+    assert list(measured) == ["realtime", "balanced", "accurate"]
+    assert SimulatedEngine.unloaded == ["tiny", "small"], "未选中的模型应释放"
+    print(f"  ✓ 实测: { {k: round(v, 2) for k, v in measured.items()} } -> {selected}")
+
+    selected, measured = select_preset(engine="simulated-cpu", target_rtf=0.01, audio=audio)
+    assert selected == "realtime" and list(measured) == ["realtime"], "超出目标后不再测更大的预设"
+
+    selected, _ = select_preset(engine="simulated-cpu", target_rtf=1.0, audio=audio)
+    assert selected == "accurate"
+    print("  ✓ 自动选择功能正常\n")
+
+    # 测试配置文件中的auto
+    print("3. 测试配置自动选择")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "settings.yaml"
+        config_path.write_text(
+            "speech_to_text:\n"
+            "  engine: simulated-cpu\n"
+            "  preset: auto\n"
+            "  target_rtf: 0.3\n"
+            "  language: fr\n",
+            encoding="utf-8"
+        )
+        recognizer = SpeechRecognizer.from_config(config_path)
+        assert recognizer.preset == "balanced" and recognizer.model_name == "base"
+        assert recognizer.recognize_array(audio) == "base"
+
+        recognizer = SpeechRecognizer.from_config(config_path, preset=None, model_name="small")
+        assert recognizer.preset is None and recognizer.model_name == "small"
+    print("  ✓ 配置自动选择正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_stt_presets()
+    sys.exit(0 if success else 1)
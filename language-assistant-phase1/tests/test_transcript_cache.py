@@ -0,0 +1,83 @@
+"""
+测试识别结果缓存
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.engines import FakeEngine
+from speech.speech_to_text.recognizer import SpeechRecognizer, pcm16_to_float32
+from speech.speech_to_text.transcript_cache import TranscriptCache
+
+
+def test_transcript_cache():
+    """测试识别结果缓存功能"""
+    print("🧪 测试识别结果缓存\n")
+
+    audio = np.linspace(-0.5, 0.5, 16000, dtype=np.float32)
+
+    # 测试缓存键
+    print("1. 测试缓存键")
+    key = TranscriptCache.make_key(audio, "whisper", "base", "zh")
+    assert key == TranscriptCache.make_key(audio.copy(), "whisper", "base", "zh"), "相同内容应得到相同的键"
+    assert key == TranscriptCache.make_key(audio[::-1][::-1], "whisper", "base", "zh"), "不连续的数组也应可用"
+    assert key != TranscriptCache.make_key(audio, "whisper", "base", "fr"), "语言应区分"
+    assert key != TranscriptCache.make_key(audio, "whisper", "small", "zh"), "模型应区分"
+    assert key != TranscriptCache.make_key(audio, "whisper", "base", "zh", {"beam_size": 5}), "解码参数应区分"
+    changed = audio.copy()
+    changed[100] += 0.01
+    assert key != TranscriptCache.make_key(changed, "whisper", "base", "zh"), "音频内容应区分"
+    print("  ✓ 缓存键功能正常\n")
+
+    # 测试内存LRU和磁盘两级缓存
+    print("2. 测试两级缓存")
+    cache_dir = tempfile.mkdtemp()
+    cache = TranscriptCache(cache_dir, max_entries=2)
+    keys = [TranscriptCache.make_key(audio * i, "fake", "base", "zh") for i in range(3)]
+    assert cache.get(keys[0]) is None
+    for i, k in enumerate(keys):
+        cache.put(k, f"文本{i}")
+    assert cache.get_stats()["memory_entries"] == 2, "内存缓存应按LRU淘汰"
+    assert cache.get(keys[2]) == "文本2" and cache.memory_hits == 1
+    assert cache.get(keys[0]) == "文本0" and cache.disk_hits == 1, "内存淘汰后应从磁盘读取"
+
+    restarted = TranscriptCache(cache_dir)
+    assert restarted.get(keys[1]) == "文本1", "重启后磁盘缓存应仍可用"
+    assert restarted.get(keys[1]) == "文本1" and restarted.memory_hits == 1, "磁盘命中后应提升到内存"
+    assert TranscriptCache().get(keys[1]) is None, "未配置目录时只用内存"
+    print(f"  ✓ {cache.get_stats()}\n")
+
+    # 测试识别器使用缓存
+    print("3. 测试识别器使用缓存")
+    engine = FakeEngine(text="bonjour")
+    cache = TranscriptCache()
+    recognizer = SpeechRecognizer(engine=engine, language="fr", cache=cache)
+    pcm = (audio * 32767).astype(np.int16).tobytes()
+    for _ in range(3):
+        assert recognizer.recognize_audio_data(pcm) == "bonjour"
+    assert len(engine.calls) == 1, f"相同音频应只识别一次: {engine.calls}"
+
+    other = np.zeros(8000, dtype=np.float32)
+    assert recognizer.recognize_batch([other, pcm16_to_float32(pcm), other]) == ["bonjour"] * 3
+    assert engine.calls == [16000, 8000], "批量识别时只解码未命中且不重复的音频"
+
+    # 同一音频换一个固定文本的假引擎，解码参数不同，不应命中
+    recognizer = SpeechRecognizer(engine=FakeEngine(text="salut"), language="fr", cache=cache)
+    assert recognizer.recognize_array(audio) == "salut"
+    stats = recognizer.get_model_info()["cache"]
+    assert (stats["memory_hits"], stats["misses"]) == (3, 4), f"缓存统计错误: {stats}"
+    print(f"  ✓ 命中率: {stats['hit_rate']:.0%}\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_transcript_cache()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,104 @@
+"""
+测试对话记录导出和导入
+"""
+
+import io
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp.session_registry import SessionRegistry
+from mcp.transcripts import iter_records, read_jsonl, write_jsonl, import_records, validate_jsonl, parse_timestamp
+
+
+def test_transcripts():
+    """测试对话记录导出和导入功能"""
+    print("🧪 测试对话记录导出\n")
+
+    registry = SessionRegistry(max_messages=4, spill_dir=tempfile.mkdtemp())
+    with registry.session("alice") as manager:
+        manager.add_user_message("请把'你好'翻译成法语", "translation")
+        manager.add_assistant_message("Bonjour", "translation")
+    with registry.session("bob") as manager:
+        manager.add_user_message("bonjour怎么发音？", "pronunciation")
+        manager.add_assistant_message("[bɔ̃ʒuʁ]", "pronunciation")
+    with registry.session("carol") as manager:
+        manager.add_user_message("今天天气真好")
+
+    # 测试导出（包括已落盘的会话）
+    print("1. 测试导出")
+    assert "alice" not in registry, "alice应已落盘"
+    buffer = io.StringIO()
+    count = write_jsonl(iter_records(registry), buffer)
+    assert count == 5, f"应导出5条记录: {count}"
+    assert "alice" not in registry, "导出不应恢复落盘会话"
+    print("  ✓ 导出功能正常\n")
+
+    # 测试过滤
+    print("2. 测试过滤")
+    records = list(iter_records(registry, intents=["pronunciation"]))
+    assert [r["session_id"] for r in records] == ["bob", "bob"]
+    future = datetime.now() + timedelta(hours=1)
+    assert list(iter_records(registry, since=future)) == [], "时间过滤错误"
+    buffer.seek(0)
+    assert len(list(read_jsonl(buffer, until=future, intents={"translation"}))) == 2
+    past = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert len(list(iter_records(registry, since=past))) == 5, "带时区的起始时间应能比较"
+    assert list(iter_records(registry, until=parse_timestamp("2020-01-01T00:00:00Z"))) == []
+    buffer.seek(0)
+    assert len(list(read_jsonl(buffer, since=past))) == 5
+    assert parse_timestamp(records[0]["timestamp"]) and records[0]["timestamp"][-6] in "+-", "导出时间应带时区偏移"
+    print("  ✓ 过滤功能正常\n")
+
+    # 测试导入
+    print("3. 测试导入")
+    buffer.seek(0)
+    target = SessionRegistry()
+    spool = io.StringIO()
+    assert validate_jsonl(buffer, spool) == 5
+    spool.seek(0)
+    assert import_records(target, read_jsonl(spool)) == {"imported": 5, "dropped": 0}
+    with target.session("alice") as manager:
+        message = manager.get_history()[0]
+    assert message.intent == "translation" and message.content == "请把'你好'翻译成法语"
+    original = next(r for r in iter_records(registry) if r["session_id"] == "alice")
+    assert message.timestamp.astimezone().isoformat() == original["timestamp"], "导入应保留时间戳"
+    print("  ✓ 导入功能正常\n")
+
+    # 测试导入前检查
+    print("4. 测试导入前检查")
+    good = '{"session_id": "dave", "role": "user", "content": "salut"}\n'
+    for bad, reason in [
+        ("[1, 2]", "不是对象"),
+        ('{"session_id": "dave", "role": "robot", "content": "x"}', "角色错误"),
+        ('{"session_id": 7, "role": "user", "content": "x"}', "session_id不是字符串"),
+        ('{"session_id": "dave", "role": "user", "content": "x", "timestamp": "昨天"}', "时间格式错误"),
+        ("{broken", "无法解析"),
+    ]:
+        try:
+            validate_jsonl(io.StringIO(good + "\n" + bad + "\n"), io.StringIO())
+            assert False, f"应拒绝: {reason}"
+        except ValueError as e:
+            assert str(e).startswith("第3行"), f"错误信息应带行号: {e}"
+    lines = [good, '{"session_id": "dave", "role": "user", "content": "x"}\n', '{"session_id": "dave"\n', "[1]\n"]
+    assert len(list(read_jsonl(io.StringIO("".join(lines)), since=past))) == 0, "过滤时间时应跳过没有时间的记录"
+    print("  ✓ 不合法的记录整体拒绝\n")
+
+    # 测试超出历史上限
+    print("5. 测试超出历史上限")
+    small = SessionRegistry(max_history=2)
+    records = [{"session_id": "erin", "role": "user", "content": str(i)} for i in range(5)]
+    assert import_records(small, records) == {"imported": 5, "dropped": 3}
+    print("  ✓ 报告被挤掉的消息数\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_transcripts()
+    sys.exit(0 if success else 1)
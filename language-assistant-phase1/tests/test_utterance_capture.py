@@ -0,0 +1,126 @@
+"""
+测试带前置缓冲的整句录音
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.utterance_capture import PreRollBuffer, UtteranceCapture
+from speech.speech_to_text.vad import VoiceActivityDetector
+
+
+def tone(seconds, amplitude, freq=440):
+    """生成16kHz正弦波（int16）"""
+    t = np.arange(int(round(seconds * 16000))) / 16000
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def feed_all(recorder, audio, chunk=1024):
+    """按录音块送入，返回所有整句（复制出来）"""
+    utterances = []
+    for offset in range(0, len(audio), chunk * 2):
+        utterance = recorder.feed(audio[offset:offset + chunk * 2])
+        if utterance is not None:
+            utterances.append(utterance.tobytes())
+    return utterances
+
+
+class FakeCapture:
+    """按预先准备的音频逐块返回的假录音器"""
+
+    def __init__(self, audio, chunk_size=1024):
+        self.audio = audio
+        self.chunk_size = chunk_size
+        self.sample_rate = 16000
+        self.offset = 0
+        self.started = self.stopped = 0
+        self.keep_audio = None
+
+    def start_recording(self, keep_audio=True):
+        self.started += 1
+        self.keep_audio = keep_audio
+
+    def record_chunk(self):
+        chunk = self.audio[self.offset:self.offset + self.chunk_size * 2]
+        self.offset += self.chunk_size * 2
+        return chunk or bytes(self.chunk_size * 2)
+
+    def stop_recording(self):
+        self.stopped += 1
+
+
+def test_utterance_capture():
+    """测试整句录音功能"""
+    print("🧪 测试整句录音\n")
+
+    # 测试环形缓冲区
+    print("1. 测试环形缓冲区")
+    ring = PreRollBuffer(10)
+    ring.write(np.arange(7, dtype=np.int16))
+    ring.write(np.arange(7, 14, dtype=np.int16))
+    out = np.zeros(20, dtype=np.int16)
+    assert ring.read_into(0, out) == 10 and list(out[:10]) == list(range(4, 14)), "应只保留最近10个采样"
+    assert ring.read_into(12, out) == 2 and list(out[:2]) == [12, 13]
+    ring.write(np.arange(100, 125, dtype=np.int16))
+    assert ring.read_into(0, out) == 10 and list(out[:10]) == list(range(115, 125)), "超出容量的写入只保留结尾"
+    print("  ✓ 环形缓冲区正常\n")
+
+    # 测试前置音频和结束判定
+    print("2. 测试前置音频")
+    vad = VoiceActivityDetector(energy_threshold=300, silence_threshold=0.5)
+    recorder = UtteranceCapture(vad, pre_roll=0.3)
+    audio = np.concatenate([
+        np.zeros(16000, dtype=np.int16), tone(0.1, 200), tone(1.0, 3000), np.zeros(24000, dtype=np.int16)
+    ]).tobytes()
+    utterances = feed_all(recorder, audio)
+    assert len(utterances) == 1, f"应录到一句话: {len(utterances)}"
+    assert utterances[0] == audio[12800 * 2:41600 * 2], "应从语音开始前0.3秒到静音满0.5秒"
+    assert not recorder.active
+    print(f"  ✓ 整句 {len(utterances[0]) / 32000:.2f} 秒（含弱起音）\n")
+
+    # 测试开始迟滞和结束迟滞
+    print("3. 测试迟滞")
+    recorder = UtteranceCapture(VoiceActivityDetector(energy_threshold=300, silence_threshold=0.5))
+    click = np.concatenate([np.zeros(8000, dtype=np.int16), tone(0.04, 5000), np.zeros(16000, dtype=np.int16)])
+    assert feed_all(recorder, click.tobytes()) == [] and not recorder.active, "短促的按键声不应算开始说话"
+    speech = np.concatenate([
+        tone(0.5, 3000), tone(0.8, 350), tone(0.5, 3000), np.zeros(16000, dtype=np.int16)
+    ])
+    utterances = feed_all(recorder, speech.tobytes())
+    assert len(utterances) == 1, "说话中能量稍低的部分不应把句子切断"
+    assert len(utterances[0]) >= (0.5 + 0.8 + 0.5) * 32000
+    print("  ✓ 迟滞正常\n")
+
+    # 测试最大时长
+    print("4. 测试最大时长")
+    recorder = UtteranceCapture(VoiceActivityDetector(energy_threshold=300), pre_roll=0.3, max_duration=1.0)
+    utterances = feed_all(recorder, tone(3.0, 3000).tobytes())
+    assert len(utterances[0]) == int(1.3 * 16000) * 2, f"应在最大时长处结束: {len(utterances[0])}"
+    print(f"  ✓ 录到 {len(utterances)} 句\n")
+
+    # 测试从麦克风录音
+    print("5. 测试录音接口")
+    capture = FakeCapture(audio)
+    recorder = UtteranceCapture(VoiceActivityDetector(energy_threshold=300, silence_threshold=0.5), capture)
+    pieces = []
+    utterance = recorder.record(max_wait=5.0, on_chunk=lambda piece: pieces.append(piece.tobytes()))
+    assert utterance.tobytes() == audio[12800 * 2:41600 * 2]
+    assert b"".join(pieces) == utterance.tobytes(), "回调收到的音频拼起来应等于整句"
+    assert np.shares_memory(np.frombuffer(utterance, dtype=np.int16), recorder._buffer), "整句应是预分配缓冲区的视图"
+    assert capture.started == capture.stopped == 1
+    assert capture.keep_audio is False, "整句录音时录音器不应再累积一份音频"
+    assert recorder.record(max_wait=0.5) is None, "等待超时应返回None"
+    print(f"  ✓ 回调 {len(pieces)} 次\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_utterance_capture()
+    sys.exit(0 if success else 1)
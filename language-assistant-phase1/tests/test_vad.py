@@ -0,0 +1,100 @@
+"""
+测试语音活动检测
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from speech.speech_to_text.vad import FrameVAD, VoiceActivityDetector
+
+
+def tone(freq, seconds, amplitude, sample_rate=16000):
+    """生成正弦波（16位PCM采样）"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.int16)
+
+
+def noise(seconds, sigma, seed=0, sample_rate=16000):
+    """生成高斯白噪声（16位PCM采样）"""
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(0, sigma, int(seconds * sample_rate)), -32768, 32767).astype(np.int16)
+
+
+def test_vad():
+    """测试语音活动检测功能"""
+    print("🧪 测试语音活动检测\n")
+
+    # 测试能量计算不溢出
+    print("1. 测试能量计算")
+    vad = VoiceActivityDetector(energy_threshold=300)
+    loud = np.full(1024, 20000, dtype=np.int16).tobytes()
+    assert abs(vad.calculate_energy(loud) - 20000) < 1e-6, "int16平方不应溢出"
+    features = FrameVAD(energy_threshold=300).analyze(loud)
+    assert np.allclose(features["energy"], 20000)
+    print("  ✓ 能量计算正确\n")
+
+    # 测试帧特征
+    print("2. 测试帧特征")
+    engine = FrameVAD(energy_threshold=300)
+    voiced = engine.analyze(tone(1000, 0.2, 3000))
+    assert np.allclose(voiced["zcr"], 2 * 1000 / 16000, atol=0.01), "1kHz正弦波的过零率应约为0.125"
+    assert (voiced["band_ratio"][:, 1] > 0.9).all() and voiced["speech"].all()
+    hum = engine.analyze(tone(100, 0.2, 3000))
+    assert (hum["band_ratio"][:, 0] > 0.9).all() and not hum["speech"].any(), "低频嗡嗡声不应判为语音"
+    hiss = engine.analyze(tone(5000, 0.2, 3000))
+    assert (hiss["band_ratio"][:, 2] > 0.9).all() and hiss["speech"].all(), "高过零率的清辅音应判为语音"
+    print("  ✓ 过零率和频带能量正确\n")
+
+    # 测试流式与批量结果一致
+    print("3. 测试流式与批量一致")
+    audio = np.concatenate([noise(0.5, 50), tone(440, 0.5, 3000), noise(0.5, 50)]).tobytes()
+    batch = FrameVAD(energy_threshold=300).analyze(audio)["speech"]
+    stream = FrameVAD(energy_threshold=300)
+    rng = np.random.default_rng(1)
+    pieces, offset = [], 0
+    while offset < len(audio):
+        size = int(rng.integers(1, 1500)) * 2
+        pieces.append(stream.process(audio[offset:offset + size]))
+        offset += size
+    assert np.array_equal(np.concatenate(pieces), batch), "分块处理应与整段处理结果相同"
+    assert batch.sum() == 25, f"语音帧数错误: {batch.sum()}"
+    print(f"  ✓ {len(pieces)} 块，{len(batch)} 帧\n")
+
+    # 测试自适应阈值
+    print("4. 测试自适应阈值")
+    engine = FrameVAD()
+    background = noise(1.0, 400, seed=2).tobytes()
+    assert engine.process(background).mean() > 0.5, "适应前较大的背景噪声会被判为语音"
+    for seed in range(3, 20):
+        engine.process(noise(1.0, 400, seed=seed).tobytes())
+    assert engine.process(noise(1.0, 400, seed=20).tobytes()).mean() < 0.05, "适应后背景噪声不应判为语音"
+    speech = np.clip(noise(0.5, 400, seed=21) + tone(440, 0.5, 8000), -32768, 32767).astype(np.int16)
+    assert engine.process(speech.tobytes()).all(), "高于背景噪声的语音应判为语音"
+    engine.process(np.zeros(16000, dtype=np.int16).tobytes())
+    assert engine.threshold == engine.min_threshold, "噪声下降时应立即跟上"
+    batch = FrameVAD().analyze(np.concatenate([noise(2.0, 400, seed=22), tone(440, 0.5, 8000)]))
+    assert batch["speech"][:100].mean() < 0.05 and batch["speech"][100:].all(), "批量分析应按整段估计噪声"
+    print(f"  ✓ 背景噪声 {engine.noise_floor:.0f}\n")
+
+    # 测试静音结束检测
+    print("5. 测试静音结束检测")
+    vad = VoiceActivityDetector(silence_threshold=0.5)
+    chunks = [tone(440, 0.064, 3000).tobytes()] * 5 + [np.zeros(1024, dtype=np.int16).tobytes()] * 10
+    stops = [vad.detect_silence_end(chunk, 0.064) for chunk in chunks]
+    assert stops.index(True) == 5 + 7, f"应在静音满0.5秒时停止: {stops}"
+    vad.reset()
+    assert vad.silence_duration == 0.0
+    print("  ✓ 静音结束检测正常\n")
+
+    print("✅ 所有测试通过！")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_vad()
+    sys.exit(0 if success else 1)
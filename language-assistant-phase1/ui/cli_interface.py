@@ -4,7 +4,7 @@
 """
 
 import sys
-from typing import Optional
+from typing import Iterator, Optional
 from utils.logger import logger
 from mcp.intent_detector import IntentDetector
 from mcp.conversation_manager import ConversationManager
@@ -16,8 +16,14 @@ from utils.error_handler import APIError
 class CLIInterface:
     """命令行界面类"""
 
-    def __init__(self):
-        """初始化CLI界面"""
+    def __init__(self, stream: bool = False):
+        """
+        初始化CLI界面
+
+        Args:
+            stream: 是否边生成边显示响应
+        """
+        self.stream = stream
         self.intent_detector = IntentDetector()
         self.conversation_manager = ConversationManager(max_history=10)
         self.response_formatter = ResponseFormatter()
@@ -137,7 +143,7 @@ class CLIInterface:
             logger.debug(f"检测到意图: {intent_type}")
 
             # 添加用户消息到历史
-            self.conversation_manager.add_user_message(user_input)
+            self.conversation_manager.add_user_message(user_input, intent_type)
 
             # 获取对话历史
             history = self.conversation_manager.get_formatted_history(limit=5)
@@ -150,7 +156,7 @@ class CLIInterface:
             )
 
             # 添加助手消息到历史
-            self.conversation_manager.add_assistant_message(response)
+            self.conversation_manager.add_assistant_message(response, intent_type)
 
             # 格式化响应
             formatted_response = self.response_formatter.format_with_intent(
@@ -170,6 +176,42 @@ class CLIInterface:
             logger.error(error_msg, exc_info=True)
             return self.response_formatter.format_error(error_msg)
 
+    def stream_user_input(self, user_input: str) -> Iterator[str]:
+        """
+        流式处理用户输入
+
+        Args:
+            user_input: 用户输入
+
+        Yields:
+            str: 可以立即显示的响应片段
+        """
+        if not self.llm_client:
+            yield "❌ LLM客户端未初始化，请检查配置"
+            return
+
+        intent_type = self.intent_detector.analyze(user_input)['intent'].value
+        self.conversation_manager.add_user_message(user_input, intent_type)
+        # 排除刚添加的用户消息
+        history = self.conversation_manager.get_formatted_history(limit=5)[:-1]
+
+        deltas = []
+
+        def collect():
+            for delta in self.llm_client.chat_stream(user_input, intent_type=intent_type, history=history):
+                deltas.append(delta)
+                yield delta
+
+        try:
+            yield from self.response_formatter.stream_with_intent(collect(), intent_type)
+        except APIError as e:
+            error_msg = f"API调用失败: {e}"
+            logger.error(error_msg)
+            yield "\n" + self.response_formatter.format_error(error_msg)
+            return
+
+        self.conversation_manager.add_assistant_message("".join(deltas).strip(), intent_type)
+
     def run(self):
         """运行CLI界面"""
         self.print_welcome()
@@ -190,6 +232,13 @@ class CLIInterface:
                     continue
 
                 # 处理正常输入
+                if self.stream:
+                    print("\n助手: ", end="", flush=True)
+                    for chunk in self.stream_user_input(user_input):
+                        print(chunk, end="", flush=True)
+                    print()
+                    continue
+
                 response = self.process_user_input(user_input)
 
                 if response:
@@ -6,7 +6,7 @@
 import sys
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from utils.logger import logger
 from mcp.intent_detector import IntentDetector
 from mcp.conversation_manager import ConversationManager
@@ -14,18 +14,32 @@ from mcp.response_formatter import ResponseFormatter
 from llm.api_client import LLMClient
 from speech.speech_to_text.audio_capture import AudioCapture
 from speech.speech_to_text.recognizer import SpeechRecognizer
+from speech.speech_to_text.streaming import StreamingTranscriber
+from speech.speech_to_text.trimmer import SilenceTrimmer
+from speech.speech_to_text.utterance_capture import UtteranceCapture
 from speech.speech_to_text.vad import VoiceActivityDetector
 from speech.text_to_speech.synthesizer import SpeechSynthesizer
 from speech.text_to_speech.audio_player import AudioPlayer
 from utils.error_handler import APIError, SpeechRecognitionError, SpeechSynthesisError
+from utils.metrics import metrics
+
+STAGE_LATENCY = metrics.histogram(
+    "voice_stage_duration_seconds", "语音交互各阶段耗时（秒）", ["stage"]
+)
 
 
 class VoiceInterface:
     """语音交互界面类"""
 
-    def __init__(self):
-        """初始化语音界面"""
+    def __init__(self, streaming_stt: bool = True):
+        """
+        初始化语音界面
+
+        Args:
+            streaming_stt: 是否边录音边识别
+        """
         logger.info("初始化语音界面...")
+        self.streaming_stt = streaming_stt
 
         # 核心组件
         self.intent_detector = IntentDetector()
@@ -43,6 +57,8 @@ class VoiceInterface:
         self.audio_capture = None
         self.speech_recognizer = None
         self.vad = None
+        self.utterance_capture = None
+        self.trimmer = None
         self.speech_synthesizer = None
         self.audio_player = None
 
@@ -53,10 +69,15 @@ class VoiceInterface:
     def _init_speech_components(self):
         """初始化语音组件"""
         try:
-            # 语音识别
+            # 语音识别（模型在后台加载并预热，避免第一轮对话等待）
+            self.speech_recognizer = SpeechRecognizer.from_config()
+            self.speech_recognizer.preload(warmup=True)
             self.audio_capture = AudioCapture()
-            self.speech_recognizer = SpeechRecognizer(model_name="base", language="zh")
-            self.vad = VoiceActivityDetector(energy_threshold=300, silence_threshold=1.0)
+            self.vad = VoiceActivityDetector(silence_threshold=1.0, sample_rate=self.audio_capture.sample_rate)
+            # 保留开始说话前的一小段音频，避免丢掉第一个音节
+            self.utterance_capture = UtteranceCapture(self.vad, self.audio_capture)
+            # 识别前裁掉开头和VAD等待结束时录进来的静音（与VAD使用同一个自适应阈值）
+            self.trimmer = SilenceTrimmer.from_config(sample_rate=self.audio_capture.sample_rate, vad=self.vad)
 
             # 语音合成
             self.speech_synthesizer = SpeechSynthesizer()
@@ -94,35 +115,30 @@ class VoiceInterface:
 """
         print(welcome)
 
-    def record_with_vad(self, max_duration: float = 10.0) -> Optional[bytes]:
+    def record_with_vad(
+        self,
+        max_duration: float = 10.0,
+        on_chunk: Optional[Callable[[memoryview], None]] = None
+    ) -> Optional[memoryview]:
         """
-        使用VAD录制语音
+        使用VAD录制一句话（从开始说话前一小段到说完）
 
         Args:
             max_duration: 最大录制时长（秒）
+            on_chunk: 句子每增加一段音频时的回调
 
         Returns:
-            Optional[bytes]: 音频数据
+            Optional[memoryview]: 16位PCM音频（未检测到语音时为None）
         """
         try:
-            self.audio_capture.start_recording()
-            self.vad.reset()
-
-            chunk_duration = self.audio_capture.chunk_size / self.audio_capture.sample_rate
-            max_chunks = int(max_duration / chunk_duration)
-
-            print("🎤 正在录音... (停止说话后会自动结束)")
+            print("🎤 请说话... (停止说话后会自动结束)")
+            audio_data = self.utterance_capture.record(max_duration, on_chunk=on_chunk)
 
-            for _ in range(max_chunks):
-                chunk = self.audio_capture.record_chunk()
-
-                # 检测是否应该停止
-                if self.vad.detect_silence_end(chunk, chunk_duration):
-                    break
+            if audio_data is None:
+                print("⚠️  未检测到语音")
+                return None
 
-            audio_data = self.audio_capture.stop_recording()
             print("✓ 录音完成")
-
             return audio_data
 
         except Exception as e:
@@ -141,8 +157,15 @@ class VoiceInterface:
             Optional[str]: 识别的文本
         """
         try:
+            if self.trimmer is not None:
+                audio_data = self.trimmer.trim(audio_data)
+                if not audio_data:
+                    print("⚠️  未检测到语音")
+                    return None
+
             print("🔍 正在识别...")
-            text = self.speech_recognizer.recognize_audio_data(audio_data)
+            with STAGE_LATENCY.labels("stt").time():
+                text = self.speech_recognizer.recognize_audio_data(audio_data)
 
             if text:
                 print(f"您说: {text}")
@@ -156,6 +179,43 @@ class VoiceInterface:
             print(f"❌ 识别失败: {e}")
             return None
 
+    def record_and_recognize(self, max_duration: float = 10.0) -> Optional[str]:
+        """
+        边录音边识别，说完后只需识别最后一小段
+
+        Args:
+            max_duration: 最大录制时长（秒）
+
+        Returns:
+            Optional[str]: 识别的文本
+        """
+        def show_partial(text: str):
+            print(f"\r  … {text}", end="", flush=True)
+
+        transcriber = StreamingTranscriber(
+            self.speech_recognizer,
+            sample_rate=self.audio_capture.sample_rate,
+            on_partial=show_partial,
+            trimmer=self.trimmer
+        ).start()
+
+        with STAGE_LATENCY.labels("record").time():
+            audio_data = self.record_with_vad(max_duration, on_chunk=transcriber.feed)
+        if not audio_data:
+            transcriber.cancel()
+            return None
+
+        print("🔍 正在识别...")
+        with STAGE_LATENCY.labels("stt").time():
+            text = transcriber.finish()
+
+        if text:
+            print(f"您说: {text}")
+            return text
+
+        print("⚠️  未识别到内容")
+        return None
+
     def process_input(self, user_input: str) -> Optional[str]:
         """
         处理用户输入
@@ -175,7 +235,7 @@ class VoiceInterface:
             intent_type = intent_result['intent'].value
 
             # 添加到历史
-            self.conversation_manager.add_user_message(user_input)
+            self.conversation_manager.add_user_message(user_input, intent_type)
 
             # 获取历史
             history = self.conversation_manager.get_formatted_history(limit=5)
@@ -188,7 +248,7 @@ class VoiceInterface:
             )
 
             # 添加到历史
-            self.conversation_manager.add_assistant_message(response)
+            self.conversation_manager.add_assistant_message(response, intent_type)
 
             return response
 
@@ -216,14 +276,16 @@ class VoiceInterface:
 
             # 合成语音
             print("🔊 正在合成语音...")
-            success = self.speech_synthesizer.synthesize(text, output_file)
+            with STAGE_LATENCY.labels("tts").time():
+                success = self.speech_synthesizer.synthesize(text, output_file)
 
             if not success:
                 return False
 
             # 播放语音
             print("📢 正在播放...")
-            self.audio_player.play(output_file)
+            with STAGE_LATENCY.labels("playback").time():
+                self.audio_player.play(output_file)
 
             # 清理临时文件
             Path(output_file).unlink(missing_ok=True)
@@ -241,19 +303,25 @@ class VoiceInterface:
 
     def handle_voice_interaction(self):
         """处理一轮语音交互"""
-        # 录音
-        audio_data = self.record_with_vad()
-        if not audio_data:
-            return
-
-        # 识别
-        text = self.recognize_speech(audio_data)
+        if self.streaming_stt:
+            # 录音的同时识别
+            text = self.record_and_recognize()
+        else:
+            # 录音
+            with STAGE_LATENCY.labels("record").time():
+                audio_data = self.record_with_vad()
+            if not audio_data:
+                return
+
+            # 识别
+            text = self.recognize_speech(audio_data)
         if not text:
             return
 
         # 处理
         print("\n💭 正在思考...")
-        response = self.process_input(text)
+        with STAGE_LATENCY.labels("process").time():
+            response = self.process_input(text)
 
         if response:
             print(f"\n助手: {response}\n")